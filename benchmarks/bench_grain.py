@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+GRAIN_REVERSE throughput.
+
+Renders stereo float32 noise of several durations at several grain sizes
+and prints grains/s and seconds of audio per wall-clock second. With
+--legacy the original grain-by-grain loop is timed on the shortest input
+for comparison (and checked against the vectorized output).
+
+    python benchmarks/bench_grain.py --durations 60,600,3600 --fractions 0.0625,0.125,0.25
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.hybrid.pipeline import process_audio  # noqa: E402
+from core.timing.grid import TimingGrid  # noqa: E402
+
+
+def legacy_grain_reverse(audio, grain, hop):
+    """The per-grain loop GRAIN_REVERSE used to be (channel-safe padding)."""
+    window = np.hanning(grain).astype(np.float32)
+    if audio.ndim > 1:
+        window = window[:, None]
+    out = np.zeros_like(audio, dtype=np.float32)
+    norm = np.zeros_like(audio, dtype=np.float32)
+    n = len(audio)
+    pos = 0
+    while pos < n:
+        g = audio[pos:min(pos + grain, n)]
+        if len(g) < grain:
+            g = np.pad(g, [(0, grain - len(g))] + [(0, 0)] * (audio.ndim - 1))
+        g = g[::-1] * window
+        out[pos:pos + grain] += g[:n - pos]
+        norm[pos:pos + grain] += window[:n - pos]
+        pos += hop
+    norm[norm == 0] = 1.0
+    return out / norm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRAIN_REVERSE throughput")
+    parser.add_argument("--durations", default="60,600", help="Input lengths in seconds (comma-separated)")
+    parser.add_argument("--fractions", default="0.0625,0.125,0.25", help="Grain sizes as beat fractions")
+    parser.add_argument("--tempo", type=float, default=128.0)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--legacy", action="store_true", help="Also time the per-grain loop")
+    args = parser.parse_args()
+
+    sr = args.sample_rate
+    grid = TimingGrid(sample_rate=sr, tempo=args.tempo)
+    durations = [float(x) for x in args.durations.split(",")]
+    shape = (args.channels,) if args.channels > 1 else ()
+
+    print(f"{'seconds':>8}{'grain':>8}{'grains':>11}{'Mgrains/s':>11}{'x realtime':>12}{'loop x':>9}")
+    for seconds in durations:
+        audio = np.random.default_rng(0).standard_normal((int(seconds * sr),) + shape, dtype=np.float32)
+        out = np.empty_like(audio)
+
+        for fraction in (float(x) for x in args.fractions.split(",")):
+            grain = grid.subdivision_samples(fraction)
+            hop = max(int(grain * (1.0 - args.overlap)), 1)
+            grains = -(-len(audio) // hop)
+            params = dict(tempo=args.tempo, grain_fraction=fraction, overlap=args.overlap)
+
+            process_audio(audio, sr, "GRAIN_REVERSE", out=out, **params)    # warm up
+            t0 = time.perf_counter()
+            process_audio(audio, sr, "GRAIN_REVERSE", out=out, **params)
+            t = time.perf_counter() - t0
+
+            speedup = ""
+            if args.legacy and seconds == min(durations):
+                t0 = time.perf_counter()
+                ref = legacy_grain_reverse(audio, grain, hop)
+                t_loop = time.perf_counter() - t0
+                assert np.allclose(ref, out, atol=1e-5), "vectorized output differs from loop"
+                speedup = f"{t_loop / t:.1f}"
+
+            print(f"{seconds:>8.0f}{grain:>8}{grains:>11}{grains / t / 1e6:>11.2f}{seconds / t:>12.0f}{speedup:>9}")
+        del audio, out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Thread scaling of SlicePlan rendering.
+
+Renders TRUE_REVERSE and HQ_REVERSE over stereo float32 buffers of several
+sizes with 1..N copy threads and prints throughput (GB/s of output) and
+speed-up over one thread. The point where adding threads stops helping is
+where the machine's memory bandwidth saturates.
+
+    python benchmarks/bench_parallel_render.py --sizes 64,256,1024 --max-threads 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.hybrid.pipeline import build_plan  # noqa: E402
+
+
+def bench(plan, source, out, threads, repeat):
+    plan.render(source, out=out, threads=threads)   # warm pages and pool
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        plan.render(source, out=out, threads=threads)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SlicePlan render thread scaling")
+    parser.add_argument("--sizes", default="64,256,1024", help="Buffer sizes in MB (comma-separated)")
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modes", default="TRUE_REVERSE,HQ_REVERSE")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sr = 48000
+    counts = sorted({1, *[1 << k for k in range(args.max_threads.bit_length())], args.max_threads})
+    counts = [c for c in counts if c <= args.max_threads]
+
+    print(f"{'mode':<14}{'MB':>7}{'threads':>9}{'GB/s':>9}{'speed-up':>10}")
+    for mb in (int(x) for x in args.sizes.split(",")):
+        frames = (mb << 20) // 8             # stereo float32
+        source = np.random.default_rng(0).standard_normal((frames, 2), dtype=np.float32)
+        out = np.empty_like(source)
+
+        for mode in args.modes.split(","):
+            plan = build_plan(frames, sr, mode, tempo=128.0)
+            base = None
+            for threads in counts:
+                t = bench(plan, source, out, threads, args.repeat)
+                base = base or t
+                print(f"{mode:<14}{mb:>7}{threads:>9}{out.nbytes / t / 1e9:>9.2f}{base / t:>10.2f}")
+        del source, out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite with baseline regression checks.
+
+Cases (asv-style parameter matrix, sized by --profile):
+  mode/...      process_audio for every MODE_MAP mode over durations,
+                channel layouts, tempos and (TATUM_REVERSE) tatum fractions
+  load_audio/.. decoding a WAV (float and 16-bit) from disk
+  hash/...      receipt input/output hashing (_hash_audio)
+  peaks/...     waveform overview peaks (what the GUI draws on load)
+  tempo/...     estimate_tempo (skipped when librosa is not installed)
+
+Every case runs in its own subprocess, so its peak RSS is its own. For
+each case the best and median wall time of --repeat runs (after one
+warm-up run on cases under a minute of audio) and the peak RSS of the
+process are recorded; results go to a JSON file together with the
+machine, library versions and git commit.
+
+With --baseline the results are compared against an earlier results
+file: a case regresses when its best time grows by more than
+--time-threshold (and by more than --min-delta seconds, so sub-millisecond
+noise never fails a run) or its peak RSS by more than --rss-threshold.
+Any regression makes the run exit with status 1.
+
+    python benchmarks/suite.py --profile quick --output baseline.json
+    python benchmarks/suite.py --profile quick --baseline baseline.json --output current.json
+    python benchmarks/suite.py --filter "mode/HQ_REVERSE/.*/stereo" --repeat 5 --list
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.hybrid.modes import all_modes  # noqa: E402
+
+SAMPLE_RATE = 44100
+
+# Durations are seconds of audio
+PROFILES = {
+    "quick": {
+        "durations": [5, 60],
+        "channels": [1, 2],
+        "tempos": [128.0],
+        "tatums": [0.25],
+    },
+    "default": {
+        "durations": [5, 60, 600],
+        "channels": [1, 2, 6],
+        "tempos": [90.0, 128.0, 174.0],
+        "tatums": [0.25, 0.0625],
+    },
+    "full": {
+        "durations": [5, 60, 600, 3600],
+        "channels": [1, 2, 6],
+        "tempos": [90.0, 128.0, 174.0],
+        "tatums": [0.5, 0.25, 0.125, 0.0625],
+    },
+}
+
+LAYOUTS = {1: "mono", 2: "stereo", 6: "5.1"}
+
+# Cases whose float32 input alone would exceed this are left out
+MAX_INPUT_BYTES = 2 << 30
+
+# Tempo detection is far slower than everything else; cap its input
+MAX_TEMPO_SECONDS = 600
+
+
+# -------------------------------------------------------------------
+# Case matrix
+# -------------------------------------------------------------------
+def build_cases(profile: dict) -> dict:
+    """case id -> spec (kind plus parameters), in run order."""
+    cases = {}
+
+    def add(case_id, **spec):
+        frames = spec["seconds"] * SAMPLE_RATE
+        if frames * spec["channels"] * 4 <= MAX_INPUT_BYTES:
+            cases[case_id] = spec
+
+    for seconds in profile["durations"]:
+        for ch in profile["channels"]:
+            layout = LAYOUTS.get(ch, f"{ch}ch")
+            base = f"{seconds}s/{layout}"
+
+            for spec in all_modes():
+                mode = spec.name
+                # Modes without a tempo (TRUE_REVERSE) ignore the grid, one is enough
+                tempos = profile["tempos"] if "tempo" in spec.param_names else profile["tempos"][:1]
+                for tempo in tempos:
+                    if "tatum_fraction" in spec.param_names:
+                        for tatum in profile["tatums"]:
+                            add(f"mode/{mode}/{base}/{tempo:g}bpm/t{tatum:g}", kind="mode", mode=mode,
+                                seconds=seconds, channels=ch, tempo=tempo, tatum_fraction=tatum)
+                    else:
+                        add(f"mode/{mode}/{base}/{tempo:g}bpm", kind="mode", mode=mode,
+                            seconds=seconds, channels=ch, tempo=tempo)
+
+            for subtype in ("FLOAT", "PCM_16"):
+                add(f"load_audio/{base}/{subtype}", kind="load_audio", seconds=seconds, channels=ch, subtype=subtype)
+            add(f"hash/{base}", kind="hash", seconds=seconds, channels=ch)
+            add(f"peaks/{base}", kind="peaks", seconds=seconds, channels=ch)
+            if seconds <= MAX_TEMPO_SECONDS and ch <= 2:
+                add(f"tempo/{base}", kind="tempo", seconds=seconds, channels=ch)
+    return cases
+
+
+def make_audio(seconds: int, channels: int) -> np.ndarray:
+    """Deterministic test signal shaped like load_audio output."""
+    frames = seconds * SAMPLE_RATE
+    shape = (frames, channels) if channels > 1 else (frames,)
+    audio = np.random.default_rng(0).standard_normal(shape, dtype=np.float32)
+    audio *= 0.25
+    return audio
+
+
+# -------------------------------------------------------------------
+# Case setup: returns the callable to time (or raises Skip)
+# -------------------------------------------------------------------
+class Skip(Exception):
+    pass
+
+
+def setup_mode(spec, workdir):
+    from core.hybrid.pipeline import process_audio
+
+    audio = make_audio(spec["seconds"], spec["channels"])
+    kwargs = {"tempo": spec["tempo"]}
+    if "tatum_fraction" in spec:
+        kwargs["tatum_fraction"] = spec["tatum_fraction"]
+    return lambda: process_audio(audio, SAMPLE_RATE, spec["mode"], **kwargs)
+
+
+def setup_load_audio(spec, workdir):
+    try:
+        import soundfile as sf
+
+        from core.io.audio_loader import load_audio
+    except ImportError as e:
+        raise Skip(str(e))
+
+    path = os.path.join(workdir, "input.wav")
+    sf.write(path, make_audio(spec["seconds"], spec["channels"]), SAMPLE_RATE, subtype=spec["subtype"])
+    return lambda: load_audio(path)
+
+
+def setup_hash(spec, workdir):
+    from core.economic.receipt_generator import _hash_audio
+
+    audio = make_audio(spec["seconds"], spec["channels"])
+    return lambda: _hash_audio(audio)
+
+
+def setup_peaks(spec, workdir):
+    from core.dsp.waveform import waveform_peaks
+
+    audio = make_audio(spec["seconds"], spec["channels"])
+    return lambda: waveform_peaks(audio)
+
+
+def setup_tempo(spec, workdir):
+    try:
+        import librosa.beat  # noqa: F401
+        import librosa.onset  # noqa: F401
+    except ImportError as e:
+        raise Skip(f"librosa unavailable: {e}")
+    from core.timing.tempo import estimate_tempo
+
+    # estimate_tempo takes librosa layout (channels, samples)
+    y = make_audio(spec["seconds"], spec["channels"]).T
+    return lambda: estimate_tempo(y, SAMPLE_RATE)
+
+
+SETUP = {
+    "mode": setup_mode,
+    "load_audio": setup_load_audio,
+    "hash": setup_hash,
+    "peaks": setup_peaks,
+    "tempo": setup_tempo,
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(spec: dict, repeat: int) -> dict:
+    """Time one case in this process (called in the per-case subprocess)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            fn = SETUP[spec["kind"]](spec, workdir)
+        except Skip as e:
+            return {"skipped": str(e)}
+        rss_setup = _peak_rss_mb()
+
+        if spec["seconds"] < 60:
+            fn()
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+
+    best = min(times)
+    return {
+        "time_min": best,
+        "time_median": statistics.median(times),
+        "times": times,
+        "realtime_x": spec["seconds"] / best if best > 0 else None,
+        "rss_setup_mb": rss_setup,
+        "rss_peak_mb": _peak_rss_mb(),
+    }
+
+
+def spawn_case(case_id: str, spec: dict, repeat: int) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(spec), "--repeat", str(repeat)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# -------------------------------------------------------------------
+# Results / baseline
+# -------------------------------------------------------------------
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=ROOT
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, time_threshold: float, rss_threshold: float, min_delta: float):
+    """Rows (case id, what, old, new, ratio) for every regression."""
+    regressions = []
+    for case_id, new in results.items():
+        old = baseline.get(case_id)
+        if not old or "time_min" not in old or "time_min" not in new:
+            continue
+        ratio = new["time_min"] / old["time_min"] if old["time_min"] > 0 else float("inf")
+        if ratio > time_threshold and new["time_min"] - old["time_min"] > min_delta:
+            regressions.append((case_id, "time", old["time_min"], new["time_min"], ratio))
+        ratio = new["rss_peak_mb"] / old["rss_peak_mb"] if old["rss_peak_mb"] > 0 else float("inf")
+        if ratio > rss_threshold:
+            regressions.append((case_id, "rss", old["rss_peak_mb"], new["rss_peak_mb"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DRE benchmark suite")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--filter", help="Only run cases whose id matches this regex")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--time-threshold", type=float, default=1.25, help="Max allowed time ratio vs baseline")
+    parser.add_argument("--rss-threshold", type=float, default=1.20, help="Max allowed peak RSS ratio vs baseline")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore time growth below this (seconds)")
+    parser.add_argument("--list", action="store_true", help="List matching case ids and exit")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker), args.repeat)))
+        return
+
+    cases = build_cases(PROFILES[args.profile])
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = {k: v for k, v in cases.items() if pattern.search(k)}
+    if args.list:
+        for case_id in cases:
+            print(case_id)
+        return
+
+    results = {}
+    for i, (case_id, spec) in enumerate(cases.items(), 1):
+        r = results[case_id] = spawn_case(case_id, spec, args.repeat)
+        if "time_min" in r:
+            line = f"{r['time_min'] * 1000:10.2f} ms  {r['realtime_x'] or 0:9.0f}x rt  {r['rss_peak_mb']:8.1f} MB"
+        else:
+            line = f"  {'skipped' if 'skipped' in r else 'ERROR'}: {r.get('skipped') or r.get('error')}"
+        print(f"[{i}/{len(cases)}] {case_id:<48}{line}", flush=True)
+
+    report = {"env": environment(), "profile": args.profile, "repeat": args.repeat, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    failed = any("error" in r for r in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results, baseline["results"], args.time_threshold, args.rss_threshold, args.min_delta
+        )
+        print(f"\nBaseline {baseline['env'].get('commit') or args.baseline}: "
+              f"{len(regressions)} regression(s)")
+        for case_id, what, old, new, ratio in regressions:
+            unit = "s" if what == "time" else "MB"
+            print(f"  {case_id:<48} {what:<4} {old:.4g} -> {new:.4g} {unit}  ({ratio:.2f}x)")
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,19 @@
-import jsonimport osclass CostEstimator:    def __init__(self, config_path="config/economic/cost_weights.json"):        with open(config_path, "r") as f:            self.weights = json.load(f)    def estimate(self, enriched_metadata):        """        Computes DATACOSTUNITS using weighted metadata fields.        """        cost = 0.0        for key, weight in self.weights.items():            value = enriched_metadata.get(key, 0)            cost += value * weight        return round(cost, 6)
\ No newline at end of file
+import json
+import os
+
+class CostEstimator:
+    def __init__(self, config_path="config/economic/cost_weights.json"):
+        with open(config_path, "r") as f:
+            self.weights = json.load(f)
+
+    def estimate(self, enriched_metadata):
+        """
+        Computes DATACOSTUNITS using weighted metadata fields.
+        """
+        cost = 0.0
+
+        for key, weight in self.weights.items():
+            value = enriched_metadata.get(key, 0)
+            cost += value * weight
+
+        return round(cost, 6)
@@ -0,0 +1,32 @@
+# core/dsp/boundaries.py
+
+import numpy as np
+
+from core.io.audio_buffer import as_array
+
+
+def boundary_discontinuity(audio, boundaries) -> float:
+    """
+    Click energy at slice boundaries of a rendered output.
+
+    At each boundary b the jump out[b] - out[b-1] is compared with the
+    slope on either side of it (the mean of the neighbouring first
+    differences); a splice that lands where the waveform continues
+    smoothly scores ~0, a butt-splice between unrelated samples scores the
+    squared size of the step. Returned as the mean over boundaries (summed
+    over channels), so renders with different slice counts compare fairly.
+    All boundaries are scored in one gather.
+    """
+    a = as_array(audio)
+    b = np.asarray(boundaries, dtype=np.int64)
+    b = b[(b >= 2) & (b <= len(a) - 2)]
+    if len(b) == 0:
+        return 0.0
+
+    window = a[b[:, None] + np.arange(-2, 2)].astype(np.float64)   # (boundaries, 4[, channels])
+    d = np.diff(window, axis=1)                                     # before, jump, after
+    excess = d[:, 1] - 0.5 * (d[:, 0] + d[:, 2])
+    energy = excess * excess
+    if energy.ndim > 1:
+        energy = energy.sum(axis=1)
+    return float(energy.mean())
@@ -0,0 +1,29 @@
+# core/dsp/cancel.py
+
+import threading
+
+
+class RenderCancelled(Exception):
+    """Raised inside a render when its CancelToken has been triggered."""
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag shared between a render and its owner.
+    Renders poll it between slice blocks, so cancelling never leaves a
+    half-written segment behind.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise RenderCancelled()
@@ -0,0 +1,159 @@
+# core/dsp/edit_history.py
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.virtual_buffer import VirtualBuffer
+
+
+@dataclass
+class EditStep:
+    """
+    One applied operation.
+    Permutation modes store only their SlicePlan; anything else stores the
+    rendered audio and becomes the new anchor for the steps after it.
+    """
+    label: str
+    plan: SlicePlan = None
+    audio: np.ndarray = None
+    params: dict = field(default_factory=dict)
+
+    # Plan from the nearest anchor (base or last rendered step) to this step
+    composite: SlicePlan = None
+    anchor: int = -1
+
+    @property
+    def nbytes(self) -> int:
+        n = 0
+        if self.plan is not None:
+            n += self.plan.nbytes
+        if self.composite is not None and self.composite is not self.plan:
+            n += self.composite.nbytes
+        if self.audio is not None:
+            n += self.audio.nbytes
+        return n
+
+
+class EditHistory:
+    """
+    Non-destructive edit history over one source buffer.
+
+    Each permutation step is composed onto the previous one as it is pushed,
+    so every history state is (anchor buffer, one plan) and renders through a
+    single gather. Undo/redo only move a cursor.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.steps = []
+        self.cursor = 0
+
+    # ---------------------------------------------------------------
+    # Recording
+    # ---------------------------------------------------------------
+    def _truncate(self):
+        # A new edit after an undo drops the redo branch
+        del self.steps[self.cursor:]
+
+    def push_plan(self, label: str, plan: SlicePlan, **params):
+        self._truncate()
+
+        anchor, composite = self._state(self.cursor)
+        if composite is not None:
+            composite = composite.then(plan)
+        else:
+            composite = plan
+
+        self.steps.append(
+            EditStep(label=label, plan=plan, params=params,
+                     composite=composite, anchor=anchor)
+        )
+        self.cursor += 1
+
+    def push_audio(self, label: str, audio: np.ndarray, **params):
+        self._truncate()
+        self.steps.append(
+            EditStep(label=label, audio=audio, params=params, anchor=self.cursor)
+        )
+        self.cursor += 1
+
+    # ---------------------------------------------------------------
+    # Navigation
+    # ---------------------------------------------------------------
+    @property
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.steps)
+
+    def undo(self) -> bool:
+        if not self.can_undo:
+            return False
+        self.cursor -= 1
+        return True
+
+    def redo(self) -> bool:
+        if not self.can_redo:
+            return False
+        self.cursor += 1
+        return True
+
+    def reset(self):
+        """Jump back to the source; the steps stay available for redo."""
+        self.cursor = 0
+
+    @property
+    def label(self) -> str:
+        return self.steps[self.cursor - 1].label if self.cursor else "ORIGINAL"
+
+    # ---------------------------------------------------------------
+    # Rendering
+    # ---------------------------------------------------------------
+    def _state(self, index: int):
+        """(anchor step index, composite plan or None) for history state index."""
+        if index == 0:
+            return 0, None
+        step = self.steps[index - 1]
+        if step.audio is not None:
+            return index, None
+        return step.anchor, step.composite
+
+    def _anchor_audio(self, anchor: int):
+        return self.base if anchor == 0 else self.steps[anchor - 1].audio
+
+    def plan(self, index: int = None) -> SlicePlan:
+        """Composite plan for a state, relative to its anchor buffer."""
+        return self._state(self.cursor if index is None else index)[1]
+
+    def base_plan(self, index: int = None) -> SlicePlan:
+        """
+        Plan from the original source to a state, or None when the state
+        sits on a rendered buffer (or is the source itself).
+        """
+        anchor, composite = self._state(self.cursor if index is None else index)
+        return composite if anchor == 0 else None
+
+    def view(self, index: int = None):
+        """Lazy view of a history state (plain array when no plan applies)."""
+        index = self.cursor if index is None else index
+        anchor, composite = self._state(index)
+        audio = self._anchor_audio(anchor)
+        if composite is None:
+            return audio
+        return VirtualBuffer(audio, composite)
+
+    def render(self, index: int = None) -> np.ndarray:
+        """Materialize a history state with a single gather."""
+        view = self.view(index)
+        if isinstance(view, VirtualBuffer):
+            return view.materialize()
+        return np.asarray(view, dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the history itself (excluding the base buffer)."""
+        return sum(step.nbytes for step in self.steps)
@@ -0,0 +1,162 @@
+# core/dsp/granular.py
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from core.dsp.slice_plan import as_frames
+
+# Grain frames (grains x grain length) processed per batch
+GRAIN_BLOCK = 1 << 20
+
+
+@lru_cache(maxsize=32)
+def grain_window(grain: int) -> np.ndarray:
+    """Hann window for one grain (float32, read-only)."""
+    w = np.hanning(grain).astype(np.float32)
+    w.setflags(write=False)
+    return w
+
+
+@lru_cache(maxsize=32)
+def _window_rows(grain: int, hop: int) -> np.ndarray:
+    """Window zero-padded to whole hops and cut into (hops per grain, hop) rows."""
+    rows = -(-grain // hop)
+    padded = np.zeros(rows * hop, dtype=np.float32)
+    padded[:grain] = grain_window(grain)
+    padded = padded.reshape(rows, hop)
+    padded.setflags(write=False)
+    return padded
+
+
+@lru_cache(maxsize=32)
+def _window_frames(grain: int, channels: int) -> np.ndarray:
+    """grain_window() repeated across channels, (grain, channels) C-contiguous."""
+    w = np.repeat(grain_window(grain), channels).reshape(grain, channels)
+    w.setflags(write=False)
+    return w
+
+
+def _norm_rows(first: int, count: int, grain: int, hop: int, channels: int) -> np.ndarray:
+    """
+    Summed window under output hops [first, first + count), repeated across
+    channels as (count or 1, hop * channels): the overlap-add gain to divide
+    out. Every hop past the first few sees all grain / hop windows, so
+    those share one cached row; zeros (the Hann endpoint at frame 0)
+    become 1.
+    """
+    w = _window_rows(grain, hop)
+    r = len(w)
+    if first >= r - 1:
+        count, first = 1, r - 1
+    norm = np.zeros((count, hop), dtype=np.float32)
+    # Grain g covers hops g .. g + r - 1 with window rows 0 .. r - 1; add
+    # oldest grain first, the order a grain-by-grain loop would use
+    for j in reversed(range(r)):
+        lo = max(j - first, 0)
+        if lo < count:
+            norm[lo:] += w[j]
+    norm[norm == 0] = 1.0
+    return np.repeat(norm, channels, axis=1)
+
+
+def grain_reverse_ola(
+    audio: np.ndarray,
+    grain: int,
+    hop: int,
+    out: np.ndarray = None,
+    progress=None,
+    cancel=None,
+) -> np.ndarray:
+    """
+    Granular reverse: a grain starts every hop frames, each grain is played
+    backwards under a Hann window and the grains are overlap-added back at
+    their original positions (normalized by the summed window).
+
+    No per-grain Python work: grains are strided views of the input, a
+    batch of them is reversed (whole frames at a time) and windowed as one
+    (grains, grain, channels) array, and overlap-add is grain / hop
+    shifted adds of that array into the output viewed as (hops, hop,
+    channels). Batches hold about GRAIN_BLOCK frames, so scratch memory
+    stays bounded however many grains the input has.
+
+    Grains past the end are zero-padded, as in the original loop version.
+    out may be audio itself (float32, C-contiguous): a batch only writes
+    hops that no later grain reads, so the render can run in place.
+    """
+    a = np.asarray(audio)
+    n = len(a)
+    if out is None:
+        out = np.empty(a.shape, dtype=np.float32)
+    if n == 0:
+        return out
+
+    # Work on (frames, channels) float32; mono is one channel
+    a2 = np.ascontiguousarray(a.reshape(n, -1), dtype=np.float32)
+    out2 = out if out.ndim == 2 else out[:, None]
+    ch = a2.shape[1]
+
+    hop = max(int(hop), 1)
+    grain = max(int(grain), 1)
+    r = -(-grain // hop)                 # hops touched by one grain
+    span = r * hop
+    count = -(-n // hop)                 # grains (one per hop start before n)
+    w = _window_frames(grain, ch)
+
+    # Grains that run past the end read from a small zero-padded copy
+    full = (n - grain) // hop + 1 if n >= grain else 0
+    spill = None
+    if full < count:
+        spill = np.zeros(((count - full - 1) * hop + grain, ch), dtype=np.float32)
+        rest = a2[full * hop:]
+        spill[:len(rest)] = rest
+
+    batch = max(GRAIN_BLOCK // span, 1)
+    grains = np.zeros((batch, span, ch), dtype=np.float32)
+    acc = np.zeros(((batch + r - 1) * hop, ch), dtype=np.float32)
+    carry = (r - 1) * hop
+    dest = as_frames(grains)
+
+    for g0 in range(0, count, batch):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        m = min(batch, count - g0)
+
+        # Reversed grains g0 .. g0 + m - 1 (full ones, then spill)
+        g = g0
+        while g < g0 + m:
+            if g < full:
+                src, pos, k = a2, g * hop, min(g0 + m, full) - g
+            else:
+                src, pos, k = spill, (g - full) * hop, g0 + m - g
+            items = as_frames(src[pos:]) if dest is not grains else src[pos:]
+            view = as_strided(
+                items,
+                shape=(k, grain) + items.shape[1:],
+                strides=(hop * items.strides[0],) + items.strides,
+                writeable=False,
+            )
+            dest[g - g0:g - g0 + k, :grain] = view[:, ::-1]
+            g += k
+        grains[:m, :grain] *= w
+
+        # Overlap-add: grain i's j-th hop lands on output hop g0 + i + j
+        rows = acc.reshape(batch + r - 1, hop * ch)
+        blocks = grains.reshape(batch, r, hop * ch)
+        for j in reversed(range(r)):
+            rows[j:j + m] += blocks[:m, j]
+
+        # Hops g0 .. g0 + m - 1 are final: later grains start after them
+        rows[:m] /= _norm_rows(g0, m, grain, hop, ch)
+        lo, hi = g0 * hop, min((g0 + m) * hop, n)
+        out2[lo:hi] = acc[:hi - lo]
+
+        # Keep the partial sums of the next hops, clear the rest
+        acc[:carry] = acc[m * hop:m * hop + carry]
+        acc[carry:] = 0
+
+        if progress is not None:
+            progress(min((g0 + m) / count, 1.0))
+
+    return out
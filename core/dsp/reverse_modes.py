@@ -1 +1,250 @@
-# core/dsp/reverse_modes.pyimport numpy as npfrom core.timing.grid import TimingGriddef _reverse_by_grid(audio: np.ndarray, grid: np.ndarray) -> np.ndarray:    """    Helper: slice audio by grid, reverse order of slices, keep audio inside slices forward.    Works for mono or stereo.    """    segments = []    for start, end in zip(grid[:-1], grid[1:]):        segments.append(audio[start:end])    if not segments:        return audio.astype(np.float32)    segments = segments[::-1]    out = np.concatenate(segments, axis=0)    # Pad/trim to original length    if len(out) > len(audio):        out = out[:len(audio)]    elif len(out) < len(audio):        if audio.ndim == 1:            out = np.pad(out, (0, len(audio) - len(out)))        else:            out = np.pad(out, ((0, len(audio) - len(out)), (0, 0)))    return out.astype(np.float32)def quarterbeat_reverse(    audio: np.ndarray,    sample_rate: int,    tempo: float = 120.0,    beats_per_bar: int = 4,    subdivision: float = 0.25,    **kwargs):    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)    g = grid.build_grid(len(audio), unit="subdivision", fraction=subdivision)    return _reverse_by_grid(audio, g)def qbeat_reverse(    audio: np.ndarray,    sample_rate: int,    tempo: float = 120.0,    beats_per_bar: int = 4,    subdivision: float = 0.25,    **kwargs):    """    QBEAT_REVERSE:    Deterministic quarter-beat structural reverse.    No detection, DAW-style timing.    """    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)    g = grid.build_grid(len(audio), unit="subdivision", fraction=subdivision)    return _reverse_by_grid(audio, g)def hq_reverse(    audio: np.ndarray,    sample_rate: int,    tempo: float = 120.0,    beats_per_bar: int = 4,    **kwargs):    """    HQ_REVERSE:    Deterministic beat-level structural reverse.    One slice per beat.    """    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)    g = grid.build_grid(len(audio), unit="beat")    return _reverse_by_grid(audio, g)def studio_reverse(    audio: np.ndarray,    sample_rate: int,    tempo: float = 120.0,    beats_per_bar: int = 4,    bars_per_slice: int = 1,    **kwargs):    """    STUDIO_REVERSE (guaranteed multi-bar reverse):    - Slices audio into N-bar chunks    - Reverses the ORDER of the chunks    - Ensures at least 2 slices so reversal is audible    """    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)    # Compute slice size    slice_samples = grid.bar_samples * bars_per_slice    total = len(audio)    # Build grid    import numpy as np    grid_points = np.arange(0, total, slice_samples, dtype=int)    # Guarantee at least 2 slices    if len(grid_points) < 2:        # Force a midpoint slice        midpoint = total // 2        grid_points = np.array([0, midpoint, total], dtype=int)    else:        # Append final endpoint if missing        if grid_points[-1] != total:            grid_points = np.append(grid_points, total)    # Slice → reverse order → concatenate    segments = [audio[start:end] for start, end in zip(grid_points[:-1], grid_points[1:])]    segments = segments[::-1]    out = np.concatenate(segments, axis=0)    # Pad/trim to match original length    if len(out) > total:        out = out[:total]    elif len(out) < total:        if audio.ndim == 1:            out = np.pad(out, (0, total - len(out)))        else:            out = np.pad(out, ((0, total - len(out)), (0, 0)))    return out.astype(np.float32)def tatum_reverse(    audio: np.ndarray,    sample_rate: int,    tempo: float = 120.0,    beats_per_bar: int = 4,    tatum_fraction: float = 0.25,    **kwargs):    """    TATUM_REVERSE:    Sub-beat structural reverse.    tatum_fraction:        0.25 -> 1/4 beat        0.33 -> ~triplet        0.5  -> 1/2 beat    """    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)    g = grid.build_grid(len(audio), unit="subdivision", fraction=tatum_fraction)    return _reverse_by_grid(audio, g)def true_reverse(audio: np.ndarray, sample_rate: int, **kwargs):    """    Classic tape-style reverse: flip waveform.    """    if audio.ndim == 1:        out = audio[::-1]    else:        out = audio[::-1, :]    return out.astype(np.float32)
\ No newline at end of file
+# core/dsp/reverse_modes.py
+
+import numpy as np
+from core.timing.grid import TimingGrid
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.declick import declick
+from core.dsp.granular import grain_reverse_ola
+from core.io.audio_buffer import AudioBuffer, as_array
+
+
+
+
+def _reverse_by_grid(audio: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Helper: slice audio by grid, reverse order of slices, keep audio inside slices forward.
+    Works for mono or stereo.
+    """
+    return SlicePlan.from_grid(grid, len(audio)).render(audio)
+
+
+def _render(plan: SlicePlan, audio, options: dict) -> np.ndarray:
+    """
+    Render a mode's plan, honouring the optional execution kwargs every
+    mode accepts: out (preallocated float32 buffer), progress, cancel,
+    threads (parallel copy, see SlicePlan.read), plus crossfade (frames
+    of declick crossfade at every slice boundary, see declick()).
+    An AudioBuffer in gives an AudioBuffer out (out may be one as well).
+    """
+    out = options.get("out")
+    rendered = plan.render(
+        as_array(audio),
+        out=as_array(out),
+        progress=options.get("progress"),
+        cancel=options.get("cancel"),
+        threads=options.get("threads"),
+    )
+    if options.get("crossfade"):
+        declick(plan, audio, rendered, crossfade=options["crossfade"])
+    if isinstance(out, AudioBuffer):
+        out.touch()
+        return out
+    if isinstance(audio, AudioBuffer):
+        return AudioBuffer(rendered, audio.sample_rate)
+    return rendered
+
+
+# -------------------------------------------------------------------
+# SLICE PLANS (output frame -> source frame, no audio touched)
+# -------------------------------------------------------------------
+def subdivision_reverse_plan(
+    total_samples: int,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    subdivision: float = 0.25,
+    **kwargs
+) -> SlicePlan:
+    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+    g = grid.build_grid(total_samples, unit="subdivision", fraction=subdivision)
+    return SlicePlan.from_grid(g, total_samples)
+
+
+def hq_reverse_plan(
+    total_samples: int,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    **kwargs
+) -> SlicePlan:
+    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+    g = grid.build_grid(total_samples, unit="beat")
+    return SlicePlan.from_grid(g, total_samples)
+
+
+def studio_reverse_plan(
+    total_samples: int,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    bars_per_slice: int = 1,
+    **kwargs
+) -> SlicePlan:
+    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+
+    # Compute slice size
+    slice_samples = grid.bar_samples * bars_per_slice
+    total = total_samples
+
+    # Build grid
+    grid_points = np.arange(0, total, slice_samples, dtype=int)
+
+    # Guarantee at least 2 slices
+    if len(grid_points) < 2:
+        # Force a midpoint slice
+        midpoint = total // 2
+        grid_points = np.array([0, midpoint, total], dtype=int)
+    else:
+        # Append final endpoint if missing
+        if grid_points[-1] != total:
+            grid_points = np.append(grid_points, total)
+
+    return SlicePlan.from_grid(grid_points, total)
+
+
+def tatum_reverse_plan(
+    total_samples: int,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    **kwargs
+) -> SlicePlan:
+    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+    g = grid.build_grid(total_samples, unit="subdivision", fraction=tatum_fraction)
+    return SlicePlan.from_grid(g, total_samples)
+
+
+def true_reverse_plan(total_samples: int, sample_rate: int, **kwargs) -> SlicePlan:
+    return SlicePlan.flip(total_samples)
+
+
+# -------------------------------------------------------------------
+# MODES (render the plan)
+# -------------------------------------------------------------------
+def quarterbeat_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    subdivision: float = 0.25,
+    **kwargs
+):
+    plan = subdivision_reverse_plan(len(audio), sample_rate, tempo, beats_per_bar, subdivision)
+    return _render(plan, audio, kwargs)
+
+def qbeat_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    subdivision: float = 0.25,
+    **kwargs
+):
+    """
+    QBEAT_REVERSE:
+    Deterministic quarter-beat structural reverse.
+    No detection, DAW-style timing.
+    """
+    plan = subdivision_reverse_plan(len(audio), sample_rate, tempo, beats_per_bar, subdivision)
+    return _render(plan, audio, kwargs)
+
+
+def hq_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    **kwargs
+):
+    """
+    HQ_REVERSE:
+    Deterministic beat-level structural reverse.
+    One slice per beat.
+    """
+    plan = hq_reverse_plan(len(audio), sample_rate, tempo, beats_per_bar)
+    return _render(plan, audio, kwargs)
+
+
+def studio_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    bars_per_slice: int = 1,
+    **kwargs
+):
+    """
+    STUDIO_REVERSE (guaranteed multi-bar reverse):
+    - Slices audio into N-bar chunks
+    - Reverses the ORDER of the chunks
+    - Ensures at least 2 slices so reversal is audible
+    """
+    plan = studio_reverse_plan(len(audio), sample_rate, tempo, beats_per_bar, bars_per_slice)
+    return _render(plan, audio, kwargs)
+
+def tatum_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    **kwargs
+):
+    """
+    TATUM_REVERSE:
+    Sub-beat structural reverse.
+    tatum_fraction:
+        0.25 -> 1/4 beat
+        0.33 -> ~triplet
+        0.5  -> 1/2 beat
+    """
+    plan = tatum_reverse_plan(len(audio), sample_rate, tempo, beats_per_bar, tatum_fraction)
+    return _render(plan, audio, kwargs)
+
+
+def grain_reverse(
+    audio: np.ndarray,
+    sample_rate: int,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    grain_fraction: float = 0.125,
+    overlap: float = 0.5,
+    **kwargs
+):
+    """
+    GRAIN_REVERSE:
+    Granular reverse locked to the TimingGrid.
+    - Grain length is one subdivision (grain_fraction of a beat,
+      0.125 -> 1/8 beat, ~60 ms at 128 BPM)
+    - Each Hann-windowed grain plays backwards in place
+    - Grains overlap by overlap (0.5 -> a grain starts every half grain)
+    Not a slice permutation, so it has no SlicePlan.
+    """
+    grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+    grain = grid.subdivision_samples(grain_fraction)
+    hop = max(int(grain * (1.0 - overlap)), 1)
+
+    out = kwargs.get("out")
+    rendered = grain_reverse_ola(
+        as_array(audio),
+        grain,
+        hop,
+        out=as_array(out),
+        progress=kwargs.get("progress"),
+        cancel=kwargs.get("cancel"),
+    )
+    if isinstance(out, AudioBuffer):
+        out.touch()
+        return out
+    if isinstance(audio, AudioBuffer):
+        return AudioBuffer(rendered, audio.sample_rate)
+    return rendered
+
+
+def true_reverse(audio: np.ndarray, sample_rate: int, **kwargs):
+    """
+    Classic tape-style reverse: flip waveform.
+    """
+    plan = true_reverse_plan(len(audio), sample_rate)
+    return _render(plan, audio, kwargs)
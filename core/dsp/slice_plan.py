@@ -0,0 +1,423 @@
+# core/dsp/slice_plan.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+
+# Largest contiguous copy between progress / cancel checkpoints (frames)
+RENDER_BLOCK = 1 << 16
+
+# Renders smaller than this (output bytes) always run on the calling thread
+PARALLEL_MIN_BYTES = 32 << 20
+
+_render_threads = os.cpu_count() or 1
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Unsigned ints the size of one frame, for moving whole frames as one item
+_FRAME_ITEMS = {2: np.uint16, 4: np.uint32, 8: np.uint64}
+
+
+def as_frames(a):
+    """
+    View of a (..., frames, channels) array with one integer item per
+    frame (e.g. stereo float32 -> uint64), or a unchanged when frames are
+    not a 2/4/8-byte contiguous block. Backward (step -1) copies are several
+    times faster on frame items than on interleaved samples.
+    """
+    if not isinstance(a, np.ndarray) or a.ndim < 2 or a.strides[-1] != a.itemsize:
+        return a
+    item = _FRAME_ITEMS.get(a.shape[-1] * a.itemsize)
+    if item is None:
+        return a
+    return a.view(item)[..., 0]
+
+
+def set_render_threads(threads: int):
+    """Default thread count for large renders (1 disables parallel rendering)."""
+    global _render_threads
+    _render_threads = max(int(threads), 1)
+
+
+def get_render_threads() -> int:
+    return _render_threads
+
+
+def _render_pool(threads: int) -> ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(threads)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="dre-copy")
+            _pools[threads] = pool
+        return pool
+
+
+@dataclass
+class SlicePlan:
+    """
+    Output-frame -> source-frame map for the deterministic permutation modes.
+
+    Segment i covers output frames [dst[i], dst[i] + length[i]) and reads the
+    source starting at frame src[i], walking forward (step = 1) or backward
+    (step = -1). Every grid mode is a handful of these segments, so a plan
+    costs a few bytes per slice instead of a full copy of the audio.
+    """
+    total: int
+    dst: np.ndarray
+    src: np.ndarray
+    length: np.ndarray
+    step: np.ndarray
+
+    # ---------------------------------------------------------------
+    # Constructors
+    # ---------------------------------------------------------------
+    @classmethod
+    def from_segments(cls, total: int, src, length, step=None):
+        """
+        Build a plan from source segments listed in output order.
+        Zero-length segments are dropped.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        length = np.asarray(length, dtype=np.int64)
+        if step is None:
+            step = np.ones(len(src), dtype=np.int64)
+        step = np.asarray(step, dtype=np.int64)
+
+        keep = length > 0
+        src, length, step = src[keep], length[keep], step[keep]
+
+        dst = np.zeros(len(length), dtype=np.int64)
+        if len(length) > 1:
+            np.cumsum(length[:-1], out=dst[1:])
+
+        return cls(total=int(total), dst=dst, src=src, length=length, step=step)
+
+    @classmethod
+    def identity(cls, total: int):
+        return cls.from_segments(total, [0], [total])
+
+    @classmethod
+    def flip(cls, total: int):
+        """Tape-style reverse: output frame n reads source frame total - 1 - n."""
+        return cls.from_segments(total, [total - 1], [total], [-1])
+
+    @classmethod
+    def from_grid(cls, grid, total: int):
+        """
+        Slice by grid points [0, ..., total], reverse the ORDER of the slices,
+        keep audio inside each slice forward.
+        """
+        grid = np.asarray(grid, dtype=np.int64)
+        starts = grid[:-1][::-1]
+        lengths = (grid[1:] - grid[:-1])[::-1]
+        return cls.from_segments(total, starts, lengths)
+
+    # ---------------------------------------------------------------
+    # Introspection
+    # ---------------------------------------------------------------
+    @property
+    def boundaries(self) -> np.ndarray:
+        """Output frames where one source segment butts against the next."""
+        return self.dst[1:]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.dst.nbytes + self.src.nbytes + self.length.nbytes + self.step.nbytes)
+
+    def __len__(self):
+        return self.total
+
+    def source_index(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Source frame for every output frame in [start, stop)."""
+        if stop is None:
+            stop = self.total
+        idx = np.empty(max(stop - start, 0), dtype=np.int64)
+        for i, off, n in self._walk(start, stop):
+            pos = self.dst[i] + off - start
+            first = self.src[i] + off * self.step[i]
+            idx[pos:pos + n] = first + np.arange(n, dtype=np.int64) * self.step[i]
+        return idx
+
+    def map_position(self, frame: int) -> int:
+        """Source frame read by a single output frame."""
+        frame = min(max(int(frame), 0), max(self.total - 1, 0))
+        i = int(np.searchsorted(self.dst, frame, side="right")) - 1
+        if i < 0:
+            return frame
+        return int(self.src[i] + (frame - self.dst[i]) * self.step[i])
+
+    # ---------------------------------------------------------------
+    # Algebra
+    # ---------------------------------------------------------------
+    def then(self, other: "SlicePlan") -> "SlicePlan":
+        """
+        Compose two plans: apply self, then apply other to the result.
+        The composite reads the original source directly, so any chain of
+        edits renders with a single gather.
+        """
+        if other.total != self.total:
+            raise ValueError(
+                f"Cannot compose plans of {self.total} and {other.total} frames"
+            )
+
+        src, length, step = [], [], []
+        for j in range(len(other.length)):
+            n = int(other.length[j])
+            k = int(other.step[j])
+            first = int(other.src[j])
+            lo = first if k > 0 else first - n + 1
+
+            pieces = list(self._walk(lo, lo + n))
+            if k < 0:
+                pieces.reverse()
+
+            for i, off, m in pieces:
+                s = int(self.src[i])
+                ks = int(self.step[i])
+                if k > 0:
+                    src.append(s + off * ks)
+                    step.append(ks)
+                else:
+                    src.append(s + (off + m - 1) * ks)
+                    step.append(-ks)
+                length.append(m)
+
+        return SlicePlan.from_segments(self.total, src, length, step).coalesce()
+
+    def inverse(self) -> "SlicePlan":
+        """
+        Source frame -> output frame map (plans from the grid modes are
+        bijections, so this is exact).
+        """
+        n = self.length
+        fwd = self.step > 0
+        lo = np.where(fwd, self.src, self.src - n + 1)
+        first = np.where(fwd, self.dst, self.dst + n - 1)
+
+        order = np.argsort(lo, kind="stable")
+        lo = lo[order]
+        if len(lo) and (lo[0] != 0 or np.any(lo[1:] != lo[:-1] + n[order][:-1])):
+            raise ValueError("SlicePlan is not a permutation; it has no inverse")
+
+        return SlicePlan.from_segments(self.total, first[order], n[order], self.step[order])
+
+    def coalesce(self) -> "SlicePlan":
+        """Merge neighbouring segments that continue each other in the source."""
+        if len(self.length) < 2:
+            return self
+
+        src, length, step = [int(self.src[0])], [int(self.length[0])], [int(self.step[0])]
+        for s, n, k in zip(self.src[1:], self.length[1:], self.step[1:]):
+            s, n, k = int(s), int(n), int(k)
+            if k == step[-1] and s == src[-1] + length[-1] * k:
+                length[-1] += n
+            else:
+                src.append(s)
+                length.append(n)
+                step.append(k)
+
+        return SlicePlan.from_segments(self.total, src, length, step)
+
+    # ---------------------------------------------------------------
+    # Rendering
+    # ---------------------------------------------------------------
+    def _walk(self, start: int, stop: int, block: int = None):
+        """
+        Yield (segment, offset into segment, frames) covering [start, stop).
+        With block set, long segments are split into pieces of at most
+        block frames.
+        """
+        stop = min(stop, self.total)
+        if start >= stop:
+            return
+        i = int(np.searchsorted(self.dst, start, side="right")) - 1
+        pos = start
+        while pos < stop:
+            off = pos - int(self.dst[i])
+            n = min(int(self.length[i]) - off, stop - pos)
+            if block is not None:
+                n = min(n, block)
+            yield i, off, n
+            pos += n
+            if off + n >= self.length[i]:
+                i += 1
+
+    def read(
+        self,
+        source,
+        start: int,
+        stop: int,
+        out: np.ndarray = None,
+        progress=None,
+        cancel=None,
+        threads: int = None,
+    ) -> np.ndarray:
+        """
+        Gather output frames [start, stop) from source.
+        source only needs len() and slicing, so a plan can read through
+        another virtual buffer.
+
+        progress: optional callable receiving the completed fraction (0..1)
+        cancel:   optional CancelToken, polled between slice blocks
+        threads:  split the output range into this many contiguous chunks
+                  filled concurrently (NumPy copies release the GIL).
+                  Default: set_render_threads() for outputs of at least
+                  PARALLEL_MIN_BYTES, otherwise 1.
+        """
+        start = max(int(start), 0)
+        stop = min(int(stop), self.total)
+        frames = max(stop - start, 0)
+
+        if out is None:
+            out = np.empty((frames,) + tuple(source.shape[1:]), dtype=np.float32)
+
+        if threads is None:
+            threads = _render_threads if out.nbytes >= PARALLEL_MIN_BYTES else 1
+        threads = min(int(threads), max(frames // RENDER_BLOCK, 1))
+        if threads > 1:
+            return self._read_parallel(source, start, stop, out, progress, cancel, threads)
+
+        # Only split segments into blocks when somebody is listening
+        block = RENDER_BLOCK if (progress is not None or cancel is not None) else None
+        done = 0
+
+        for i, off, n in self._walk(start, stop, block):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+
+            pos = int(self.dst[i]) + off - start
+            if self.step[i] > 0:
+                s = int(self.src[i]) + off
+                out[pos:pos + n] = source[s:s + n]
+            else:
+                s = int(self.src[i]) - off
+                block = source[s - n + 1:s + 1]
+                dest = out[pos:pos + n]
+                if isinstance(block, np.ndarray) and block.dtype == dest.dtype:
+                    block, dest = as_frames(block), as_frames(dest)
+                dest[...] = block[::-1]
+
+            if progress is not None:
+                done += n
+                progress(done / frames)
+
+        return out
+
+    def _read_parallel(self, source, start, stop, out, progress, cancel, threads):
+        """read() with [start, stop) cut into one contiguous chunk per thread."""
+        frames = stop - start
+        bounds = np.linspace(start, stop, threads + 1).astype(np.int64)
+
+        lock = threading.Lock()
+        fractions = np.zeros(threads)
+        sizes = np.diff(bounds)
+
+        def chunk_progress(k):
+            def report(fraction):
+                with lock:
+                    fractions[k] = fraction
+                    progress(float(fractions @ sizes) / frames)
+            return report
+
+        pool = _render_pool(threads)
+        futures = [
+            pool.submit(
+                self.read,
+                source,
+                int(bounds[k]),
+                int(bounds[k + 1]),
+                out=out[bounds[k] - start:bounds[k + 1] - start],
+                progress=chunk_progress(k) if progress is not None else None,
+                cancel=cancel,
+                threads=1,
+            )
+            for k in range(threads)
+        ]
+
+        # Let every chunk finish (or notice the cancel) before out is
+        # handed back, then surface the first failure
+        wait(futures)
+        for f in futures:
+            f.result()
+        return out
+
+    def render(
+        self,
+        source,
+        out: np.ndarray = None,
+        progress=None,
+        cancel=None,
+        threads: int = None,
+    ) -> np.ndarray:
+        """Materialize the whole plan (float32, same layout as source)."""
+        return self.read(source, 0, self.total, out=out, progress=progress, cancel=cancel, threads=threads)
+
+    # ---------------------------------------------------------------
+    # In place
+    # ---------------------------------------------------------------
+    @property
+    def in_place_capable(self) -> bool:
+        """
+        True when the plan is contiguous source slices in reverse order
+        (every grid mode) or a tape flip, which render_in_place() can
+        apply without a second buffer.
+        """
+        if len(self.length) == 0:
+            return True
+        if len(self.length) == 1 and self.step[0] < 0:
+            return int(self.src[0]) == self.total - 1 and int(self.length[0]) == self.total
+        if np.any(self.step != 1) or int(self.src[-1]) != 0 or int(self.length.sum()) != self.total:
+            return False
+        return bool(np.all(self.src[:-1] == self.src[1:] + self.length[1:]))
+
+    def render_in_place(self, buffer: np.ndarray, progress=None, cancel=None) -> np.ndarray:
+        """
+        Apply the plan to buffer, overwriting it (needs in_place_capable).
+
+        Reversing the order of the slices is reversing the whole buffer
+        and then each slice back: two passes over the audio instead of
+        one, but the only extra memory is a RENDER_BLOCK swap buffer.
+        """
+        if not self.in_place_capable:
+            raise ValueError("SlicePlan cannot be rendered in place")
+        if len(buffer) != self.total:
+            raise ValueError(f"Plan covers {self.total} frames but buffer has {len(buffer)}")
+
+        frames = as_frames(buffer)
+        scratch = np.empty((min(RENDER_BLOCK, self.total // 2 or 1),) + frames.shape[1:], dtype=frames.dtype)
+
+        _reverse_in_place(frames, 0, self.total, scratch, cancel)
+        if progress is not None:
+            progress(0.5)
+        if len(self.length) == 1 and self.step[0] < 0:
+            if progress is not None:
+                progress(1.0)
+            return buffer
+
+        done = 0
+        for d, n in zip(self.dst.tolist(), self.length.tolist()):
+            _reverse_in_place(frames, d, d + n, scratch, cancel)
+            done += n
+            if progress is not None and done % RENDER_BLOCK < n:
+                progress(0.5 + 0.5 * done / self.total)
+        if progress is not None:
+            progress(1.0)
+        return buffer
+
+
+def _reverse_in_place(a: np.ndarray, lo: int, hi: int, scratch: np.ndarray, cancel=None):
+    """Reverse a[lo:hi] by swapping blocks from both ends through scratch."""
+    while hi - lo > 1:
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        n = min(len(scratch), (hi - lo) // 2)
+        tmp = scratch[:n]
+        tmp[...] = a[lo:lo + n]
+        a[lo:lo + n] = a[hi - n:hi][::-1]
+        a[hi - n:hi] = tmp[::-1]
+        lo += n
+        hi -= n
@@ -0,0 +1,130 @@
+# core/dsp/streaming.py
+
+import numpy as np
+
+from core.dsp.slice_plan import as_frames
+from core.timing.grid import TimingGrid
+
+
+class StreamingReverser:
+    """
+    Block-based reverse for live input (an audio device callback, or a
+    plugin host handing over fixed-size blocks).
+
+    Input arrives in blocks of any size; every completed TimingGrid window
+    (a beat, a subdivision, or N bars) is played back reversed while the
+    next one is being captured. Output therefore runs exactly one window
+    (latency frames) behind input, the least a reverse can manage, and is
+    silent until the first window has been heard.
+
+    All storage is one preallocated ring of two windows (the one being
+    captured, the one being played back reversed). process() writes into
+    a caller-supplied out block and allocates nothing, so it is safe to
+    call from a real-time audio callback.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        tempo: float = 120.0,
+        beats_per_bar: int = 4,
+        unit: str = "bar",
+        bars: int = 1,
+        fraction: float = 0.25,
+    ):
+        grid = TimingGrid(sample_rate=sample_rate, tempo=tempo, beats_per_bar=beats_per_bar)
+        if unit == "beat":
+            window = grid.beat_samples
+        elif unit == "bar":
+            window = grid.bar_samples * int(bars)
+        elif unit == "subdivision":
+            window = grid.subdivision_samples(fraction)
+        else:
+            raise ValueError(f"Unknown unit for StreamingReverser: {unit}")
+
+        self.sample_rate = sample_rate
+        self.channels = int(channels)
+        self.window = max(int(window), 1)
+        self._ring = np.zeros((2 * self.window, self.channels), dtype=np.float32)
+        self.position = 0               # input frames consumed
+
+    @property
+    def latency(self) -> int:
+        """Frames between a sample going in and its window coming out."""
+        return self.window
+
+    def reset(self):
+        self._ring[...] = 0
+        self.position = 0
+
+    # ---------------------------------------------------------------
+    # Blocks
+    # ---------------------------------------------------------------
+    def process(self, block, out: np.ndarray = None) -> np.ndarray:
+        """
+        Push one input block ((frames,) or (frames, channels)) and fill out
+        (same number of frames, float32) with the matching output frames.
+        """
+        x = np.asarray(block)
+        n = len(x)
+        if out is None:
+            shape = (n,) if x.ndim == 1 and self.channels == 1 else (n, self.channels)
+            out = np.empty(shape, dtype=np.float32)
+        x2 = x[:, None] if x.ndim == 1 else x
+        o2 = out[:, None] if out.ndim == 1 else out
+
+        done = 0
+        while done < n:
+            k = self._step(x2[done:], o2[done:], n - done)
+            done += k
+        return out
+
+    def _step(self, x, out, n: int) -> int:
+        """Move up to the next window boundary; returns frames handled."""
+        w = self.window
+        t = self.position
+        off = t % w
+        k = min(n, w - off)
+
+        # Capture into this window's half of the ring (never wraps: the
+        # halves line up with window boundaries)
+        cur = ((t // w) % 2) * w
+        self._ring[cur + off:cur + off + k] = x[:k]
+
+        # Play the previous window backwards from where we left off
+        dest = out[:k]
+        if t < w:
+            dest[...] = 0
+        else:
+            prev = w - cur
+            src = self._ring[prev + w - off - k:prev + w - off]
+            d, s = dest, src
+            if dest.dtype == src.dtype:
+                d, s = as_frames(dest), as_frames(src)
+                if d is dest or s is src:
+                    d, s = dest, src
+            d[...] = s[::-1]
+
+        self.position += k
+        return k
+
+    def flush(self) -> np.ndarray:
+        """
+        Frames still owed once input has ended, as (frames, channels): the
+        rest of the window being played, then the last (partial) window
+        reversed. Resets the reverser.
+        """
+        w = self.window
+        t = self.position
+        off = t % w
+        cur = ((t // w) % 2) * w
+        parts = []
+        if t >= w:
+            prev = w - cur
+            parts.append(self._ring[prev:prev + w - off][::-1])
+        parts.append(self._ring[cur:cur + off][::-1])
+        tail = np.concatenate(parts).astype(np.float32)
+        self.reset()
+        return tail
+
@@ -0,0 +1,86 @@
+# core/dsp/virtual_buffer.py
+
+import numpy as np
+
+from core.dsp.declick import declick
+from core.dsp.slice_plan import SlicePlan
+
+
+class VirtualBuffer:
+    """
+    Read-only, array-like view of a SlicePlan applied to a source buffer.
+
+    Nothing is rendered up front: slicing gathers just the requested frames
+    through the plan, so playback and the waveform can audition a mode the
+    moment the plan is built. Call materialize() (or np.asarray) when a real
+    array is needed, e.g. for export.
+
+    crossfade: declick every slice boundary over this many frames (see
+    declick()); each read only mixes the boundaries it overlaps.
+    """
+
+    def __init__(self, source, plan: SlicePlan, crossfade: int = 0):
+        if plan.total != len(source):
+            raise ValueError(
+                f"Plan covers {plan.total} frames but source has {len(source)}"
+            )
+        self.source = source
+        self.plan = plan
+        self.crossfade = crossfade
+
+    # ---------------------------------------------------------------
+    # ndarray-like surface (what the GUI and soundfile poke at)
+    # ---------------------------------------------------------------
+    @property
+    def shape(self):
+        return (self.plan.total,) + tuple(self.source.shape[1:])
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float32)
+
+    def __len__(self):
+        return self.plan.total
+
+    def __getitem__(self, key):
+        rest = ()
+        if isinstance(key, tuple):
+            key, rest = key[0], key[1:]
+
+        if isinstance(key, slice):
+            start, stop, stride = key.indices(len(self))
+            if stride != 1:
+                raise IndexError("VirtualBuffer only supports contiguous frame slices")
+            out = self.read(start, stop)
+            return out[(slice(None),) + rest] if rest else out
+
+        frame = int(key)
+        if frame < 0:
+            frame += len(self)
+        if not 0 <= frame < len(self):
+            raise IndexError(f"Frame {key} out of range for {len(self)} frames")
+        out = self.read(frame, frame + 1)[0]
+        return out[rest] if rest else out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.materialize()
+        return out if dtype is None else out.astype(dtype)
+
+    # ---------------------------------------------------------------
+    # Reads
+    # ---------------------------------------------------------------
+    def read(self, start: int, stop: int, out: np.ndarray = None) -> np.ndarray:
+        out = self.plan.read(self.source, start, stop, out=out)
+        if self.crossfade:
+            declick(self.plan, self.source, out, start=max(int(start), 0), crossfade=self.crossfade)
+        return out
+
+    def materialize(self, out: np.ndarray = None) -> np.ndarray:
+        out = self.plan.render(self.source, out=out)
+        if self.crossfade:
+            declick(self.plan, self.source, out, crossfade=self.crossfade)
+        return out
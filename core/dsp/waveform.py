@@ -0,0 +1,21 @@
+# core/dsp/waveform.py
+
+import numpy as np
+
+
+def waveform_peaks(audio, samples: int = 2000) -> np.ndarray:
+    """
+    Peak (max |x| of the channel mean) of about samples equal blocks, for
+    drawing a waveform overview.
+
+    Works for mono, (frames, channels) and VirtualBuffer views: only one
+    peak block is gathered at a time.
+    """
+    step = max(1, len(audio) // samples)
+    peaks = []
+    for i in range(0, len(audio), step):
+        chunk = audio[i:i + step]
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+        peaks.append(np.max(np.abs(chunk)))
+    return np.array(peaks)
@@ -1 +1,29 @@
-import jsonclass GatingEngine:    def __init__(self, rules_path="config/economic/gating_rules.json"):        with open(rules_path, "r") as f:            self.rules = json.load(f)    def apply(self, tier, datacost):        """        Applies gating rules based on tier and cost.        Returns a dict with gate status and multiplier.        """        tier_rules = self.rules.get(tier, {})        max_cost = tier_rules.get("max_cost", float("inf"))        multiplier = tier_rules.get("multiplier", 1.0)        if datacost > max_cost:            return {                "gate_status": "premium_required",                "multiplier": multiplier,                "explanation": f"Cost {datacost} exceeds tier limit {max_cost}."            }        return {            "gate_status": "allowed",            "multiplier": multiplier,            "explanation": "Within tier limits."        }
\ No newline at end of file
+import json
+
+class GatingEngine:
+    def __init__(self, rules_path="config/economic/gating_rules.json"):
+        with open(rules_path, "r") as f:
+            self.rules = json.load(f)
+
+    def apply(self, tier, datacost):
+        """
+        Applies gating rules based on tier and cost.
+        Returns a dict with gate status and multiplier.
+        """
+        tier_rules = self.rules.get(tier, {})
+
+        max_cost = tier_rules.get("max_cost", float("inf"))
+        multiplier = tier_rules.get("multiplier", 1.0)
+
+        if datacost > max_cost:
+            return {
+                "gate_status": "premium_required",
+                "multiplier": multiplier,
+                "explanation": f"Cost {datacost} exceeds tier limit {max_cost}."
+            }
+
+        return {
+            "gate_status": "allowed",
+            "multiplier": multiplier,
+            "explanation": "Within tier limits."
+        }
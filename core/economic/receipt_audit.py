@@ -0,0 +1,300 @@
+# core/economic/receipt_audit.py
+
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+import soundfile as sf
+
+from core.economic.receipt_generator import HASH_BLOCK, hash_audio_file, sign_receipt
+
+# Result statuses
+STATUSES = ("ok", "mismatch", "error")
+
+# Seconds between fsyncs of the checkpoint (every line is written through
+# to the OS immediately, so only a power loss can drop the last interval)
+CHECKPOINT_SYNC = 1.0
+
+# Jobs queued per worker; bounds the receipts held in the parent
+PENDING_PER_WORKER = 4
+
+
+# -------------------------------------------------------------------
+# Receipt formats
+# -------------------------------------------------------------------
+
+def receipt_format(receipt: dict) -> str:
+    """
+    "receipt" for generate_receipt() (carries mode and tier), "legacy" for
+    the older ReceiptGenerator, which hashes audio.tolist() as JSON and
+    signs the receipt with "signature": None in it.
+    """
+    return "receipt" if "mode" in receipt and "tier" in receipt else "legacy"
+
+
+def legacy_sign_receipt(receipt: dict) -> str:
+    """ReceiptGenerator's signature of a receipt."""
+    body = dict(receipt, signature=None)
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+def legacy_hash_audio_file(path, block_size: int = HASH_BLOCK) -> str:
+    """
+    ReceiptGenerator's audio hash (sha256 of json.dumps(audio.tolist())) of
+    the file as load_audio() decodes it, built one block of JSON text at a
+    time instead of as one list and one string for the whole file.
+    """
+    h = hashlib.sha256()
+    h.update(b"[")
+    first = True
+    for block in sf.blocks(path, blocksize=block_size, dtype="float32", always_2d=False):
+        if not len(block):
+            continue
+        if not first:
+            h.update(b", ")
+        h.update(json.dumps(block.tolist())[1:-1].encode())
+        first = False
+    h.update(b"]")
+    return h.hexdigest()
+
+
+def verify_receipt(receipt: dict, input_path=None, output_path=None, block_size: int = HASH_BLOCK) -> dict:
+    """
+    Recompute a receipt's signature and, for the files given, its input /
+    output hashes. Returns the checks (True / False, None when a file was
+    not given) and status "ok" or "mismatch".
+
+    Hashes cover the float32 samples as decoded, so an output file only
+    matches when it stores the render exactly (FLOAT / DOUBLE, or PCM when
+    the render was already on the PCM grid); a mismatching file's subtype
+    is reported. The signature is an unkeyed hash: it detects edited or
+    corrupted receipts, not forged ones.
+    """
+    fmt = receipt_format(receipt)
+    sign = sign_receipt if fmt == "receipt" else legacy_sign_receipt
+    hasher = hash_audio_file if fmt == "receipt" else legacy_hash_audio_file
+
+    result = {"format": fmt, "signature": receipt.get("signature") == sign(receipt)}
+    for field, path in (("input_hash", input_path), ("output_hash", output_path)):
+        if path is None:
+            result[field] = None
+            continue
+        actual = hasher(path, block_size)
+        result[field] = actual == receipt.get(field)
+        if not result[field]:
+            result[f"{field}_actual"] = actual
+            result[f"{field}_subtype"] = sf.info(path).subtype
+
+    checks = (result["signature"], result["input_hash"], result["output_hash"])
+    result["status"] = "ok" if all(c is not False for c in checks) else "mismatch"
+    return result
+
+
+# -------------------------------------------------------------------
+# Jobs
+# -------------------------------------------------------------------
+
+@dataclass
+class AuditJob:
+    """One receipt and the files it should describe (None = not checked)."""
+    receipt: dict
+    input: str = None
+    output: str = None
+    source: str = None      # where the receipt was read from
+
+    @property
+    def key(self) -> str:
+        """Checkpoint key: the same receipt against the same files."""
+        return f"{self.receipt.get('signature')}|{self.input or ''}|{self.output or ''}"
+
+
+def _records(path: str):
+    """JSON records of a file: a .jsonl line by line, else one object or list."""
+    if path.endswith(".jsonl"):
+        with open(path, "r") as f:
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{n}: {e}") from None
+        return
+    with open(path, "r") as f:
+        data = json.load(f)
+    yield from data if isinstance(data, list) else [data]
+
+
+def iter_jobs(sources, input=None, output=None):
+    """
+    AuditJobs from receipt / manifest files (lazily, so a manifest of any
+    size is never held in memory).
+
+    A record is either a bare receipt, checked against input / output, or
+    a manifest entry:
+
+        {"receipt": {...} | "receipt_path": "r.json", "input": "a.wav", "output": "b.wav"}
+
+    Relative paths in a manifest entry are taken from the file's folder.
+    """
+    input = None if input is None else os.path.abspath(input)
+    output = None if output is None else os.path.abspath(output)
+    for source in sources:
+        base = os.path.dirname(os.path.abspath(source))
+
+        def resolve(p):
+            return None if p is None else os.path.normpath(os.path.join(base, p))
+
+        for n, rec in enumerate(_records(source)):
+            if not isinstance(rec, dict):
+                raise ValueError(f"{source}: record {n} is not a JSON object")
+            if "receipt" in rec or "receipt_path" in rec:
+                receipt = rec.get("receipt")
+                if receipt is None:
+                    with open(resolve(rec["receipt_path"]), "r") as f:
+                        receipt = json.load(f)
+                yield AuditJob(receipt, resolve(rec.get("input")), resolve(rec.get("output")), source)
+            else:
+                yield AuditJob(rec, input, output, source)
+
+
+# -------------------------------------------------------------------
+# Checkpoint
+# -------------------------------------------------------------------
+
+class AuditCheckpoint:
+    """
+    Append-only JSON lines record of every verified job (its full result),
+    so an interrupted audit resumes where it stopped. Each line goes
+    straight to the OS; a torn last line is ignored on replay.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._status = {}       # key -> last status
+        self._synced = time.monotonic()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._status[rec["key"]] = rec["status"]
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a torn line so it does not swallow the next record
+                    os.write(self._fd, b"\n")
+
+    def done(self, key: str, retry_errors: bool = False) -> bool:
+        status = self._status.get(key)
+        return status is not None and not (retry_errors and status == "error")
+
+    def record(self, result: dict):
+        line = json.dumps(dict(result, timestamp=time.time())) + "\n"
+        with self._lock:
+            os.write(self._fd, line.encode("utf-8"))
+            self._status[result["key"]] = result["status"]
+            if time.monotonic() - self._synced >= CHECKPOINT_SYNC:
+                os.fsync(self._fd)
+                self._synced = time.monotonic()
+
+    def counts(self) -> dict:
+        """Results per status over everything recorded (this run and earlier)."""
+        counts = dict.fromkeys(STATUSES, 0)
+        for status in self._status.values():
+            counts[status] += 1
+        return counts
+
+    def close(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+
+# -------------------------------------------------------------------
+# Audit
+# -------------------------------------------------------------------
+
+def _ignore_sigint():
+    # Ctrl-C is handled once, in the parent
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _verify_job(job: AuditJob, block_size: int) -> dict:
+    result = {"key": job.key, "source": job.source, "input": job.input, "output": job.output}
+    try:
+        result.update(verify_receipt(job.receipt, job.input, job.output, block_size=block_size))
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    return result
+
+
+def audit(
+    jobs,
+    workers: int = None,
+    checkpoint: str = None,
+    retry_errors: bool = False,
+    block_size: int = HASH_BLOCK,
+    on_result=None,
+) -> dict:
+    """
+    Verify AuditJobs (see iter_jobs) on a process pool; returns this run's
+    count per status plus "skipped" (already in the checkpoint) and, with
+    a checkpoint, "checkpoint": the counts over every run recorded in it.
+
+    Memory stays bounded however many receipts there are: jobs are pulled
+    from the iterator only as workers free up, every file is hashed in
+    block_size frames, and results are handed to on_result(result) and
+    the checkpoint (a path, see AuditCheckpoint) instead of collected.
+    With retry_errors, jobs that errored in an earlier run are redone.
+    """
+    workers = workers or os.cpu_count() or 1
+    ckpt = AuditCheckpoint(checkpoint) if checkpoint else None
+    counts = dict.fromkeys(STATUSES + ("skipped",), 0)
+
+    def finish(futures):
+        for f in futures:
+            result = f.result()
+            counts[result["status"]] += 1
+            if ckpt is not None:
+                ckpt.record(result)
+            if on_result is not None:
+                on_result(result)
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_ignore_sigint,
+    )
+    try:
+        pending = set()
+        for job in jobs:
+            if ckpt is not None and ckpt.done(job.key, retry_errors):
+                counts["skipped"] += 1
+                continue
+            pending.add(pool.submit(_verify_job, job, block_size))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                finish(finished)
+        finish(wait(pending).done)
+        if ckpt is not None:
+            counts["checkpoint"] = ckpt.counts()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if ckpt is not None:
+            ckpt.close()
+    return counts
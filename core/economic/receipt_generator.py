@@ -1 +1,75 @@
-import hashlibimport jsonimport timeimport numpy as npdef _hash_audio(audio: np.ndarray) -> str:    """Create a stable hash of audio data."""    audio_bytes = audio.tobytes()    return hashlib.sha256(audio_bytes).hexdigest()def generate_receipt(    input_audio: np.ndarray,    output_audio: np.ndarray,    metadata: dict,    mode: str,    tier: str,    datacostunits: float,    gating: dict,):    """Generate a cryptographic-style receipt for the reverse operation."""    timestamp = time.time()    receipt = {        "timestamp": timestamp,        "mode": mode,        "tier": tier,        "metadata": metadata,        "datacostunits": datacostunits,        "gating": gating,        "input_hash": _hash_audio(input_audio),        "output_hash": _hash_audio(output_audio),    }    # Signature = hash of entire receipt JSON    signature = hashlib.sha256(json.dumps(receipt, sort_keys=True).encode()).hexdigest()    receipt["signature"] = signature    return receipt
\ No newline at end of file
+import hashlib
+import json
+import time
+import numpy as np
+import soundfile as sf
+
+from core.io.audio_buffer import as_array
+from core.spans import span
+
+# Frames decoded per step when a file is hashed
+HASH_BLOCK = 1 << 16
+
+
+def _hash_audio(audio: np.ndarray) -> str:
+    """Create a stable hash of audio data."""
+    # Same bytes as audio.tobytes(), but hashed in place when the array is
+    # already C-contiguous (e.g. a shared-memory slab), instead of copied
+    with span("hash"):
+        return hashlib.sha256(np.ascontiguousarray(as_array(audio))).hexdigest()
+
+
+def hash_audio_file(path, block_size: int = HASH_BLOCK) -> str:
+    """
+    _hash_audio() of the file's audio as load_audio() decodes it (float32,
+    frames x channels), streamed block by block so memory stays bounded.
+    """
+    h = hashlib.sha256()
+    with span("hash"):
+        for block in sf.blocks(path, blocksize=block_size, dtype="float32", always_2d=False):
+            h.update(np.ascontiguousarray(block))
+    return h.hexdigest()
+
+
+def sign_receipt(receipt: dict) -> str:
+    """Signature of a receipt: hash of its JSON without the signature field."""
+    body = {k: v for k, v in receipt.items() if k != "signature"}
+    with span("sign"):
+        return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+def generate_receipt(
+    input_audio: np.ndarray,
+    output_audio: np.ndarray,
+    metadata: dict,
+    mode: str,
+    tier: str,
+    datacostunits: float,
+    gating: dict,
+    input_hash: str = None,
+    output_hash: str = None,
+):
+    """
+    Generate a cryptographic-style receipt for the reverse operation.
+    input_hash / output_hash may be passed when already known (e.g. from
+    the render cache); the corresponding audio is then not re-hashed and
+    may be None.
+    """
+
+    timestamp = time.time()
+
+    receipt = {
+        "timestamp": timestamp,
+        "mode": mode,
+        "tier": tier,
+        "metadata": metadata,
+        "datacostunits": datacostunits,
+        "gating": gating,
+        "input_hash": input_hash or _hash_audio(input_audio),
+        "output_hash": output_hash or _hash_audio(output_audio),
+    }
+
+    # Signature = hash of entire receipt JSON
+    receipt["signature"] = sign_receipt(receipt)
+
+    return receipt
@@ -0,0 +1,444 @@
+# core/economic/usage_log.py
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from multiprocessing import util as mp_util
+
+DEFAULT_LOG_PATH = os.path.join("logs", "a2a", "usage_log.jsonl")
+
+FSYNC_POLICIES = ("never", "interval", "commit")
+
+# Backoff between attempts to commit a batch that failed (seconds)
+RETRY_INITIAL = 0.05
+RETRY_MAX = 5.0
+
+# Attempts left for a failing batch once the writer is closing; after
+# that it is spilled to a sidecar file (see UsageLogWriter.spill_path)
+CLOSE_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+
+def usage_record(receipt: dict) -> dict:
+    """One usage_log.jsonl line for a receipt from generate_receipt()."""
+    return {
+        "timestamp": receipt.get("timestamp", time.time()),
+        "mode": receipt.get("mode"),
+        "tier": receipt.get("tier"),
+        "datacostunits": receipt.get("datacostunits"),
+        "gating": receipt.get("gating"),
+        "metadata": receipt.get("metadata"),
+        "receipt_signature": receipt.get("signature"),
+    }
+
+
+# -------------------------------------------------------------------
+# Cross-process file lock (one commit = one locked append)
+# -------------------------------------------------------------------
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.name == "nt":
+            import msvcrt
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+# -------------------------------------------------------------------
+# Writer service
+# -------------------------------------------------------------------
+
+class UsageLogWriter:
+    """
+    Buffered, group-commit writer for the A2A usage log.
+
+    log() only enqueues. A background thread drains the queue in batches,
+    appends each batch with a single write under an inter-process lock
+    (so lines from several processes never interleave), then flushes and
+    fsyncs according to the policy:
+
+        "never"    – flush to the OS only
+        "interval" – fsync at most every fsync_interval seconds
+        "commit"   – fsync after every group commit
+
+    The file is rotated to usage_log-<UTC stamp>.jsonl once it exceeds
+    max_bytes or its first record is older than max_age seconds. Rotated
+    segments are closed and never written again.
+
+    A batch that fails to commit (disk full, I/O error, lock failure) is
+    kept and retried with backoff, resuming after any part already
+    written; flush() waits for it. When the writer is closed while a
+    batch still fails, that batch goes to a sidecar file instead (see
+    spill_path). Failures are logged and counted in stats().
+
+    Each process gets its own writer (see get_usage_log()), which makes it
+    safe to call from process-pool workers.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOG_PATH,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        batch_size: int = 512,
+        flush_interval: float = 0.2,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = None,
+        max_queue: int = 100_000,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock_path = path + ".lock"
+        self._fd = None
+        self._segment = None       # (st_ino, first record timestamp)
+        self._last_fsync = 0.0
+        self._closed = False
+        self._stopping = threading.Event()     # interrupts retry backoff
+        self._last_error = None
+
+        self._counters = {
+            "records": 0,
+            "batches": 0,
+            "bytes": 0,
+            "rotations": 0,
+            "errors": 0,
+            "retrying": 0,
+            "spilled": 0,
+            "lost": 0,
+            "commit_ms_total": 0.0,
+            "commit_ms_last": 0.0,
+            "commit_ms_max": 0.0,
+        }
+        self._counter_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="dre-usage-log", daemon=True
+        )
+        self._thread.start()
+
+    # ---------------------------------------------------------------
+    # Producer side
+    # ---------------------------------------------------------------
+    def log(self, record: dict, block: bool = True):
+        """Queue one record (a dict, serialized on the writer thread)."""
+        if self._closed:
+            raise RuntimeError("UsageLogWriter is closed")
+        self._queue.put(record, block=block)
+
+    def log_receipt(self, receipt: dict, block: bool = True):
+        self.log(usage_record(receipt), block=block)
+
+    def flush(self):
+        """Block until every queued record is committed."""
+        self._queue.join()
+
+    def close(self):
+        """
+        Commit what is queued, then close the file (fsynced unless the
+        policy is "never", so "interval" does not leave the last batch
+        unsynced).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._stopping.set()
+        self._thread.join()
+        if self._fd is not None:
+            try:
+                if self.fsync != "never":
+                    os.fsync(self._fd)
+            except OSError as e:
+                self._failed(e)
+                logger.error("usage log: fsync of %s at close failed (%s)", self.path, e)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    @property
+    def spill_path(self) -> str:
+        """Sidecar file for batches that could not be committed at close."""
+        base, ext = os.path.splitext(self.path)
+        return f"{base}.failed-{os.getpid()}{ext}"
+
+    def stats(self) -> dict:
+        with self._counter_lock:
+            c = dict(self._counters)
+        batches = max(c["batches"], 1)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "records": c["records"],
+            "batches": c["batches"],
+            "bytes": c["bytes"],
+            "rotations": c["rotations"],
+            "errors": c["errors"],
+            "retrying": c["retrying"],
+            "spilled": c["spilled"],
+            "lost": c["lost"],
+            "last_error": self._last_error,
+            "avg_batch": c["records"] / batches,
+            "commit_ms_last": c["commit_ms_last"],
+            "commit_ms_avg": c["commit_ms_total"] / batches,
+            "commit_ms_max": c["commit_ms_max"],
+        }
+
+    # ---------------------------------------------------------------
+    # Writer thread
+    # ---------------------------------------------------------------
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            if first is None:
+                stop = True
+            else:
+                batch.append(first)
+
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            try:
+                if batch:
+                    self._commit_with_retry(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+
+    def _failed(self, error: Exception):
+        self._last_error = f"{type(error).__name__}: {error}"
+        with self._counter_lock:
+            self._counters["errors"] += 1
+
+    def _commit_with_retry(self, batch):
+        """
+        Commit batch, retrying with backoff until it lands. Once the
+        writer is closing, give up after CLOSE_ATTEMPTS and spill.
+        """
+        pending = _Pending(batch)
+        delay = RETRY_INITIAL
+        attempts = 0
+        while True:
+            try:
+                self._commit(pending)
+                break
+            except Exception as e:
+                self._failed(e)
+                attempts += 1
+                if attempts == 1:
+                    with self._counter_lock:
+                        self._counters["retrying"] += len(batch)
+                if self._stopping.is_set() and attempts >= CLOSE_ATTEMPTS:
+                    self._spill(pending, e)
+                    break
+                logger.warning(
+                    "usage log: commit of %d records to %s failed (%s); retrying in %.2fs",
+                    len(batch), self.path, self._last_error, delay,
+                )
+                self._stopping.wait(delay)
+                delay = min(delay * 2, RETRY_MAX)
+
+        if attempts:
+            with self._counter_lock:
+                self._counters["retrying"] -= len(batch)
+
+    def _spill(self, pending, error: Exception):
+        """Append the records of a batch the log would not take to spill_path."""
+        # Records whose lines already reached the log are not repeated
+        skip = pending.written().count(b"\n")
+        records = pending.batch[skip:]
+        try:
+            with open(self.spill_path, "ab") as f:
+                f.write(b"".join((json.dumps(r) + "\n").encode("utf-8") for r in records))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            self._failed(e)
+            with self._counter_lock:
+                self._counters["lost"] += len(records)
+            logger.error(
+                "usage log: %d records could not be written to %s (%s) nor %s (%s); they are lost",
+                len(records), self.path, error, self.spill_path, e,
+            )
+            return
+        with self._counter_lock:
+            self._counters["spilled"] += len(records)
+        logger.error(
+            "usage log: %d records could not be written to %s (%s); saved to %s",
+            len(records), self.path, error, self.spill_path,
+        )
+
+    def _open(self):
+        """(Re)open the live file if it is missing or was rotated away."""
+        try:
+            live = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            live = None
+
+        if self._fd is not None and live is not None and os.fstat(self._fd).st_ino == live:
+            return
+        if self._fd is not None:
+            os.close(self._fd)
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self.path, flags, 0o644)
+
+    def _segment_start(self):
+        """Timestamp of the first record in the live file (cached per inode)."""
+        st = os.fstat(self._fd)
+        if self._segment is not None and self._segment[0] == st.st_ino:
+            return self._segment[1]
+        started = None
+        if st.st_size:
+            with open(self.path, "rb") as f:
+                try:
+                    started = float(json.loads(f.readline())["timestamp"])
+                except Exception:
+                    started = st.st_mtime
+        self._segment = (st.st_ino, started)
+        return started
+
+    def _should_rotate(self, now: float) -> bool:
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        if self.max_age:
+            started = self._segment_start()
+            return started is not None and now - started >= self.max_age
+        return False
+
+    def _rotate(self):
+        base, ext = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        target = f"{base}-{stamp}{ext}"
+        n = 1
+        while os.path.exists(target):
+            target = f"{base}-{stamp}.{n}{ext}"
+            n += 1
+
+        os.fsync(self._fd)
+        os.replace(self.path, target)
+        os.close(self._fd)
+        self._fd = None
+        self._segment = None
+        with self._counter_lock:
+            self._counters["rotations"] += 1
+
+    def _commit(self, pending):
+        batch = pending.batch
+        t0 = time.perf_counter()
+        with _FileLock(self._lock_path):
+            self._open()
+            now = time.time()
+            # A batch resumed after a partial write finishes in the same file
+            if not pending.started and self._should_rotate(now):
+                self._rotate()
+                self._open()
+
+            while pending.remaining:
+                n = os.write(self._fd, pending.remaining)
+                pending.remaining = pending.remaining[n:]
+                pending.started = True
+
+            if self.fsync == "commit" or (
+                self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval
+            ):
+                os.fsync(self._fd)
+                self._last_fsync = now
+        ms = (time.perf_counter() - t0) * 1000.0
+
+        with self._counter_lock:
+            c = self._counters
+            c["records"] += len(batch)
+            c["batches"] += 1
+            c["bytes"] += len(pending.payload)
+            c["commit_ms_last"] = ms
+            c["commit_ms_total"] += ms
+            c["commit_ms_max"] = max(c["commit_ms_max"], ms)
+
+
+class _Pending:
+    """A batch being committed: its records and the bytes not yet written."""
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.payload = b"".join((json.dumps(r) + "\n").encode("utf-8") for r in batch)
+        self.remaining = memoryview(self.payload)
+        self.started = False
+
+    def written(self) -> bytes:
+        return self.payload[:len(self.payload) - len(self.remaining)]
+
+
+# -------------------------------------------------------------------
+# Per-process default writer
+# -------------------------------------------------------------------
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_usage_log(path: str = DEFAULT_LOG_PATH, **options) -> UsageLogWriter:
+    """
+    Shared writer for path in this process. A forked or spawned pool worker
+    gets its own writer (and thread) the first time it calls this.
+    """
+    key = (os.getpid(), os.path.abspath(path))
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = UsageLogWriter(path, **options)
+            _writers[key] = writer
+            # Runs at interpreter exit, including in multiprocessing
+            # children (which skip plain atexit handlers)
+            mp_util.Finalize(writer, writer.close, exitpriority=10)
+        return writer
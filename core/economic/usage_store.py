@@ -0,0 +1,260 @@
+# core/economic/usage_store.py
+
+import glob
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Dictionary-encoded string columns (everything else is float64 / bytes)
+STRING_FIELDS = ("mode", "tier", "gate_status")
+
+INDEX_FILE = "index.json"
+
+# The file the writer appends to (see UsageLogWriter); only ever compacted
+# as a snapshot
+LIVE_LOG = "usage_log.jsonl"
+
+
+def _gate_status(gating) -> str:
+    """Normalize both gating shapes (GatingEngine and CostEstimator)."""
+    if not isinstance(gating, dict):
+        return "unknown"
+    if "gate_status" in gating:
+        return str(gating["gate_status"])
+    if "allowed" in gating:
+        return "allowed" if gating["allowed"] else str(gating.get("reason", "denied"))
+    return "unknown"
+
+
+# -------------------------------------------------------------------
+# Compaction (closed JSONL segment -> columnar part)
+# -------------------------------------------------------------------
+
+def compact_segment(segment_path: str, store_dir: str) -> dict:
+    """
+    Convert one closed usage_log segment into a columnar part:
+    one .npy per field, string fields dictionary-encoded, rows sorted by
+    timestamp. Returns the part's index entry.
+    """
+    ts, cost, sigs = [], [], []
+    strings = {f: [] for f in STRING_FIELDS}
+
+    with open(segment_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                r = json.loads(line)
+            except ValueError:
+                continue  # torn line from a crash; the rest stays queryable
+            ts.append(float(r.get("timestamp", 0.0)))
+            cost.append(float(r.get("datacostunits") or 0.0))
+            sigs.append(str(r.get("receipt_signature") or ""))
+            strings["mode"].append(str(r.get("mode")))
+            strings["tier"].append(str(r.get("tier")))
+            strings["gate_status"].append(_gate_status(r.get("gating")))
+
+    name = os.path.splitext(os.path.basename(segment_path))[0]
+    part_dir = os.path.join(store_dir, name)
+    tmp_dir = part_dir + ".tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    order = np.argsort(np.asarray(ts, dtype=np.float64), kind="stable")
+    np.save(os.path.join(tmp_dir, "timestamp.npy"), np.asarray(ts, dtype=np.float64)[order])
+    np.save(os.path.join(tmp_dir, "datacostunits.npy"), np.asarray(cost, dtype=np.float64)[order])
+    np.save(os.path.join(tmp_dir, "receipt_signature.npy"), np.asarray(sigs, dtype="S64")[order])
+
+    dictionaries = {}
+    for field in STRING_FIELDS:
+        values, codes = np.unique(np.asarray(strings[field], dtype=object).astype(str), return_inverse=True)
+        np.save(os.path.join(tmp_dir, f"{field}.npy"), codes.astype(np.int32)[order])
+        dictionaries[field] = values.tolist()
+
+    with open(os.path.join(tmp_dir, "dictionaries.json"), "w") as f:
+        json.dump(dictionaries, f)
+
+    if os.path.exists(part_dir):
+        shutil.rmtree(part_dir)
+    os.replace(tmp_dir, part_dir)
+
+    rows = len(ts)
+    return {
+        "part": name,
+        "source": os.path.basename(segment_path),
+        "rows": rows,
+        "t_min": float(min(ts)) if rows else None,
+        "t_max": float(max(ts)) if rows else None,
+    }
+
+
+def _load_index(store_dir: str) -> dict:
+    path = os.path.join(store_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {"parts": []}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_index(store_dir: str, index: dict):
+    path = os.path.join(store_dir, INDEX_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def compact(log_dir: str, store_dir: str, include_live: bool = False, remove_source: bool = False) -> list:
+    """
+    Compact every closed segment (usage_log-*.jsonl) in log_dir that is not
+    in the store yet. include_live also snapshots the live usage_log.jsonl
+    (re-compacted on every run, since it keeps growing).
+
+    A snapshot from an earlier run is always dropped first: once the
+    writer rotates the live file, its records arrive again as a segment,
+    and keeping the old snapshot would count them twice.
+    Returns the new index entries.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    index = _load_index(store_dir)
+    stale = [p for p in index["parts"] if p["source"] == LIVE_LOG]
+    index["parts"] = [p for p in index["parts"] if p["source"] != LIVE_LOG]
+    done = {p["source"] for p in index["parts"]}
+
+    segments = sorted(glob.glob(os.path.join(log_dir, "usage_log-*.jsonl")))
+    live = os.path.join(log_dir, LIVE_LOG)
+    if include_live and os.path.exists(live):
+        segments.append(live)
+
+    added = []
+    for seg in segments:
+        if os.path.basename(seg) in done:
+            continue
+        entry = compact_segment(seg, store_dir)
+        index["parts"].append(entry)
+        added.append(entry)
+        if remove_source and os.path.basename(seg) != LIVE_LOG:
+            os.remove(seg)
+
+    index["parts"].sort(key=lambda p: (p["t_min"] is None, p["t_min"] or 0.0))
+    _save_index(store_dir, index)
+
+    # The index no longer points at a stale snapshot; remove its columns
+    # unless this run rewrote them
+    for p in stale:
+        if p["part"] not in {e["part"] for e in added}:
+            shutil.rmtree(os.path.join(store_dir, p["part"]), ignore_errors=True)
+    return added
+
+
+# -------------------------------------------------------------------
+# Query
+# -------------------------------------------------------------------
+
+class UsageStore:
+    """
+    Vectorized group-by over compacted usage parts.
+    Columns are memory-mapped, parts outside the time range are skipped via
+    the index and the rest are cut with a binary search on timestamp.
+    """
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.index = _load_index(store_dir)
+
+    @property
+    def rows(self) -> int:
+        return sum(p["rows"] for p in self.index["parts"])
+
+    def _parts(self, start, end):
+        for p in self.index["parts"]:
+            if not p["rows"]:
+                continue
+            if start is not None and p["t_max"] < start:
+                continue
+            if end is not None and p["t_min"] >= end:
+                continue
+            yield p
+
+    def query(self, start: float = None, end: float = None, group_by=("tier", "mode"), where: dict = None) -> list:
+        """
+        Sum datacostunits and count receipts per group over [start, end).
+        group_by: subset of STRING_FIELDS
+        where:    {field: value} equality filters on STRING_FIELDS
+        Returns [{<group fields>, "count", "datacostunits"}] sorted by cost.
+        """
+        group_by = tuple(group_by)
+        where = where or {}
+        for field in tuple(group_by) + tuple(where):
+            if field not in STRING_FIELDS:
+                raise ValueError(f"Cannot group or filter on: {field}")
+
+        # Global dictionaries, grown as parts are visited
+        global_values = {f: [] for f in group_by}
+        global_codes = {f: {} for f in group_by}
+
+        chunks = []
+        for p in self._parts(start, end):
+            part_dir = os.path.join(self.store_dir, p["part"])
+            ts = np.load(os.path.join(part_dir, "timestamp.npy"), mmap_mode="r")
+            lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+            hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+            if hi <= lo:
+                continue
+
+            with open(os.path.join(part_dir, "dictionaries.json")) as f:
+                dictionaries = json.load(f)
+
+            mask = None
+            for field, value in where.items():
+                codes = np.load(os.path.join(part_dir, f"{field}.npy"), mmap_mode="r")[lo:hi]
+                values = dictionaries[field]
+                hit = codes == values.index(value) if value in values else np.zeros(hi - lo, dtype=bool)
+                mask = hit if mask is None else (mask & hit)
+
+            cost = np.load(os.path.join(part_dir, "datacostunits.npy"), mmap_mode="r")[lo:hi]
+
+            mapped = []
+            for field in group_by:
+                local = np.load(os.path.join(part_dir, f"{field}.npy"), mmap_mode="r")[lo:hi]
+                # Translate part-local codes into the global dictionary
+                lut = np.empty(len(dictionaries[field]), dtype=np.int64)
+                for code, value in enumerate(dictionaries[field]):
+                    if value not in global_codes[field]:
+                        global_codes[field][value] = len(global_values[field])
+                        global_values[field].append(value)
+                    lut[code] = global_codes[field][value]
+                mapped.append(lut[local])
+
+            if mask is not None:
+                cost = cost[mask]
+                mapped = [m[mask] for m in mapped]
+            chunks.append((mapped, np.asarray(cost)))
+
+        # Combine group codes into one flat key (mixed radix) and reduce
+        sizes = [max(len(global_values[f]), 1) for f in group_by]
+        total = int(np.prod(sizes)) if sizes else 1
+        sums = np.zeros(total, dtype=np.float64)
+        counts = np.zeros(total, dtype=np.int64)
+        for mapped, cost in chunks:
+            key = np.zeros(len(cost), dtype=np.int64)
+            for codes, size in zip(mapped, sizes):
+                key = key * size + codes
+            sums += np.bincount(key, weights=cost, minlength=total)
+            counts += np.bincount(key, minlength=total)
+
+        results = []
+        for flat in np.nonzero(counts)[0]:
+            row = {}
+            rem = int(flat)
+            for field, size in reversed(list(zip(group_by, sizes))):
+                row[field] = global_values[field][rem % size]
+                rem //= size
+            row = {f: row[f] for f in group_by}
+            row["count"] = int(counts[flat])
+            row["datacostunits"] = float(sums[flat])
+            results.append(row)
+
+        results.sort(key=lambda r: -r["datacostunits"])
+        return results
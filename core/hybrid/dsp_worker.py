@@ -0,0 +1,171 @@
+# core/hybrid/dsp_worker.py
+
+import multiprocessing
+import threading
+
+import numpy as np
+
+from core.io.shm import attach, create, adopt, share_array
+
+
+# -------------------------------------------------------------------
+# Child process
+# -------------------------------------------------------------------
+
+def _worker_main(conn):
+    """
+    Command loop of the DSP subprocess.
+    Audio never crosses the pipe: requests carry ShmHandles, the child maps
+    the parent's segments, works in place and replies with a tiny status.
+    """
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+
+        op = msg[0]
+        if op == "stop":
+            break
+
+        try:
+            if op == "tempo":
+                _, handle, sr = msg
+                from core.timing.tempo import estimate_tempo
+                shm, y = attach(handle)
+                try:
+                    conn.send(("ok", estimate_tempo(y, sr)))
+                finally:
+                    del y
+                    shm.close()
+
+            elif op == "render":
+                _, in_handle, out_handle, sample_rate, mode, params = msg
+                from core.hybrid.pipeline import process_audio
+                in_shm, audio = attach(in_handle)
+                out_shm, out = attach(out_handle)
+                try:
+                    process_audio(audio, sample_rate, mode, out=out, **params)
+                    conn.send(("ok", out_handle))
+                finally:
+                    del audio, out
+                    in_shm.close()
+                    out_shm.close()
+
+            else:
+                conn.send(("error", f"Unknown DSP worker op: {op}"))
+
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+# -------------------------------------------------------------------
+# Parent-side handle
+# -------------------------------------------------------------------
+
+class DSPWorker:
+    """
+    Optional out-of-process tempo analysis and rendering.
+
+    Librosa analysis and large copies run in a separate interpreter, so
+    they never hold the GUI process's GIL while the audio callback needs
+    it. Buffers travel through multiprocessing.shared_memory; only handles
+    are pickled. Calls block the calling thread (use a worker thread, not
+    the Qt main thread) and are serialized per worker.
+    """
+
+    def __init__(self):
+        self._proc = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self):
+        if self.alive:
+            return self
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_worker_main, args=(child,), name="dre-dsp-worker", daemon=True
+        )
+        self._proc.start()
+        child.close()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        if self._proc is None:
+            return
+        try:
+            with self._lock:
+                self._conn.send(("stop",))
+        except Exception:
+            pass
+        self._proc.join(timeout)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._conn.close()
+        self._proc = None
+        self._conn = None
+
+    def _call(self, *msg):
+        if not self.alive:
+            self.start()
+        with self._lock:
+            self._conn.send(msg)
+            status, value = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"DSP worker failed: {value}")
+        return value
+
+    # ---------------------------------------------------------------
+    # Operations
+    # ---------------------------------------------------------------
+    def detect_tempo(self, y: np.ndarray, sr: int) -> float:
+        """estimate_tempo() in the worker; y in librosa layout."""
+        shm, handle = share_array(y)
+        try:
+            return float(self._call("tempo", handle, sr))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def render(
+        self,
+        audio,
+        sample_rate: int,
+        mode: str,
+        progress=None,
+        cancel=None,
+        **params,
+    ) -> np.ndarray:
+        """
+        process_audio() in the worker. The result is returned as an array
+        mapped straight onto the output segment (no copy back).
+        progress/cancel are accepted for RenderScheduler compatibility; the
+        render itself is not interruptible once handed to the worker.
+        """
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+
+        in_shm, in_handle = share_array(audio)
+        out_shm, out_handle, out_view = create(audio.shape, np.float32)
+        del out_view
+        try:
+            self._call("render", in_handle, out_handle, sample_rate, mode, params)
+        except Exception:
+            out_shm.close()
+            out_shm.unlink()
+            raise
+        finally:
+            in_shm.close()
+            in_shm.unlink()
+
+        out = adopt(out_shm, out_handle)
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        if progress is not None:
+            progress(1.0)
+        return out
@@ -0,0 +1,418 @@
+# core/hybrid/ingest.py
+
+import json
+import os
+import queue
+import threading
+import time
+
+from core.io.audio_loader import audio_info, load_audio
+from core.io.export import export_audio
+from core.hybrid.modes import get_mode
+from core.hybrid.pipeline import PROCESS_KWARGS, process_audio
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".aif", ".aiff", ".mp3", ".m4a")
+
+# Names uploaders and browsers use while a file is still being written
+PARTIAL_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".download", ".filepart")
+
+DEFAULT_JOURNAL = ".dre_ingest.jsonl"
+
+# Stage names, in pipeline order
+STAGES = ("decode", "dsp", "encode")
+
+_DONE = object()    # end-of-stream marker passed down the stage queues
+
+
+# -------------------------------------------------------------------
+# Bookkeeping
+# -------------------------------------------------------------------
+
+class IngestJournal:
+    """
+    Append-only JSON lines record of every file the daemon has claimed,
+    finished or given up on, keyed by name + size + mtime (so a file
+    replaced under the same name is new work).
+
+    Each line is flushed and fsynced before the daemon acts on it, and the
+    output is renamed into place before "done" is written, so after a
+    crash at any point a file is either recorded done (its output is
+    complete) or reprocessed on the next start. A torn last line is
+    ignored on replay.
+
+        claimed   picked up; counts as an attempt
+        error     an attempt failed (retried while attempts < max_attempts)
+        failed    given up after max_attempts
+        released  handed back unfinished at shutdown (attempt not counted)
+        done      output written
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._state = {}        # key -> {"status", "attempts"}
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._apply(rec["event"], rec["key"])
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a torn line so it does not swallow the next record
+                    os.write(self._fd, b"\n")
+
+    def _apply(self, event: str, key: str):
+        s = self._state.setdefault(key, {"status": "new", "attempts": 0})
+        if event == "claimed":
+            s["attempts"] += 1
+        elif event == "released":
+            s["attempts"] = max(s["attempts"] - 1, 0)
+        s["status"] = event
+
+    def record(self, event: str, key: str, **fields):
+        line = json.dumps({"timestamp": time.time(), "event": event, "key": key, **fields}) + "\n"
+        with self._lock:
+            os.write(self._fd, line.encode("utf-8"))
+            os.fsync(self._fd)
+            self._apply(event, key)
+
+    def pending(self, key: str) -> bool:
+        """
+        True when key is neither finished nor out of attempts. A key left
+        "claimed" by a crash is pending again (and a file that keeps
+        crashing the daemon stops being retried after max_attempts).
+        """
+        with self._lock:
+            s = self._state.get(key)
+        if s is None:
+            return True
+        return s["status"] not in ("done", "failed") and s["attempts"] < self.max_attempts
+
+    def attempts(self, key: str) -> int:
+        with self._lock:
+            s = self._state.get(key)
+        return s["attempts"] if s else 0
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class IngestItem:
+    """One input file on its way through the stages."""
+
+    def __init__(self, key: str, path: str, output: str):
+        self.key = key
+        self.path = path
+        self.output = output
+        self.audio = None
+        self.sample_rate = None
+        self.times = {}
+
+
+# -------------------------------------------------------------------
+# Daemon
+# -------------------------------------------------------------------
+
+class IngestDaemon:
+    """
+    Watch-folder ingest: every complete audio file dropped into input_dir
+    is decoded, rendered with process_audio and encoded into output_dir.
+
+    The three stages run on their own worker threads (decode and encode
+    are libsndfile calls and DSP is NumPy copies, all of which release
+    the GIL), connected by bounded queues: while one file is being
+    rendered the next is already decoding and the previous encoding, and
+    a full queue holds the stage before it back, so at most about
+    queue_size decoded files per stage are in memory.
+
+    A file is considered complete once its size and mtime have not changed
+    for settle seconds (and, for formats soundfile reads, its header
+    parses); hidden files and PARTIAL_SUFFIXES names are ignored, so an
+    uploader that writes "x.wav.part" and renames it is picked up at the
+    rename. Outputs are written to a hidden temporary name and renamed
+    into place. Progress is kept in an IngestJournal, so a restarted
+    daemon skips finished files and retries interrupted ones.
+
+    stop() drains by default: nothing new is claimed, everything already
+    claimed finishes. stop(drain=False) abandons queued work (released in
+    the journal, picked up again on the next start).
+    """
+
+    def __init__(
+        self,
+        input_dir: str,
+        output_dir: str,
+        mode: str = "HQ_REVERSE",
+        params: dict = None,
+        output_name: str = "{stem}_{mode}.wav",
+        journal: str = None,
+        decode_workers: int = 1,
+        dsp_workers: int = None,
+        encode_workers: int = 1,
+        queue_size: int = 2,
+        poll_interval: float = 1.0,
+        settle: float = 2.0,
+        max_attempts: int = 3,
+        log=print,
+    ):
+        # Bad mode or parameters fail now, not once per file
+        get_mode(mode).validate(**{k: v for k, v in (params or {}).items() if k not in PROCESS_KWARGS})
+        if os.path.abspath(input_dir) == os.path.abspath(output_dir):
+            raise ValueError("Ingest output_dir must differ from input_dir (outputs would be re-ingested)")
+
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.mode = mode
+        self.params = dict(params or {})
+        self.output_name = output_name
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.log = log or (lambda *a, **k: None)
+        self.journal = IngestJournal(
+            journal or os.path.join(output_dir, DEFAULT_JOURNAL), max_attempts=max_attempts
+        )
+
+        self.workers = {
+            "decode": max(int(decode_workers), 1),
+            "dsp": max(int(dsp_workers or os.cpu_count() or 1), 1),
+            "encode": max(int(encode_workers), 1),
+        }
+        # queues[stage] feeds that stage
+        self.queues = {stage: queue.Queue(maxsize=max(int(queue_size), 1)) for stage in STAGES}
+
+        self._seen = {}             # path -> ((size, mtime_ns), first seen with that signature)
+        self._claimed = set()       # keys in flight
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._abort = threading.Event()
+        self._threads = []
+        self._live = {}
+        self._counters = {"claimed": 0, "done": 0, "errors": 0, "failed": 0}
+        self._busy_s = dict.fromkeys(STAGES, 0.0)
+
+    # ---------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        targets = {"decode": self._decode, "dsp": self._dsp, "encode": self._encode}
+        for stage in STAGES:
+            self._live[stage] = self.workers[stage]
+            for i in range(self.workers[stage]):
+                t = threading.Thread(
+                    target=self._stage_loop, args=(stage, targets[stage]),
+                    name=f"dre-ingest-{stage}-{i}", daemon=True,
+                )
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def run_forever(self):
+        """Poll input_dir until stop() is called, then wait for the drain."""
+        if not self._threads:
+            self.start()
+        try:
+            while not self._stopping.is_set():
+                self.scan_once()
+                self._stopping.wait(self.poll_interval)
+        finally:
+            self._finish()
+
+    def stop(self, drain: bool = True):
+        """Stop claiming files; with drain=False also abandon queued ones."""
+        if not drain:
+            self._abort.set()
+        self._stopping.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    def _finish(self):
+        # One end marker per decode worker; each stage passes them on
+        # once its last worker is done
+        for _ in range(self.workers["decode"]):
+            self._put("decode", _DONE, force=True)
+        for t in self._threads:
+            t.join()
+        self.journal.close()
+
+    # ---------------------------------------------------------------
+    # Watching
+    # ---------------------------------------------------------------
+    def scan_once(self) -> int:
+        """Claim every file that has become complete; returns how many."""
+        now = time.monotonic()
+        claimed = 0
+        try:
+            entries = sorted(os.scandir(self.input_dir), key=lambda e: e.name)
+        except FileNotFoundError:
+            return 0
+
+        present = set()
+        for entry in entries:
+            name = entry.name
+            if name.startswith(".") or name.lower().endswith(PARTIAL_SUFFIXES):
+                continue
+            if not name.lower().endswith(AUDIO_EXTENSIONS) or not entry.is_file():
+                continue
+            path = entry.path
+            present.add(path)
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+
+            seen = self._seen.get(path)
+            if seen is None or seen[0] != sig:
+                self._seen[path] = (sig, now)
+                continue
+            if st.st_size == 0 or now - seen[1] < self.settle:
+                continue
+
+            key = f"{name}:{st.st_size}:{st.st_mtime_ns}"
+            with self._lock:
+                if key in self._claimed:
+                    continue
+            if not self.journal.pending(key) or not self._header_ok(path):
+                continue
+            if self._stopping.is_set():
+                break
+            self._claim(key, path)
+            claimed += 1
+
+        # Forget files that disappeared
+        for path in list(self._seen):
+            if path not in present:
+                del self._seen[path]
+        return claimed
+
+    @staticmethod
+    def _header_ok(path: str) -> bool:
+        """Formats soundfile reads must have a parseable header; others can't be checked."""
+        if path.lower().endswith((".mp3", ".m4a")):
+            return True
+        return audio_info(path) is not None
+
+    def _claim(self, key: str, path: str):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        output = os.path.join(self.output_dir, self.output_name.format(stem=stem, mode=self.mode))
+        with self._lock:
+            self._claimed.add(key)
+            self._counters["claimed"] += 1
+        self.journal.record("claimed", key, path=path, output=output)
+        self._put("decode", IngestItem(key, path, output))
+
+    def _put(self, stage: str, item, force: bool = False):
+        """Blocking put that still notices an abort (unless force)."""
+        q = self.queues[stage]
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._abort.is_set() and not force:
+                    self._release(item)
+                    return
+
+    # ---------------------------------------------------------------
+    # Stages
+    # ---------------------------------------------------------------
+    def _stage_loop(self, stage: str, work):
+        nxt = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else None
+        q = self.queues[stage]
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if self._abort.is_set():
+                self._release(item)
+                continue
+            t0 = time.perf_counter()
+            try:
+                work(item)
+            except Exception as e:
+                self._error(item, stage, e)
+                continue
+            finally:
+                dt = time.perf_counter() - t0
+                item.times[stage] = dt
+                with self._lock:
+                    self._busy_s[stage] += dt
+            if nxt is not None:
+                self._put(nxt, item)
+            else:
+                self._done(item)
+
+        with self._lock:
+            self._live[stage] -= 1
+            last = self._live[stage] == 0
+        if last and nxt is not None:
+            for _ in range(self.workers[nxt]):
+                self._put(nxt, _DONE, force=True)
+
+    def _decode(self, item: IngestItem):
+        item.audio, item.sample_rate = load_audio(item.path)
+
+    def _dsp(self, item: IngestItem):
+        # The decoded buffer is ours: under a memory_budget it may be
+        # rendered over
+        item.audio = process_audio(item.audio, item.sample_rate, self.mode, allow_in_place=True, **self.params)
+
+    def _encode(self, item: IngestItem):
+        export_audio(item.audio, item.sample_rate, item.output)
+        item.audio = None
+
+    def _done(self, item: IngestItem):
+        """After the last stage (and its time) is in: record and log the file."""
+        self.journal.record("done", item.key, output=item.output, seconds=item.times)
+        with self._lock:
+            self._claimed.discard(item.key)
+            self._counters["done"] += 1
+        timing = " ".join(f"{k} {v:.2f}s" for k, v in item.times.items())
+        self.log(f"[ingest] {os.path.basename(item.path)} -> {item.output} ({timing})")
+
+    def _error(self, item: IngestItem, stage: str, error: Exception):
+        item.audio = None
+        message = f"{type(error).__name__}: {error}"
+        final = self.journal.attempts(item.key) >= self.journal.max_attempts
+        self.journal.record("failed" if final else "error", item.key, stage=stage, error=message)
+        with self._lock:
+            self._claimed.discard(item.key)
+            self._counters["failed" if final else "errors"] += 1
+        self.log(f"[ingest] {os.path.basename(item.path)} {stage} failed: {message}"
+                 + ("" if final else " (will retry)"))
+
+    def _release(self, item):
+        if item is _DONE:
+            return
+        item.audio = None
+        self.journal.record("released", item.key)
+        with self._lock:
+            self._claimed.discard(item.key)
+
+    # ---------------------------------------------------------------
+    # Introspection
+    # ---------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "in_flight": len(self._claimed),
+                "queues": {stage: q.qsize() for stage, q in self.queues.items()},
+                "workers": dict(self.workers),
+                "busy_s": dict(self._busy_s),
+            }
@@ -0,0 +1,283 @@
+# core/hybrid/memory_plan.py
+
+import threading
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from core.dsp.declick import DECLICK_BATCH
+from core.dsp.slice_plan import RENDER_BLOCK
+from core.hybrid.modes import get_mode
+from core.io.pcm_stream import STREAM_BLOCK
+
+# Execution strategies, fastest first
+#   gather    decode everything, render into a second buffer
+#   in_place  decode everything, render over the input (no second buffer)
+#   chunked   never hold the audio: read source blocks through the slice
+#             plan straight from the file, encode block by block
+#   memmap    input and output live in temporary memory-mapped files;
+#             only block-sized scratch is resident
+STRATEGIES = ("gather", "in_place", "chunked", "memmap")
+
+# Bytes per float32 sample after decode
+SAMPLE_BYTES = 4
+
+# librosa's fallback decoder (compressed formats) holds a float64 copy and
+# the channel-first array while converting; counted as extra input copies
+LIBROSA_DECODE_COPIES = 2.5
+
+# Per-slice plan arrays: dst, src, length, step (int64 each)
+PLAN_SEGMENT_BYTES = 32
+
+
+@dataclass
+class MemoryPlan:
+    """Chosen strategy and the peak memory it is predicted to need."""
+    strategy: str
+    predicted_bytes: int        # peak, input included
+    budget: int = None
+    input_bytes: int = 0
+    output_bytes: int = 0
+    scratch_bytes: int = 0
+    reason: str = ""
+    actual_bytes: int = None    # filled in when a MemoryProbe ran
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class MemoryBudgetExceeded(MemoryError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Prediction
+# -------------------------------------------------------------------
+
+def _segments(frames: int, sample_rate: int, mode: str, params: dict) -> int:
+    """Slice count of a permutation mode's plan (the plan's size)."""
+    plan = get_mode(mode).plan(total_samples=frames, sample_rate=sample_rate, **params)
+    return len(plan.dst)
+
+
+def scratch_bytes(frames: int, channels: int, sample_rate: int, mode: str, **params) -> int:
+    """
+    Working memory of the DSP itself on top of its input and output
+    buffers: the slice plan and declick's window batches, or whatever a
+    mode without a plan declares (ModeSpec.scratch, e.g. the granular
+    engine's grain batch and overlap-add accumulator).
+    """
+    spec = get_mode(mode)
+    if not spec.permutation:
+        return int(spec.scratch(frames, channels, sample_rate, **params)) if spec.scratch else 0
+
+    frame = channels * SAMPLE_BYTES
+    segments = _segments(frames, sample_rate, mode, params)
+    total = segments * PLAN_SEGMENT_BYTES
+    crossfade = params.get("crossfade") or 0
+    if crossfade and segments > 1:
+        # Per batch: three int64 index matrices, two gathered windows and
+        # the mix (with its temporary), each (boundaries, window[, ch])
+        rows = min(DECLICK_BATCH, segments - 1)
+        window = 2 * (min(int(crossfade), max(frames // segments, 1)) // 2)
+        total += rows * window * (3 * 8 + 4 * frame)
+    return total
+
+
+def predict_peak(
+    strategy: str,
+    frames: int,
+    channels: int,
+    sample_rate: int,
+    mode: str,
+    compressed: bool = False,
+    **params,
+) -> MemoryPlan:
+    """Peak resident memory of one strategy for a job of this shape."""
+    frame = channels * SAMPLE_BYTES
+    audio = frames * frame
+    scratch = scratch_bytes(frames, channels, sample_rate, mode, **params)
+    block = STREAM_BLOCK * frame
+
+    if strategy == "gather":
+        inp, out = audio, audio
+    elif strategy == "in_place":
+        # (declick is never in place, see legal_strategies)
+        inp, out = audio, 0
+        if get_mode(mode).permutation:
+            scratch += min(RENDER_BLOCK, frames) * frame         # swap buffer
+    elif strategy == "chunked":
+        # Double-buffered output blocks, source reads and the encoder's
+        # conversion buffer
+        inp, out = 0, 0
+        scratch += 4 * block
+    elif strategy == "memmap":
+        inp, out = 0, 0
+        scratch += 2 * block
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    if compressed and inp:
+        inp = int(inp * LIBROSA_DECODE_COPIES)
+    return MemoryPlan(
+        strategy=strategy,
+        predicted_bytes=int(inp + out + scratch),
+        input_bytes=int(inp),
+        output_bytes=int(out),
+        scratch_bytes=int(scratch),
+    )
+
+
+def legal_strategies(
+    mode: str,
+    source: str = "array",
+    allow_in_place: bool = False,
+    seekable: bool = True,
+    **params,
+) -> list:
+    """
+    Strategies that can run this job, fastest first, from the mode's
+    capabilities (see core.hybrid.modes).
+
+    source:         "array" (audio already decoded) or "file"
+    allow_in_place: the caller's input buffer may be overwritten (always
+                    true for a file: the decoded copy is ours)
+    seekable:       soundfile can seek in the input (chunked reads)
+    """
+    spec = get_mode(mode)
+    crossfade = params.get("crossfade")
+    legal = ["gather"]
+    # Declick reads the untouched source, so it rules out rendering over it
+    if spec.in_place and (allow_in_place or source == "file") and not (crossfade and spec.permutation):
+        legal.append("in_place")
+    if source == "file" and seekable and spec.permutation and not crossfade:
+        legal.append("chunked")
+    if seekable:
+        legal.append("memmap")
+    return legal
+
+
+def plan_memory(
+    frames: int,
+    channels: int,
+    sample_rate: int,
+    mode: str,
+    budget: int = None,
+    source: str = "array",
+    allow_in_place: bool = False,
+    seekable: bool = True,
+    compressed: bool = False,
+    **params,
+) -> MemoryPlan:
+    """
+    Pick the fastest strategy whose predicted peak fits budget (bytes).
+
+    Only the shape is needed (header metadata for files, see audio_info),
+    so a job can be planned before anything is decoded. Without a budget
+    the fastest legal strategy is returned with its prediction. Raises
+    MemoryBudgetExceeded when no strategy fits.
+    """
+    candidates = legal_strategies(
+        mode, source=source, allow_in_place=allow_in_place, seekable=seekable, **params
+    )
+    plans = [
+        predict_peak(s, frames, channels, sample_rate, mode, compressed=compressed, **params)
+        for s in candidates
+    ]
+    for p in plans:
+        p.budget = budget
+        if budget is None or p.predicted_bytes <= budget:
+            p.reason = "fastest" if p is plans[0] else f"{plans[0].strategy} needs {plans[0].predicted_bytes >> 20} MB"
+            return p
+
+    smallest = min(plans, key=lambda p: p.predicted_bytes)
+    raise MemoryBudgetExceeded(
+        f"{mode} on {frames} frames x {channels} ch needs at least "
+        f"{smallest.predicted_bytes >> 20} MB ({smallest.strategy}); budget is {budget >> 20} MB"
+    )
+
+
+def parse_size(text) -> int:
+    """'512M', '2G', '1.5GB', '300000000' -> bytes."""
+    if isinstance(text, (int, float)):
+        return int(text)
+    t = str(text).strip().upper().rstrip("B").rstrip("I")
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    if t and t[-1] in units:
+        return int(float(t[:-1]) * units[t[-1]])
+    return int(float(t))
+
+
+# -------------------------------------------------------------------
+# Measurement (opt-in, to validate predictions)
+# -------------------------------------------------------------------
+
+def _anon_rss() -> int:
+    """Anonymous resident memory (excludes mapped file pages), in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    import sys
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class MemoryProbe:
+    """
+    Peak memory allocated while the block runs, above what was in use
+    when it started:
+
+        with MemoryProbe("rss") as probe:
+            ...
+        probe.peak_bytes
+
+    kind "tracemalloc" counts Python and NumPy heap allocations exactly
+    (slow: every allocation is traced); "rss" samples anonymous resident
+    memory every interval seconds on a thread (cheap, coarser, and it
+    also sees native allocations such as libsndfile's).
+    """
+
+    KINDS = ("rss", "tracemalloc")
+
+    def __init__(self, kind: str = "rss", interval: float = 0.002):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown memory probe: {kind}")
+        self.kind = kind
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.kind == "tracemalloc":
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        else:
+            self._base = self._high = _anon_rss()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._high = max(self._high, _anon_rss())
+
+    def __exit__(self, *exc):
+        if self.kind == "tracemalloc":
+            peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+        else:
+            self._stop.set()
+            self._thread.join()
+            peak = max(self._high, _anon_rss())
+        self.peak_bytes = max(int(peak - self._base), 0)
+        return False
+
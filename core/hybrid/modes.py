@@ -0,0 +1,322 @@
+# core/hybrid/modes.py
+
+import warnings
+from dataclasses import dataclass, field, replace
+
+from core.dsp.granular import GRAIN_BLOCK
+from core.dsp.reverse_modes import (
+    true_reverse,
+    qbeat_reverse,
+    hq_reverse,
+    studio_reverse,
+    tatum_reverse,
+    grain_reverse,
+    true_reverse_plan,
+    subdivision_reverse_plan,
+    hq_reverse_plan,
+    studio_reverse_plan,
+    tatum_reverse_plan,
+)
+
+# Third-party packages add modes under this entry point group, e.g. in
+# pyproject.toml:
+#   [project.entry-points."dre.modes"]
+#   my_mode = "my_package.modes:MY_MODE"
+# The entry point names a ModeSpec, or a callable returning one or a list.
+ENTRY_POINT_GROUP = "dre.modes"
+
+# Keyword arguments every mode accepts that steer how it runs, not what
+# it renders (threads only reaches modes that are parallel)
+EXECUTION_KWARGS = ("out", "progress", "cancel", "threads")
+
+# Reference single-core throughput for the cost models (see
+# benchmarks/suite.py mode/* to recalibrate), seconds per sample
+GATHER_SECONDS = 0.8e-9
+DECLICK_SECONDS = 4e-9
+GRAIN_SECONDS = 2.9e-9
+GRAIN_OVERLAP_SECONDS = 0.6e-9
+
+
+@dataclass(frozen=True)
+class ModeParam:
+    """One render parameter of a mode: default, type and accepted range."""
+    name: str
+    default: object
+    type: type = float
+    gt: float = None
+    ge: float = None
+    lt: float = None
+    help: str = ""
+
+    def validate(self, value):
+        """value coerced to type; ValueError when it cannot be or is out of range."""
+        try:
+            coerced = self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.name} must be {self.type.__name__}, got {value!r}") from None
+        if self.type is int and coerced != float(value):
+            raise ValueError(f"{self.name} must be a whole number, got {value!r}")
+        if self.gt is not None and not coerced > self.gt:
+            raise ValueError(f"{self.name} must be > {self.gt}, got {coerced}")
+        if self.ge is not None and not coerced >= self.ge:
+            raise ValueError(f"{self.name} must be >= {self.ge}, got {coerced}")
+        if self.lt is not None and not coerced < self.lt:
+            raise ValueError(f"{self.name} must be < {self.lt}, got {coerced}")
+        return coerced
+
+
+@dataclass(frozen=True)
+class ModeSpec:
+    """
+    A reverse mode and what the engine may do with it.
+
+    render(audio, sample_rate, **params, out=, progress=, cancel=[, threads=])
+        renders the whole buffer (AudioBuffer in, AudioBuffer out).
+    plan(total_samples, sample_rate, **params) -> SlicePlan
+        set for pure permutations of the input frames. Those can be
+        auditioned as a zero-copy VirtualBuffer, rendered chunked straight
+        from a file, batched, streamed to a pipe and rendered in place.
+
+    Capabilities (beyond being a permutation):
+      in_place     render() may be handed out=audio
+      parallel     render() honours threads
+      streamable   each output frame depends only on a bounded window of
+                   input (so blocks of live input could be processed)
+      full_buffer  the first output frame needs the whole input
+
+    cost(frames, channels, sample_rate, **params) estimates single-core
+    render seconds; scratch(...) the working bytes on top of input and
+    output (permutations: see core.hybrid.memory_plan).
+    """
+    name: str
+    render: object
+    params: tuple = ()
+    plan: object = None
+    in_place: bool = False
+    parallel: bool = False
+    streamable: bool = False
+    full_buffer: bool = True
+    cost: object = None
+    scratch: object = None
+    description: str = ""
+    origin: str = field(default="builtin", compare=False)
+
+    @property
+    def permutation(self) -> bool:
+        return self.plan is not None
+
+    @property
+    def param_names(self) -> tuple:
+        return tuple(p.name for p in self.params)
+
+    def capabilities(self) -> dict:
+        return {
+            "permutation": self.permutation,
+            "in_place": self.in_place,
+            "parallel": self.parallel,
+            "streamable": self.streamable,
+            "full_buffer": self.full_buffer,
+        }
+
+    def validate(self, **params) -> dict:
+        """
+        This mode's parameters, coerced, range-checked and defaulted.
+
+        Parameters that belong to other registered modes are dropped (one
+        set of grid settings can be handed to any mode), as are execution
+        kwargs; any other name is a ValueError, so typos fail before the
+        audio is touched.
+        """
+        known = all_param_names()
+        unknown = sorted(k for k in params if k not in known and k not in EXECUTION_KWARGS)
+        if unknown:
+            raise ValueError(
+                f"Unknown parameter(s) for {self.name}: {', '.join(unknown)} "
+                f"(accepts {', '.join(self.param_names) or 'none'})"
+            )
+        return {
+            p.name: p.validate(params[p.name]) if params.get(p.name) is not None else p.default
+            for p in self.params
+        }
+
+    def estimate(self, frames: int, channels: int, sample_rate: int, **params) -> float:
+        if self.cost is None:
+            return 0.0
+        return float(self.cost(frames, channels, sample_rate, **params))
+
+
+# -------------------------------------------------------------------
+# Built-in modes
+# -------------------------------------------------------------------
+
+TEMPO = ModeParam("tempo", 120.0, float, gt=0, help="Tempo in BPM")
+BEATS_PER_BAR = ModeParam("beats_per_bar", 4, int, ge=1, help="Beats per bar")
+CROSSFADE = ModeParam("crossfade", 0, int, ge=0, help="Declick crossfade at slice boundaries, in frames")
+
+
+def _gather_cost(frames, channels, sample_rate, crossfade=0, **params):
+    """One read and one write per sample, plus the declick windows."""
+    seconds = frames * channels * GATHER_SECONDS
+    if crossfade:
+        seconds += frames * channels * DECLICK_SECONDS * min(crossfade / 1024.0, 1.0)
+    return seconds
+
+
+def _grain_cost(frames, channels, sample_rate, overlap=0.5, **params):
+    """Windowed overlap-add: grows with the number of grains covering a sample."""
+    covering = 1.0 / max(1.0 - overlap, 1e-3)
+    return frames * channels * (GRAIN_SECONDS + GRAIN_OVERLAP_SECONDS * covering)
+
+
+def _grain_scratch(frames, channels, sample_rate, **params):
+    """Grain batch and overlap-add accumulator, float32."""
+    return 2 * GRAIN_BLOCK * channels * 4
+
+
+def _slice_mode(name, render, plan, params, description):
+    return ModeSpec(
+        name=name,
+        render=render,
+        params=params,
+        plan=plan,
+        in_place=True,
+        parallel=True,
+        streamable=False,
+        full_buffer=True,
+        cost=_gather_cost,
+        description=description,
+    )
+
+
+BUILTIN_MODES = (
+    _slice_mode(
+        "TRUE_REVERSE", true_reverse, true_reverse_plan, (),
+        "Tape-style reverse of the whole file",
+    ),
+    _slice_mode(
+        "QBEAT_REVERSE", qbeat_reverse, subdivision_reverse_plan,
+        (TEMPO, BEATS_PER_BAR, ModeParam("subdivision", 0.25, float, gt=0, help="Slice length in beats"), CROSSFADE),
+        "Slice order reversed per beat subdivision",
+    ),
+    _slice_mode(
+        "HQ_REVERSE", hq_reverse, hq_reverse_plan,
+        (TEMPO, BEATS_PER_BAR, CROSSFADE),
+        "Slice order reversed per beat",
+    ),
+    _slice_mode(
+        "STUDIO_REVERSE", studio_reverse, studio_reverse_plan,
+        (TEMPO, BEATS_PER_BAR, ModeParam("bars_per_slice", 1, int, ge=1, help="Bars per slice"), CROSSFADE),
+        "Slice order reversed per N bars (at least two slices)",
+    ),
+    _slice_mode(
+        "TATUM_REVERSE", tatum_reverse, tatum_reverse_plan,
+        (TEMPO, BEATS_PER_BAR, ModeParam("tatum_fraction", 0.25, float, gt=0, help="Slice length in beats"), CROSSFADE),
+        "Slice order reversed per tatum (sub-beat)",
+    ),
+    ModeSpec(
+        name="GRAIN_REVERSE",
+        render=grain_reverse,
+        params=(
+            TEMPO,
+            BEATS_PER_BAR,
+            ModeParam("grain_fraction", 0.125, float, gt=0, help="Grain length in beats"),
+            ModeParam("overlap", 0.5, float, ge=0, lt=1, help="Grain overlap"),
+        ),
+        in_place=True,
+        parallel=False,
+        streamable=True,
+        full_buffer=False,
+        cost=_grain_cost,
+        scratch=_grain_scratch,
+        description="Hann-windowed grains, each played backwards in place",
+    ),
+)
+
+
+# -------------------------------------------------------------------
+# Registry
+# -------------------------------------------------------------------
+
+_REGISTRY = {}
+_plugins_loaded = False
+
+# name -> render / plan function, kept in step with the registry for
+# callers that predate it
+MODE_MAP = {}
+PLAN_MAP = {}
+
+
+def register_mode(spec: ModeSpec, replace: bool = False) -> ModeSpec:
+    """Add a mode; a name already registered needs replace=True."""
+    if not isinstance(spec, ModeSpec):
+        raise TypeError(f"register_mode needs a ModeSpec, got {type(spec).__name__}")
+    if spec.name in _REGISTRY and not replace:
+        raise ValueError(f"Mode {spec.name} is already registered")
+    _REGISTRY[spec.name] = spec
+    MODE_MAP[spec.name] = spec.render
+    if spec.plan is not None:
+        PLAN_MAP[spec.name] = spec.plan
+    else:
+        PLAN_MAP.pop(spec.name, None)
+    return spec
+
+
+def load_plugins(group: str = ENTRY_POINT_GROUP) -> list:
+    """
+    Register the modes published under the entry point group (once per
+    process). A plugin that fails to load or clashes with a registered
+    name is skipped with a warning. Returns the names added.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return []
+    _plugins_loaded = True
+
+    from importlib.metadata import entry_points
+
+    added = []
+    for ep in entry_points(group=group):
+        try:
+            obj = ep.load()
+            specs = obj() if callable(obj) and not isinstance(obj, ModeSpec) else obj
+            if isinstance(specs, ModeSpec):
+                specs = [specs]
+            for spec in specs:
+                if spec.name in _REGISTRY:
+                    raise ValueError(f"mode {spec.name} is already registered")
+                register_mode(replace(spec, origin=ep.value))
+                added.append(spec.name)
+        except Exception as e:
+            warnings.warn(f"Skipping mode plugin {ep.name} ({ep.value}): {e}")
+    return added
+
+
+def get_mode(name: str) -> ModeSpec:
+    spec = _REGISTRY.get(name)
+    if spec is None and not _plugins_loaded:
+        load_plugins()
+        spec = _REGISTRY.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown mode: {name}")
+    return spec
+
+
+def mode_names() -> list:
+    """Registered mode names (built-ins first, then plugins)."""
+    load_plugins()
+    return list(_REGISTRY)
+
+
+def all_modes() -> list:
+    load_plugins()
+    return list(_REGISTRY.values())
+
+
+def all_param_names() -> set:
+    """Every parameter name declared by a registered mode."""
+    load_plugins()
+    return {p.name for s in _REGISTRY.values() for p in s.params}
+
+
+for _spec in BUILTIN_MODES:
+    register_mode(_spec)
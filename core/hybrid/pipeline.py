@@ -1 +1,795 @@
-# core/hybrid/pipeline.pyimport timeimport numpy as npfrom core.dsp.reverse_modes import (    true_reverse,    qbeat_reverse,    hq_reverse,    studio_reverse,    tatum_reverse,)from core.economic.cost_estimator import CostEstimatorfrom core.economic.receipt_generator import generate_receipt# -------------------------------------------------------------------# DSP MODE MAP (deterministic timing, no Librosa)# -------------------------------------------------------------------MODE_MAP = {    "TRUE_REVERSE": true_reverse,    "QBEAT_REVERSE": qbeat_reverse,    "HQ_REVERSE": hq_reverse,    "STUDIO_REVERSE": studio_reverse,    "TATUM_REVERSE": tatum_reverse,}# -------------------------------------------------------------------# DSP-ONLY PIPELINE (used by dre.py CLI)# -------------------------------------------------------------------def process_audio(    audio: np.ndarray,    sample_rate: int,    mode: str,    tempo: float = 120.0,    beats_per_bar: int = 4,    tatum_fraction: float = 0.25,    **kwargs,) -> np.ndarray:    """    DSP-only processing entrypoint.    All structural modes use deterministic TimingGrid (no Librosa).    This is what the CLI (dre.py) should call.    """    if mode not in MODE_MAP:        raise ValueError(f"Unknown mode: {mode}")    dsp_fn = MODE_MAP[mode]    if mode == "TATUM_REVERSE":        return dsp_fn(            audio=audio,            sample_rate=sample_rate,            tempo=tempo,            beats_per_bar=beats_per_bar,            tatum_fraction=tatum_fraction,            **kwargs,        )    return dsp_fn(        audio=audio,        sample_rate=sample_rate,        tempo=tempo,        beats_per_bar=beats_per_bar,        **kwargs,    )# -------------------------------------------------------------------# FULL HYBRID PIPELINE (DSP + economic engine)# -------------------------------------------------------------------def process_audio_hybrid(    audio: np.ndarray,    sample_rate: int,    mode: str,    tier: str,    enriched_metadata: dict,    tempo: float = 120.0,    beats_per_bar: int = 4,    tatum_fraction: float = 0.25,    **kwargs,):    """    Full production pipeline:    - Deterministic DSP (TimingGrid-based)    - Cost estimation    - Gating    - Receipt generation    """    if mode not in MODE_MAP:        raise ValueError(f"Unknown mode: {mode}")    dsp_fn = MODE_MAP[mode]    # DSP timing    t0 = time.time()    if mode == "TATUM_REVERSE":        processed = dsp_fn(            audio=audio,            sample_rate=sample_rate,            tempo=tempo,            beats_per_bar=beats_per_bar,            tatum_fraction=tatum_fraction,            **kwargs,        )    else:        processed = dsp_fn(            audio=audio,            sample_rate=sample_rate,            tempo=tempo,            beats_per_bar=beats_per_bar,            **kwargs,        )    dsp_time = time.time() - t0    # Economic engine    estimator = CostEstimator()    cost = estimator.estimate_cost(enriched_metadata)    gating = estimator.apply_gating(cost, tier)    # Receipt    receipt = generate_receipt(        input_audio=audio,        output_audio=processed,        metadata=enriched_metadata,        mode=mode,        tier=tier,        datacostunits=cost,        gating=gating,    )    meta = {        "mode": mode,        "tier": tier,        "sample_rate": sample_rate,        "input_shape": audio.shape,        "output_shape": processed.shape,        "dsp_time_s": dsp_time,        "datacostunits": cost,        "gating": gating,    }    return processed, meta, receipt# -------------------------------------------------------------------# Local test harness# -------------------------------------------------------------------if __name__ == "__main__":    sr = 44100    audio = np.random.randn(sr * 4).astype(np.float32)    enriched_metadata = {        "contribution_type": "internal_test",        "complexity_factor": 1.0,        "transient_density": 0.2,        "quality_proxy_score": 1.0,    }    out, meta, receipt = process_audio_hybrid(        audio,        sample_rate=sr,        mode="HQ_REVERSE",        tier="free",        enriched_metadata=enriched_metadata,        tempo=128.0,        beats_per_bar=4,    )    print(meta)    print(receipt["signature"][:12])
\ No newline at end of file
+# core/hybrid/pipeline.py
+
+import contextlib
+import itertools
+import tempfile
+import time
+from functools import lru_cache
+import numpy as np
+
+from core.dsp.boundaries import boundary_discontinuity
+from core.dsp.declick import declick
+from core.dsp.slice_plan import SlicePlan, as_frames
+from core.dsp.virtual_buffer import VirtualBuffer
+from core.hybrid.memory_plan import MemoryProbe, plan_memory, predict_peak
+from core.hybrid.modes import MODE_MAP, PLAN_MAP, get_mode
+from core.io.audio_buffer import AudioBuffer, as_array
+from core.io.export import export_audio
+from core.timing.grid import grid_steps, regular_grid
+from core import spans
+from core.spans import span
+
+from core.economic.cost_estimator import CostEstimator
+from core.economic.receipt_generator import generate_receipt, _hash_audio
+
+# Bump whenever a change alters rendered output for the same parameters;
+# it is part of every render cache key.
+ENGINE_VERSION = "2"
+
+
+# Modes (deterministic timing, no Librosa) live in the registry,
+# core.hybrid.modes: each ModeSpec declares its parameters and what the
+# engine may do with it (slice plan, in place, threads, cost model).
+# MODE_MAP / PLAN_MAP are its name -> function views.
+
+# process_audio's own keywords (everything else goes to the mode)
+PROCESS_KWARGS = ("memory_budget", "allow_in_place", "memory_probe", "memory_report")
+
+
+# -------------------------------------------------------------------
+# DSP-ONLY PIPELINE (used by dre.py CLI)
+# -------------------------------------------------------------------
+
+def process_audio(
+    audio: np.ndarray,
+    sample_rate: int,
+    mode: str,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    progress=None,
+    cancel=None,
+    memory_budget: int = None,
+    allow_in_place: bool = False,
+    memory_probe: str = None,
+    memory_report: dict = None,
+    **kwargs,
+) -> np.ndarray:
+    """
+    DSP-only processing entrypoint.
+    All structural modes use deterministic TimingGrid (no Librosa).
+    This is what the CLI (dre.py) should call.
+
+    progress: optional callable receiving the completed fraction (0..1)
+    cancel:   optional CancelToken; the render stops between slice blocks
+              with RenderCancelled once it is triggered
+    crossfade (kwarg): declick every slice boundary with an equal-power
+              crossfade of this many frames (see core.dsp.declick)
+
+    memory_budget:  bytes the job may use. The peak of each execution
+                    strategy (see core.hybrid.memory_plan) is predicted
+                    from the shape and mode, and the fastest one that fits
+                    is run: a second buffer (gather), rendering over the
+                    input (in_place, only with allow_in_place), or a
+                    memory-mapped temporary output (memmap).
+                    MemoryBudgetExceeded when nothing fits.
+    allow_in_place: the input buffer may be overwritten
+    memory_probe:   "rss" or "tracemalloc": measure the actual peak too
+    memory_report:  dict filled with the plan (strategy, predicted_bytes,
+                    actual_bytes, ...)
+
+    Parameters are validated against the mode's ModeSpec before anything
+    runs (ValueError for unknown names or out-of-range values); those of
+    other modes are ignored.
+    """
+    spec = get_mode(mode)
+    params = spec.validate(tempo=tempo, beats_per_bar=beats_per_bar, tatum_fraction=tatum_fraction, **kwargs)
+    execution = _execution(spec, kwargs, progress, cancel)
+
+    if memory_budget is not None or memory_report is not None or memory_probe is not None:
+        return _process_planned(
+            audio, sample_rate, spec, params, execution,
+            memory_budget, allow_in_place, memory_probe, memory_report,
+        )
+    return _render_mode(audio, sample_rate, spec, params, execution)
+
+
+def _execution(spec, kwargs: dict, progress, cancel) -> dict:
+    """The execution kwargs spec.render takes (threads only if it is parallel)."""
+    execution = {k: kwargs[k] for k in ("out", "threads") if kwargs.get(k) is not None}
+    if not spec.parallel:
+        execution.pop("threads", None)
+    execution.update(progress=progress, cancel=cancel)
+    return execution
+
+
+def _render_mode(audio, sample_rate, spec, params: dict, execution: dict):
+    cancel = execution["cancel"]
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    return spec.render(audio=audio, sample_rate=sample_rate, **params, **execution)
+
+
+def _process_planned(audio, sample_rate, spec, params, execution, budget, allow_in_place, probe, report):
+    """process_audio under a memory budget (see plan_memory)."""
+    a = as_array(audio)
+    channels = a.shape[1] if a.ndim > 1 else 1
+
+    if execution.get("out") is not None:
+        # The caller already owns the output buffer
+        plan = predict_peak("gather", len(a), channels, sample_rate, spec.name, **params)
+        plan.budget, plan.reason = budget, "caller's out buffer"
+    else:
+        plan = plan_memory(
+            len(a), channels, sample_rate, spec.name, budget=budget,
+            source="array", allow_in_place=allow_in_place, **params,
+        )
+
+    with (MemoryProbe(probe) if probe else contextlib.nullcontext()) as measured:
+        result = _render_strategy(plan.strategy, audio, sample_rate, spec, params, execution)
+
+    if probe:
+        # The input was already resident before the probe started
+        plan.actual_bytes = plan.input_bytes + measured.peak_bytes
+    if report is not None:
+        report.update(plan.as_dict())
+    return result
+
+
+def _render_strategy(strategy, audio, sample_rate, spec, params: dict, execution: dict):
+    """Run process_audio's render with a memory_plan strategy."""
+    a = as_array(audio)
+    if strategy == "in_place" and spec.permutation:
+        cancel = execution["cancel"]
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        plan = spec.plan(total_samples=len(a), sample_rate=sample_rate, **params)
+        plan.render_in_place(a, progress=execution["progress"], cancel=cancel)
+        if isinstance(audio, AudioBuffer):
+            audio.touch()
+        return audio
+
+    if strategy == "in_place":
+        execution = dict(execution, out=audio)
+    elif strategy == "memmap":
+        out = np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=a.shape)
+        execution = dict(execution, out=out)
+    return _render_mode(audio, sample_rate, spec, params, execution)
+
+
+# -------------------------------------------------------------------
+# FILE RENDER (strategy chosen from the header before decoding)
+# -------------------------------------------------------------------
+
+class _FileFrames:
+    """
+    Seekable sound file as a read-only frame source for SlicePlan.read:
+    each slice decodes just that range (float32, load_audio's layout).
+    """
+
+    def __init__(self, sound_file):
+        self.file = sound_file
+        self.shape = (sound_file.frames,) + ((sound_file.channels,) if sound_file.channels > 1 else ())
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        start, stop, _ = key.indices(len(self))
+        self.file.seek(start)
+        return self.file.read(max(stop - start, 0), dtype="float32", always_2d=False)
+
+
+class _PlanFrames:
+    """A slice plan over a _FileFrames source as a frame source for export_audio."""
+
+    def __init__(self, plan, source, cancel=None):
+        self.plan = plan
+        self.source = source
+        self.cancel = cancel
+        self.shape = source.shape
+
+    def read(self, start, stop, out=None):
+        # One thread: the source file has a single seek position
+        return self.plan.read(self.source, start, stop, out=out, cancel=self.cancel, threads=1)
+
+
+def process_file(
+    input_path: str,
+    output_path: str,
+    mode: str,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    memory_budget: int = None,
+    memory_probe: str = None,
+    progress=None,
+    cancel=None,
+    **kwargs,
+):
+    """
+    Render a file to a file within memory_budget bytes.
+
+    output_path may also be a list of export targets ("mix.flac:24", see
+    core.io.export); all of them are encoded concurrently from the one
+    render, each written to a temporary name and renamed into place.
+
+    The strategy is planned from the header (audio_info) before anything
+    is decoded (see core.hybrid.memory_plan): decode and gather, decode
+    and render in place, chunked (the output is produced block by block
+    through the slice plan, each block reading its source slices straight
+    from the input file), or memmap (input and output in temporary
+    memory-mapped files, encoded block by block). Files without a
+    soundfile header (compressed formats) are decoded first and planned
+    like an array.
+
+    Returns the MemoryPlan, with actual_bytes when memory_probe is set.
+    """
+    from core.io.audio_loader import audio_info, load_audio
+
+    spec = get_mode(mode)
+    params = spec.validate(tempo=tempo, beats_per_bar=beats_per_bar, tatum_fraction=tatum_fraction, **kwargs)
+    render = (spec, params, _execution(spec, kwargs, progress, cancel))
+
+    info = audio_info(input_path)
+    if info is None:
+        with (MemoryProbe(memory_probe) if memory_probe else contextlib.nullcontext()) as measured:
+            audio, sr = load_audio(input_path)
+            channels = audio.shape[1] if audio.ndim > 1 else 1
+            plan = plan_memory(
+                len(audio), channels, sr, mode, budget=memory_budget,
+                allow_in_place=True, compressed=True, **params,
+            )
+            plan.reason = f"no header, planned after decode; {plan.reason}"
+            export_audio(_render_strategy(plan.strategy, audio, sr, *render), sr, output_path)
+    else:
+        frames, channels, sr = info
+        plan = plan_memory(frames, channels, sr, mode, budget=memory_budget, source="file", **params)
+        with (MemoryProbe(memory_probe) if memory_probe else contextlib.nullcontext()) as measured:
+            if plan.strategy in ("gather", "in_place"):
+                audio, sr = load_audio(input_path)
+                export_audio(_render_strategy(plan.strategy, audio, sr, *render), sr, output_path)
+            elif plan.strategy == "chunked":
+                _render_chunked(input_path, output_path, sr, spec, params, progress, cancel)
+            else:
+                _render_memmap(input_path, output_path, frames, channels, sr, render)
+
+    if memory_probe:
+        plan.actual_bytes = measured.peak_bytes
+    return plan
+
+
+def _render_chunked(input_path, output_path, sample_rate, spec, params, progress, cancel):
+    """Output block by block through the slice plan, reading slices from the file."""
+    import soundfile as sf
+
+    with sf.SoundFile(input_path) as src_file:
+        source = _FileFrames(src_file)
+        plan = spec.plan(total_samples=len(source), sample_rate=sample_rate, **params)
+        export_audio(_PlanFrames(plan, source, cancel), sample_rate, output_path, progress=progress, cancel=cancel)
+
+
+def _render_memmap(input_path, output_path, frames, channels, sample_rate, render):
+    """Decode into a temporary memmap, render into another, encode block by block."""
+    import soundfile as sf
+
+    from core.io.pcm_stream import STREAM_BLOCK
+
+    shape = (frames, channels) if channels > 1 else (frames,)
+    audio = np.memmap(tempfile.TemporaryFile(), dtype=np.float32, mode="w+", shape=shape)
+    with sf.SoundFile(input_path) as src_file:
+        for start in range(0, frames, STREAM_BLOCK):
+            stop = min(start + STREAM_BLOCK, frames)
+            src_file.read(stop - start, dtype="float32", always_2d=False, out=audio[start:stop])
+
+    out = _render_strategy("memmap", audio, sample_rate, *render)
+    export_audio(out, sample_rate, output_path)
+
+
+# -------------------------------------------------------------------
+# VIRTUAL RENDER (slice plan only, materialized on demand)
+# -------------------------------------------------------------------
+
+def build_plan(
+    total_samples: int,
+    sample_rate: int,
+    mode: str,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    **kwargs,
+):
+    """
+    Describe what process_audio would do as a SlicePlan.
+    Takes the same parameters, but only needs the length of the audio.
+    """
+    spec = get_mode(mode)
+    if not spec.permutation:
+        raise ValueError(f"{mode} is not a slice permutation and has no SlicePlan")
+
+    params = spec.validate(tempo=tempo, beats_per_bar=beats_per_bar, tatum_fraction=tatum_fraction, **kwargs)
+    return spec.plan(total_samples=total_samples, sample_rate=sample_rate, **params)
+
+
+def process_audio_virtual(
+    audio,
+    sample_rate: int,
+    mode: str,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    **kwargs,
+) -> VirtualBuffer:
+    """
+    Lazy process_audio: returns a VirtualBuffer that reads through the
+    mode's slice plan instead of allocating the output (crossfade is
+    applied per read).
+    """
+    plan = build_plan(
+        len(audio),
+        sample_rate,
+        mode,
+        tempo=tempo,
+        beats_per_bar=beats_per_bar,
+        tatum_fraction=tatum_fraction,
+        **kwargs,
+    )
+    return VirtualBuffer(as_array(audio), plan, crossfade=kwargs.get("crossfade") or 0)
+
+
+# -------------------------------------------------------------------
+# BATCH (many short clips, one gather per bucket)
+# -------------------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def _batch_plan(total_samples: int, sample_rate: int, mode: str, params: tuple):
+    """Slice plan for one bucket shape; cached across batches."""
+    return build_plan(total_samples, sample_rate, mode, **dict(params))
+
+
+def _gather_batch(plan, stack: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Apply plan along axis 1 of a (clips, frames[, channels]) block.
+    One strided copy per plan segment covers every clip in the bucket,
+    which beats a per-frame fancy index (stack[:, idx]) because each row
+    is still copied in contiguous runs.
+    """
+    src_frames, out_frames = stack, out
+    if stack.dtype == out.dtype and stack.ndim == 3:
+        src_frames, out_frames = as_frames(stack), as_frames(out)
+
+    for d, s, n, k in zip(plan.dst.tolist(), plan.src.tolist(), plan.length.tolist(), plan.step.tolist()):
+        if k > 0:
+            out[:, d:d + n] = stack[:, s:s + n]
+        else:
+            out_frames[:, d:d + n] = src_frames[:, s - n + 1:s + 1][:, ::-1]
+    return out
+
+
+def process_batch(
+    clips,
+    sample_rate=None,
+    mode: str = "TRUE_REVERSE",
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    clip_params=None,
+    **kwargs,
+) -> list:
+    """
+    process_audio over many clips (sample-pack one-shots).
+
+    Clips with the same (length, channels, sample rate, parameters) share
+    one bucket: the bucket's slice plan is built once (and cached across
+    calls), the clips are stacked into a (clips, frames[, channels]) block
+    and the whole block is permuted with one copy per plan segment.
+    Results come back in input order; each one is a view into its
+    bucket's output block.
+
+    clips:       list of arrays / AudioBuffers, or an already stacked
+                 (clips, frames[, channels]) array (no stacking copy)
+    sample_rate: int, or one per clip (AudioBuffers carry their own)
+    clip_params: optional list of per-clip overrides of the keyword
+                 parameters, e.g. [{"tempo": 128.0}, {}, ...]
+
+    Every clip's parameters are validated before anything is rendered.
+    Modes without a slice plan cannot share a gather; their clips are
+    rendered one by one with process_audio.
+    """
+    spec = get_mode(mode)
+
+    n = len(clips)
+    if sample_rate is None or np.isscalar(sample_rate):
+        rates = [sample_rate] * n
+    else:
+        rates = list(sample_rate)
+
+    shared = dict(kwargs, tempo=tempo, beats_per_bar=beats_per_bar, tatum_fraction=tatum_fraction)
+
+    buckets = {}
+    for i in range(n):
+        clip = clips[i]
+        audio = as_array(clip)
+        sr = clip.sample_rate if isinstance(clip, AudioBuffer) else rates[i]
+        if sr is None:
+            raise ValueError(f"No sample rate for clip {i}")
+        params = shared
+        if clip_params is not None and clip_params[i]:
+            params = dict(shared, **clip_params[i])
+        params = spec.validate(**params)
+        key = (len(audio), audio.shape[1:], int(sr), tuple(sorted(params.items())))
+        buckets.setdefault(key, []).append(i)
+
+    results = [None] * n
+    for (length, tail, sr, params), members in buckets.items():
+        if not spec.permutation:
+            for i in members:
+                results[i] = process_audio(clips[i], sr, mode, **dict(params))
+            continue
+
+        plan = _batch_plan(length, sr, mode, params)
+
+        if isinstance(clips, np.ndarray) and len(members) == n:
+            stack = clips
+        else:
+            stack = np.empty((len(members), length) + tail, dtype=np.float32)
+            for j, i in enumerate(members):
+                stack[j] = as_array(clips[i])
+
+        out = _gather_batch(plan, stack, np.empty((len(members), length) + tail, dtype=np.float32))
+        crossfade = dict(params).get("crossfade")
+        if crossfade:
+            for j in range(len(members)):
+                declick(plan, stack[j], out[j], crossfade=crossfade)
+
+        for j, i in enumerate(members):
+            clip = clips[i]
+            results[i] = AudioBuffer(out[j], sr) if isinstance(clip, AudioBuffer) else out[j]
+
+    return results
+
+
+# -------------------------------------------------------------------
+# SWEEP (one input, many tempos / subdivisions)
+# -------------------------------------------------------------------
+
+# Parameters a sweep can vary, with process_audio's defaults
+SWEEP_DEFAULTS = {
+    "tempo": 120.0,
+    "beats_per_bar": 4,
+    "tatum_fraction": 0.25,
+    "subdivision": 0.25,
+    "bars_per_slice": 1,
+}
+
+
+# Grid modes whose slice length sweep_steps() can compute
+SWEEP_MODES = ("TRUE_REVERSE", "QBEAT_REVERSE", "HQ_REVERSE", "STUDIO_REVERSE", "TATUM_REVERSE")
+
+
+def sweep_combinations(sweep: dict, **fixed) -> list:
+    """
+    Every combination of the swept values (cartesian product, first key
+    varying slowest), each as a full parameter dict on top of fixed.
+    sweep: e.g. {"tempo": [127.5, 127.55, ...], "tatum_fraction": [0.25, 0.5]}
+    """
+    unknown = set(sweep) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Cannot sweep {sorted(unknown)}; sweepable: {sorted(SWEEP_DEFAULTS)}")
+
+    names = list(sweep)
+    base = {k: fixed.get(k, v) for k, v in SWEEP_DEFAULTS.items()}
+    return [dict(base, **dict(zip(names, values))) for values in itertools.product(*(sweep[k] for k in names))]
+
+
+def sweep_steps(mode: str, sample_rate: int, combos: list) -> np.ndarray:
+    """
+    Slice length each combination gives in this mode, computed for all of
+    them at once (one vectorized TimingGrid evaluation). Combinations with
+    equal steps render identical output.
+    """
+    if mode not in SWEEP_MODES:
+        get_mode(mode)
+        raise ValueError(f"{mode} cannot be swept (sweepable modes: {', '.join(SWEEP_MODES)})")
+
+    col = {k: np.array([c[k] for c in combos]) for k in SWEEP_DEFAULTS}
+    tempo, bpb = col["tempo"], col["beats_per_bar"]
+
+    if mode == "TRUE_REVERSE":
+        return np.zeros(len(combos), dtype=np.int64)
+    if mode == "HQ_REVERSE":
+        return grid_steps(sample_rate, tempo, bpb, unit="beat")
+    if mode == "QBEAT_REVERSE":
+        return grid_steps(sample_rate, tempo, bpb, unit="subdivision", fraction=col["subdivision"])
+    if mode == "TATUM_REVERSE":
+        return grid_steps(sample_rate, tempo, bpb, unit="subdivision", fraction=col["tatum_fraction"])
+    # STUDIO_REVERSE
+    return grid_steps(sample_rate, tempo, bpb, unit="bar") * col["bars_per_slice"].astype(np.int64)
+
+
+def _sweep_plan(mode: str, total: int, step: int) -> SlicePlan:
+    """The plan build_plan() gives for a combination with this step."""
+    if mode == "TRUE_REVERSE":
+        return SlicePlan.flip(total)
+    grid = regular_grid(total, step)
+    if mode == "STUDIO_REVERSE" and len(grid) < 3:
+        # Same rule as studio_reverse_plan: always at least 2 slices
+        grid = np.array([0, total // 2, total], dtype=int)
+    return SlicePlan.from_grid(grid, total)
+
+
+def process_sweep(
+    audio,
+    sample_rate: int,
+    mode: str,
+    sweep: dict,
+    score: bool = False,
+    out=None,
+    progress=None,
+    cancel=None,
+    threads: int = None,
+    **kwargs,
+):
+    """
+    Render one (already decoded) input for every combination of the swept
+    parameters, e.g. tempo 127.5..128.5 in 0.05 steps when the BPM is
+    uncertain.
+
+    Generator yielding (params, rendered, discontinuity) per combination,
+    in sweep_combinations() order. rendered is a single output buffer
+    (out, or allocated once) reused for every combination, so it is only
+    valid until the next iteration: write or copy it before moving on.
+    Combinations that land on the same slice length are rendered once.
+
+    score: also compute boundary_discontinuity() of each render (lower is
+           cleaner), else discontinuity is None
+    progress/cancel/threads: as for process_audio; progress covers the
+           whole sweep
+    """
+    combos = sweep_combinations(sweep, **kwargs)
+    steps = sweep_steps(mode, sample_rate, combos)
+    crossfade = kwargs.get("crossfade")
+
+    a = as_array(audio)
+    total = len(a)
+    target = as_array(out) if out is not None else np.empty(a.shape, dtype=np.float32)
+
+    last = None
+    value = None
+    for k, (params, step) in enumerate(zip(combos, steps.tolist())):
+        if step != last:
+            plan = _sweep_plan(mode, total, step)
+            part = None
+            if progress is not None:
+                part = lambda f, k=k: progress((k + f) / len(combos))
+            plan.render(a, out=target, progress=part, cancel=cancel, threads=threads)
+            if crossfade:
+                declick(plan, a, target, crossfade=crossfade)
+            value = boundary_discontinuity(target, plan.boundaries) if score else None
+            last = step
+        elif progress is not None:
+            progress((k + 1) / len(combos))
+
+        rendered = target
+        if isinstance(out, AudioBuffer):
+            out.touch()
+            rendered = out
+        elif isinstance(audio, AudioBuffer):
+            rendered = AudioBuffer(target, audio.sample_rate)
+        yield dict(params), rendered, value
+
+
+# -------------------------------------------------------------------
+# FULL HYBRID PIPELINE (DSP + economic engine)
+# -------------------------------------------------------------------
+
+def process_audio_hybrid(
+    audio: np.ndarray,
+    sample_rate: int,
+    mode: str,
+    tier: str,
+    enriched_metadata: dict,
+    tempo: float = 120.0,
+    beats_per_bar: int = 4,
+    tatum_fraction: float = 0.25,
+    usage_log=None,
+    cache=None,
+    **kwargs,
+):
+    """
+    Full production pipeline:
+    - Deterministic DSP (TimingGrid-based)
+    - Cost estimation
+    - Gating
+    - Receipt generation
+    - Usage log entry (when a UsageLogWriter is passed; queued, not written inline)
+
+    cache: optional RenderCache. The input is hashed once (the receipt
+    needs that hash anyway); a hit returns the stored output without DSP
+    or output hashing, a miss stores the fresh render.
+
+    With core.spans enabled, meta["spans"] holds the seconds spent per
+    stage (hash, dsp, grid, cost, sign, cache_store) in this call.
+
+    memory_budget / memory_probe (kwargs) are passed on to process_audio;
+    its memory plan (predicted vs actual peak) is returned in meta["memory"].
+    """
+    # Reject bad parameters before the input is hashed
+    get_mode(mode).validate(
+        tempo=tempo, beats_per_bar=beats_per_bar, tatum_fraction=tatum_fraction,
+        **{k: v for k, v in kwargs.items() if k not in PROCESS_KWARGS},
+    )
+
+    with spans.collect() as recorded:
+        input_hash = key = None
+        if cache is not None:
+            input_hash = _hash_audio(audio)
+            key = cache.audio_key(
+                input_hash, mode, tempo=tempo, beats_per_bar=beats_per_bar,
+                tatum_fraction=tatum_fraction, **kwargs,
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                out = kwargs.get("out")
+                processed = entry.audio
+                if out is not None:
+                    as_array(out)[...] = processed
+                    processed = out
+                result = result_from_cache(
+                    entry, mode, tier, enriched_metadata, usage_log=usage_log,
+                    input_shape=audio.shape, output=processed,
+                )
+                if spans.enabled():
+                    result[1]["spans"] = spans.totals(recorded)
+                return result
+
+        memory = None
+        if kwargs.get("memory_budget") is not None or kwargs.get("memory_probe"):
+            memory = kwargs.setdefault("memory_report", {})
+
+        # DSP timing
+        t0 = time.perf_counter()
+        with span("dsp"):
+            processed = process_audio(
+                audio,
+                sample_rate,
+                mode,
+                tempo=tempo,
+                beats_per_bar=beats_per_bar,
+                tatum_fraction=tatum_fraction,
+                **kwargs,
+            )
+        dsp_time = time.perf_counter() - t0
+
+        # Economic engine
+        with span("cost"):
+            estimator = CostEstimator()
+            cost = estimator.estimate_cost(enriched_metadata)
+            gating = estimator.apply_gating(cost, tier)
+
+        # Receipt
+        receipt = generate_receipt(
+            input_audio=audio,
+            output_audio=processed,
+            metadata=enriched_metadata,
+            mode=mode,
+            tier=tier,
+            datacostunits=cost,
+            gating=gating,
+            input_hash=input_hash,
+        )
+
+        if cache is not None:
+            with span("cache_store"):
+                cache.put(
+                    key, as_array(processed), sample_rate,
+                    input_hash=receipt["input_hash"], output_hash=receipt["output_hash"],
+                    receipt=receipt,
+                )
+
+    meta = {
+        "mode": mode,
+        "tier": tier,
+        "sample_rate": sample_rate,
+        "input_shape": audio.shape,
+        "output_shape": processed.shape,
+        "dsp_time_s": dsp_time,
+        "datacostunits": cost,
+        "gating": gating,
+    }
+
+    if cache is not None:
+        meta["cache"] = "miss"
+    if memory is not None:
+        meta["memory"] = memory
+    if spans.enabled():
+        meta["spans"] = spans.totals(recorded)
+
+    if usage_log is not None:
+        usage_log.log_receipt(receipt)
+
+    return processed, meta, receipt
+
+
+def result_from_cache(
+    entry,
+    mode: str,
+    tier: str,
+    enriched_metadata: dict,
+    usage_log=None,
+    input_shape=None,
+    output=None,
+):
+    """
+    (processed, meta, receipt) for a RenderCache hit, shaped like
+    process_audio_hybrid's result. Cost and gating are evaluated for this
+    request's tier; the audio hashes come from the cache entry, so neither
+    input nor output is decoded or hashed.
+    """
+    processed = entry.audio if output is None else output
+
+    with spans.collect() as recorded:
+        with span("cost"):
+            estimator = CostEstimator()
+            cost = estimator.estimate_cost(enriched_metadata)
+            gating = estimator.apply_gating(cost, tier)
+
+        receipt = generate_receipt(
+            input_audio=None,
+            output_audio=None,
+            metadata=enriched_metadata,
+            mode=mode,
+            tier=tier,
+            datacostunits=cost,
+            gating=gating,
+            input_hash=entry.input_hash,
+            output_hash=entry.output_hash,
+        )
+
+    meta = {
+        "mode": mode,
+        "tier": tier,
+        "sample_rate": entry.sample_rate,
+        "input_shape": input_shape if input_shape is not None else processed.shape,
+        "output_shape": processed.shape,
+        "dsp_time_s": 0.0,
+        "datacostunits": cost,
+        "gating": gating,
+        "cache": "hit",
+    }
+    if spans.enabled():
+        meta["spans"] = spans.totals(recorded)
+
+    if usage_log is not None:
+        usage_log.log_receipt(receipt)
+
+    return processed, meta, receipt
+
+
+# -------------------------------------------------------------------
+# Local test harness
+# -------------------------------------------------------------------
+
+if __name__ == "__main__":
+    sr = 44100
+    audio = np.random.randn(sr * 4).astype(np.float32)
+
+    enriched_metadata = {
+        "contribution_type": "internal_test",
+        "complexity_factor": 1.0,
+        "transient_density": 0.2,
+        "quality_proxy_score": 1.0,
+    }
+
+    out, meta, receipt = process_audio_hybrid(
+        audio,
+        sample_rate=sr,
+        mode="HQ_REVERSE",
+        tier="free",
+        enriched_metadata=enriched_metadata,
+        tempo=128.0,
+        beats_per_bar=4,
+    )
+
+    print(meta)
+    print(receipt["signature"][:12])
@@ -0,0 +1,264 @@
+# core/hybrid/render_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from core.hybrid.modes import all_param_names, get_mode
+
+DEFAULT_CACHE_DIR = os.path.join("cache", "renders")
+
+# Keyword arguments that change how a render runs, never what it produces
+EXECUTION_KWARGS = (
+    "out", "progress", "cancel", "threads",
+    "memory_budget", "allow_in_place", "memory_probe", "memory_report",
+)
+
+# Read size when hashing input files
+_HASH_BLOCK = 1 << 20
+
+
+def render_params(mode: str, **kwargs) -> dict:
+    """
+    Canonical, JSON-able description of everything that determines a
+    render's output. The mode's parameters are validated (see
+    ModeSpec.validate) and only those that differ from their defaults are
+    kept, so renders that produce the same output share a key: parameters
+    the mode ignores, a crossfade of 0 and an omitted one all key alike.
+    Execution-only kwargs are dropped; anything else (e.g. the CLI's
+    declick_ms) is kept as given unless it is None.
+    """
+    spec = get_mode(mode)
+    declared = all_param_names()
+    values = spec.validate(**{k: v for k, v in kwargs.items() if k in declared})
+
+    params = {"mode": mode}
+    for p in spec.params:
+        if values[p.name] != p.default:
+            params[p.name] = values[p.name]
+    for k, v in kwargs.items():
+        if k not in declared and k not in EXECUTION_KWARGS and v is not None:
+            params[k] = v
+    return params
+
+
+def hash_file(path_or_bytes) -> str:
+    """sha256 of a file's bytes (or of an in-memory upload)."""
+    h = hashlib.sha256()
+    if isinstance(path_or_bytes, (bytes, bytearray, memoryview)):
+        h.update(path_or_bytes)
+    elif hasattr(path_or_bytes, "read"):
+        pos = path_or_bytes.tell()
+        for block in iter(lambda: path_or_bytes.read(_HASH_BLOCK), b""):
+            h.update(block)
+        path_or_bytes.seek(pos)
+    else:
+        with open(path_or_bytes, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+class CacheEntry:
+    """One cached render: output audio (memory-mapped, read-only) plus record."""
+
+    def __init__(self, audio: np.ndarray, record: dict):
+        self.audio = audio
+        self.record = record
+
+    @property
+    def sample_rate(self) -> int:
+        return self.record["sample_rate"]
+
+    @property
+    def input_hash(self) -> str:
+        return self.record["input_hash"]
+
+    @property
+    def output_hash(self) -> str:
+        return self.record["output_hash"]
+
+    @property
+    def receipt(self) -> dict:
+        """Receipt issued when the render was first produced."""
+        return self.record.get("receipt")
+
+
+class RenderCache:
+    """
+    Content-addressed store of finished renders.
+
+    Renders are deterministic, so (input content, render params, engine
+    version) fully determines the output. Entries are keyed two ways:
+
+        file_key()  – hash of the encoded input file: a hit skips decode too
+        audio_key() – input_hash of decoded audio (as in receipts)
+
+    Each entry is <key>.npy (float32 output) plus <key>.json (sample rate,
+    input/output hashes, original receipt), written atomically. Hits touch
+    the files' mtime, which is the LRU clock; once the store grows past
+    max_bytes the least recently used entries are deleted.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = 4 << 30, engine_version: str = None):
+        if engine_version is None:
+            from core.hybrid.pipeline import ENGINE_VERSION
+            engine_version = ENGINE_VERSION
+        self.root = root
+        self.max_bytes = max_bytes
+        self.engine_version = engine_version
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._bytes = None          # lazily scanned
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ---------------------------------------------------------------
+    # Keys
+    # ---------------------------------------------------------------
+    def _key(self, kind: str, content: str, params: dict) -> str:
+        blob = json.dumps(
+            {"kind": kind, "content": content, "params": params, "engine": self.engine_version},
+            sort_keys=True,
+        )
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def file_key(self, source, mode: str, **params) -> str:
+        return self._key("file", hash_file(source), render_params(mode, **params))
+
+    def audio_key(self, input_hash: str, mode: str, **params) -> str:
+        return self._key("audio", input_hash, render_params(mode, **params))
+
+    def _paths(self, key: str):
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".npy", base + ".json"
+
+    # ---------------------------------------------------------------
+    # Lookup / store
+    # ---------------------------------------------------------------
+    def get(self, key: str):
+        """CacheEntry for key, or None (counted as a miss)."""
+        npy, meta = self._paths(key)
+        try:
+            with open(meta, "r") as f:
+                record = json.load(f)
+            audio = np.load(npy, mmap_mode="r")
+        except (OSError, ValueError):
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        now = time.time()
+        for path in (npy, meta):
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        with self._lock:
+            self._counters["hits"] += 1
+        return CacheEntry(audio, record)
+
+    def put(self, key: str, audio, sample_rate: int, input_hash: str, output_hash: str, receipt: dict = None, params: dict = None):
+        npy, meta = self._paths(key)
+        os.makedirs(os.path.dirname(npy), exist_ok=True)
+        tag = f".{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(npy + tag, "wb") as f:
+            np.save(f, np.ascontiguousarray(audio, dtype=np.float32))
+        record = {
+            "sample_rate": int(sample_rate),
+            "input_hash": input_hash,
+            "output_hash": output_hash,
+            "engine_version": self.engine_version,
+            "params": params,
+            "receipt": receipt,
+            "created": time.time(),
+        }
+        with open(meta + tag, "w") as f:
+            json.dump(record, f, default=str)
+
+        # Audio first: a record is only visible once its audio is
+        os.replace(npy + tag, npy)
+        os.replace(meta + tag, meta)
+
+        added = os.path.getsize(npy) + os.path.getsize(meta)
+        with self._lock:
+            self._counters["stores"] += 1
+            if self._bytes is not None:
+                self._bytes += added
+        self._evict()
+
+    # ---------------------------------------------------------------
+    # LRU eviction
+    # ---------------------------------------------------------------
+    def _entries(self):
+        """[(last use, bytes, npy path, json path)] for every entry on disk."""
+        entries = []
+        for sub in os.listdir(self.root):
+            d = os.path.join(self.root, sub)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                if not name.endswith(".json"):
+                    continue
+                meta = os.path.join(d, name)
+                npy = meta[:-5] + ".npy"
+                try:
+                    st_meta = os.stat(meta)
+                    st_npy = os.stat(npy)
+                except FileNotFoundError:
+                    continue
+                entries.append((max(st_meta.st_mtime, st_npy.st_mtime), st_meta.st_size + st_npy.st_size, npy, meta))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._bytes is not None and self._bytes <= self.max_bytes:
+                return
+
+        entries = self._entries()
+        total = sum(e[1] for e in entries)
+        if total > self.max_bytes:
+            # Trim to 90% so a full cache does not rescan on every store
+            target = self.max_bytes * 0.9
+            entries.sort()
+            for _, size, npy, meta in entries:
+                if total <= target:
+                    break
+                for path in (meta, npy):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                with self._lock:
+                    self._counters["evictions"] += 1
+        with self._lock:
+            self._bytes = total
+
+    def clear(self):
+        for _, _, npy, meta in self._entries():
+            for path in (meta, npy):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            c = dict(self._counters)
+            size = self._bytes
+        lookups = c["hits"] + c["misses"]
+        return {
+            **c,
+            "hit_ratio": c["hits"] / lookups if lookups else 0.0,
+            "miss_ratio": c["misses"] / lookups if lookups else 0.0,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,133 @@
+# core/hybrid/scheduler.py
+
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.hybrid.pipeline import process_audio
+
+
+class RenderJob:
+    """Handle for one scheduled render."""
+
+    def __init__(self, job_id: int, key: str):
+        self.id = job_id
+        self.key = key
+        self.token = CancelToken()
+        self.future = None
+        self.progress = 0.0
+        self.status = "queued"      # queued | running | done | failed | cancelled
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+        if self.future is not None and self.future.cancel():
+            # Never started: drop it without running
+            self.status = "cancelled"
+
+
+class RenderScheduler:
+    """
+    Runs renders on a bounded thread pool (NumPy copies release the GIL).
+
+    Jobs are submitted under a key (e.g. "gui"). A new job supersedes any
+    queued or running job with the same key: queued ones are dropped and
+    running ones stop cooperatively at their next slice block, so mashing
+    mode buttons only ever finishes the last request.
+    """
+
+    def __init__(self, max_workers: int = None, progress_step: float = 0.01):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max(int(max_workers), 1)
+        self.progress_step = progress_step
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="dre-render"
+        )
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._ids = itertools.count(1)
+
+    # ---------------------------------------------------------------
+    # Submission
+    # ---------------------------------------------------------------
+    def submit(self, key: str, fn=process_audio, on_progress=None, on_done=None, **params) -> RenderJob:
+        """
+        Queue fn(**params, progress=..., cancel=...) under key.
+
+        on_progress(job, fraction) is throttled to progress_step increments.
+        on_done(job, result, error) fires once for jobs that were not
+        superseded or cancelled.
+        """
+        job = RenderJob(next(self._ids), key)
+
+        with self._lock:
+            previous = self._latest.get(key)
+            self._latest[key] = job
+        if previous is not None:
+            previous.cancel()
+
+        def report(fraction):
+            if fraction - job.progress >= self.progress_step or fraction >= 1.0:
+                job.progress = fraction
+                if on_progress is not None:
+                    on_progress(job, fraction)
+
+        def run():
+            if job.cancelled:
+                job.status = "cancelled"
+                return None
+            job.status = "running"
+            try:
+                result = fn(progress=report, cancel=job.token, **params)
+            except RenderCancelled:
+                job.status = "cancelled"
+                return None
+            except Exception as e:
+                job.status = "failed"
+                if on_done is not None and not job.cancelled:
+                    on_done(job, None, e)
+                raise
+            finally:
+                with self._lock:
+                    if self._latest.get(key) is job:
+                        del self._latest[key]
+
+            if job.cancelled:
+                job.status = "cancelled"
+                return None
+
+            job.status = "done"
+            if on_done is not None:
+                on_done(job, result, None)
+            return result
+
+        job.future = self._pool.submit(run)
+        return job
+
+    def cancel(self, key: str):
+        with self._lock:
+            job = self._latest.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    # ---------------------------------------------------------------
+    # Introspection / lifecycle
+    # ---------------------------------------------------------------
+    def active(self) -> dict:
+        with self._lock:
+            return dict(self._latest)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            jobs = list(self._latest.values())
+            self._latest.clear()
+        for job in jobs:
+            job.cancel()
+        self._pool.shutdown(wait=wait)
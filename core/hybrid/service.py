@@ -0,0 +1,701 @@
+# core/hybrid/service.py
+
+import asyncio
+import io
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from core import spans
+from core.hybrid.modes import all_param_names, get_mode
+from core.io.slab_pool import SlabPool, attach_slab
+from core.io.wav import float_wav_header
+
+# Response bodies are written in pieces of this size (bytes)
+STREAM_CHUNK = 1 << 20
+
+DEFAULT_METADATA = {
+    "contribution_type": "service",
+    "complexity_factor": 1.0,
+    "transient_density": 0.2,
+    "quality_proxy_score": 1.0,
+}
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+# -------------------------------------------------------------------
+# Pool worker side
+# -------------------------------------------------------------------
+
+def _warm_worker(metrics: bool = False):
+    """Pool initializer: pay imports and first-touch costs once per worker."""
+    from core.hybrid.pipeline import process_audio
+    spans.enable(metrics)
+    process_audio(np.zeros(4096, dtype=np.float32), 44100, "TRUE_REVERSE")
+
+
+def _render_job(source, params: dict, usage_log: str = None):
+    """
+    Decode, run process_audio_hybrid and encode, inside a pool worker.
+    source is a local path or the uploaded file's bytes.
+    Returns (wav bytes or None when written to params["output"], meta, receipt).
+    With spans enabled, meta["spans"] also covers decode and encode.
+    """
+    with spans.collect() as recorded:
+        wav, meta, receipt = _render_source(source, params, usage_log)
+    if spans.enabled():
+        meta["spans"] = spans.totals(recorded)
+    return wav, meta, receipt
+
+
+def _render_source(source, params: dict, usage_log: str = None):
+    import soundfile as sf
+    from core.io.audio_loader import load_audio, save_audio
+    from core.hybrid.pipeline import process_audio_hybrid
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    audio, sr = load_audio(source)
+
+    log = None
+    if usage_log:
+        from core.economic.usage_log import get_usage_log
+        log = get_usage_log(usage_log)
+
+    params = dict(params)
+    output = params.pop("output", None)
+    processed, meta, receipt = process_audio_hybrid(
+        audio,
+        sample_rate=sr,
+        mode=params.pop("mode"),
+        tier=params.pop("tier", "free"),
+        enriched_metadata=params.pop("metadata", None) or DEFAULT_METADATA,
+        usage_log=log,
+        **params,
+    )
+    meta = dict(meta, input_shape=list(meta["input_shape"]), output_shape=list(meta["output_shape"]))
+
+    if output:
+        save_audio(output, processed, sr)
+        return None, meta, receipt
+
+    buf = io.BytesIO()
+    with spans.span("encode"):
+        sf.write(buf, processed, sr, format="WAV", subtype="FLOAT")
+    return buf.getvalue(), meta, receipt
+
+
+def _render_slab(in_handle, out_handle, sample_rate: int, params: dict, usage_log: str = None):
+    """
+    Shared-memory variant of _render_job: the input slab was filled by the
+    front-end's decoder, DSP writes into the preallocated output slab and
+    the receipt hashes both in place. Only (meta, receipt) are pickled back.
+    """
+    from core.io.audio_loader import save_audio
+    from core.hybrid.pipeline import process_audio_hybrid
+
+    audio = attach_slab(in_handle)
+    out = attach_slab(out_handle)
+
+    log = None
+    if usage_log:
+        from core.economic.usage_log import get_usage_log
+        log = get_usage_log(usage_log)
+
+    params = dict(params)
+    output = params.pop("output", None)
+    processed, meta, receipt = process_audio_hybrid(
+        audio,
+        sample_rate=sample_rate,
+        mode=params.pop("mode"),
+        tier=params.pop("tier", "free"),
+        enriched_metadata=params.pop("metadata", None) or DEFAULT_METADATA,
+        usage_log=log,
+        out=out,
+        **params,
+    )
+    if processed is not out:
+        out[...] = processed
+    meta = dict(meta, input_shape=list(meta["input_shape"]), output_shape=list(meta["output_shape"]))
+
+    if output:
+        with spans.collect() as recorded:
+            save_audio(output, out, sample_rate)
+        if "spans" in meta:
+            meta["spans"].update(spans.totals(recorded))
+    return meta, receipt
+
+
+def _probe(source):
+    from core.io.audio_loader import audio_info
+    return audio_info(source)
+
+
+def _decode_into(source, out):
+    from core.io.audio_loader import load_audio_into
+    load_audio_into(source, out)
+
+
+# -------------------------------------------------------------------
+# Jobs
+# -------------------------------------------------------------------
+
+class ServiceJob:
+    def __init__(self, job_id: str, source, params: dict):
+        self.id = job_id
+        self.source = source
+        self.params = params
+        self.status = "queued"      # queued | running | done | failed | cancelled
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.audio = None           # WAV bytes (pickled path)
+        self.output = None          # SlabLease (shared-memory path)
+        self.array = None           # read-only ndarray (render cache hit)
+        self.sample_rate = None
+        self.meta = None
+        self.receipt = None
+        self.error = None
+        self.done = asyncio.Event()
+
+    def to_dict(self) -> dict:
+        d = {
+            "id": self.id,
+            "status": self.status,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.status == "done":
+            d["meta"] = self.meta
+            d["receipt"] = self.receipt
+            d["audio"] = f"/jobs/{self.id}/audio" if self.has_audio else None
+            d["output"] = self.params.get("output")
+        if self.error is not None:
+            d["error"] = self.error
+        return d
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio is not None or self.output is not None or self.array is not None
+
+    def release(self):
+        """Drop the job's result; its slab goes back to the pool."""
+        self.audio = None
+        self.array = None
+        if self.output is not None:
+            self.output.release()
+            self.output = None
+
+
+# -------------------------------------------------------------------
+# Service
+# -------------------------------------------------------------------
+
+class RenderService:
+    """
+    Local render server.
+
+    HTTP/1.1 over TCP (loopback only) or a Unix socket. Jobs go into a
+    bounded asyncio queue; when it is full new submissions get 503 with
+    Retry-After instead of piling up. One dispatcher task per worker feeds
+    a warm ProcessPoolExecutor, so renders run in parallel and never block
+    the event loop.
+
+        POST   /jobs             submit (202 + job id, 503 when full)
+        POST   /render           submit and wait; returns the finished job
+        GET    /jobs/<id>        status, meta (incl. dsp_time_s) and receipt
+        GET    /jobs/<id>/audio  rendered WAV, streamed in chunks
+        DELETE /jobs/<id>        cancel a queued job
+        GET    /stats            queue length and worker utilisation
+        GET    /metrics          per-stage latency histograms (Prometheus
+                                 text; needs metrics=True)
+
+    Render parameters come from the query string (mode, tier and the
+    parameters that mode declares, e.g. tempo for TRUE_REVERSE; another
+    mode's parameters are a 400) with the audio file as the request body,
+    or from a JSON body that names a local "input" path (and optionally an
+    "output" path, in which case nothing is streamed back).
+
+    With shared_memory on (the default), formats soundfile can read are
+    decoded straight into a pooled shared-memory slab, rendered by the
+    worker into a second slab, and streamed out of that slab behind a
+    float WAV header, so no audio is pickled in either direction. Other
+    formats fall back to decoding inside the worker.
+
+    With cache_dir set, submissions are first looked up in a RenderCache
+    by the hash of the uploaded file and the render parameters; hits are
+    answered without decoding or rendering.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        max_queue: int = 64,
+        keep_results: int = 128,
+        max_body: int = 1 << 30,
+        usage_log: str = None,
+        shared_memory: bool = True,
+        cache_dir: str = None,
+        cache_max_bytes: int = 4 << 30,
+        metrics: bool = False,
+    ):
+        self.workers = max(int(workers or os.cpu_count() or 1), 1)
+        self.max_queue = max_queue
+        self.keep_results = keep_results
+        self.max_body = max_body
+        self.usage_log = usage_log
+        self.shared_memory = shared_memory
+        self.metrics = metrics
+        self.cache = None
+        if cache_dir is not None:
+            from core.hybrid.render_cache import RenderCache
+            self.cache = RenderCache(cache_dir, max_bytes=cache_max_bytes)
+
+        self._pool = None
+        self._slabs = None
+        self._queue = None
+        self._dispatchers = []
+        self._server = None
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+
+        self._started_at = None
+        self._busy = 0
+        self._busy_s = 0.0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0}
+
+    # ---------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: str = None):
+        if unix_socket is None and not ipaddress.ip_address(
+            "127.0.0.1" if host == "localhost" else host
+        ).is_loopback:
+            raise ValueError(f"RenderService only binds to loopback addresses, not {host}")
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(self.metrics,),
+        )
+        # Start every worker now rather than on the first request
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, time.sleep, 0) for _ in range(self.workers)
+        ))
+
+        if self.metrics:
+            spans.enable()
+        if self.shared_memory:
+            self._slabs = SlabPool()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        self._started_at = time.perf_counter()
+
+        if unix_socket is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_forever(self, **kwargs):
+        server = await self.start(**kwargs)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for job in self._jobs.values():
+            job.release()
+        self._jobs.clear()
+        if self._slabs is not None:
+            slabs, self._slabs = self._slabs, None
+            slabs.close(check=True)     # raises SlabLeakError on leaked leases
+
+    # ---------------------------------------------------------------
+    # Queue / dispatch
+    # ---------------------------------------------------------------
+    def submit(self, source, params: dict) -> ServiceJob:
+        """
+        Queue a job; raises asyncio.QueueFull when the queue is at capacity,
+        ValueError for an unknown mode or bad parameters (checked here, so
+        a bad request never reaches the pool).
+        """
+        if params.get("mode") is None:
+            raise ValueError("mode is required")
+        from core.hybrid.pipeline import PROCESS_KWARGS
+        get_mode(params["mode"]).validate(
+            **{k: v for k, v in params.items() if k not in ("mode", "tier", "metadata", "output") + PROCESS_KWARGS}
+        )
+        job = ServiceJob(str(next(self._ids)), source, params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise
+        self._counters["submitted"] += 1
+        self._remember(job)
+        return job
+
+    def _remember(self, job: ServiceJob):
+        self._jobs[job.id] = job
+        # Forget the oldest finished jobs (and their audio) past the limit
+        while len(self._jobs) > self.keep_results:
+            for old_id, old in self._jobs.items():
+                if old.done.is_set():
+                    del self._jobs[old_id]
+                    old.release()
+                    break
+            else:
+                break
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == "cancelled":
+                    continue
+                job.status = "running"
+                job.started = time.time()
+                self._busy += 1
+                t0 = time.perf_counter()
+                try:
+                    await self._run(job)
+                    job.status = "done"
+                    self._counters["completed"] += 1
+                except Exception as e:
+                    job.status = "failed"
+                    job.error = f"{type(e).__name__}: {e}"
+                    self._counters["failed"] += 1
+                finally:
+                    self._busy -= 1
+                    self._busy_s += time.perf_counter() - t0
+                    job.source = None       # drop the upload
+                    job.finished = time.time()
+                    job.done.set()
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: ServiceJob):
+        if self.cache is None:
+            return await self._render(job)
+
+        loop = asyncio.get_running_loop()
+        render = {k: v for k, v in job.params.items() if k not in ("mode", "tier", "metadata", "output")}
+        key = await loop.run_in_executor(
+            None, lambda: self.cache.file_key(job.source, job.params["mode"], **render)
+        )
+        entry = await loop.run_in_executor(None, self.cache.get, key)
+
+        if entry is None:
+            await self._render(job, key)
+            job.meta["cache"] = "miss"
+            return
+
+        # Hit: no decode, no DSP, no hashing
+        from core.hybrid.pipeline import result_from_cache
+        log = None
+        if self.usage_log:
+            from core.economic.usage_log import get_usage_log
+            log = get_usage_log(self.usage_log)
+        _, meta, receipt = result_from_cache(
+            entry,
+            job.params["mode"],
+            job.params.get("tier", "free"),
+            job.params.get("metadata") or DEFAULT_METADATA,
+            usage_log=log,
+        )
+        job.meta = dict(meta, input_shape=list(meta["input_shape"]), output_shape=list(meta["output_shape"]))
+        job.receipt = receipt
+        job.sample_rate = entry.sample_rate
+        if job.params.get("output"):
+            from core.io.audio_loader import save_audio
+            await loop.run_in_executor(None, save_audio, job.params["output"], entry.audio, entry.sample_rate)
+        else:
+            job.array = entry.audio
+
+    def _store(self, key, audio, sample_rate, receipt):
+        self.cache.put(
+            key, audio, sample_rate,
+            input_hash=receipt["input_hash"], output_hash=receipt["output_hash"],
+            receipt=receipt,
+        )
+
+    async def _render(self, job: ServiceJob, key: str = None):
+        loop = asyncio.get_running_loop()
+
+        info = None
+        if self._slabs is not None:
+            source = io.BytesIO(job.source) if isinstance(job.source, (bytes, bytearray)) else job.source
+            info = await loop.run_in_executor(None, _probe, source)
+
+        if info is None:
+            job.audio, job.meta, job.receipt = await loop.run_in_executor(
+                self._pool, _render_job, job.source, job.params, self.usage_log
+            )
+            # Worker spans come back in meta; fold them into this process
+            spans.METRICS.observe_totals(job.meta.get("spans", {}))
+            if key is not None and job.audio is not None:
+                import soundfile as sf
+                audio, sr = await loop.run_in_executor(
+                    None, lambda: sf.read(io.BytesIO(job.audio), dtype="float32", always_2d=False)
+                )
+                await loop.run_in_executor(None, self._store, key, audio, sr, job.receipt)
+            return
+
+        frames, channels, sr = info
+        shape = (frames,) if channels == 1 else (frames, channels)
+        src = self._slabs.acquire(shape, np.float32, owner=f"job {job.id} input")
+        try:
+            out = self._slabs.acquire(shape, np.float32, owner=f"job {job.id} output")
+            try:
+                # Decoder runs on a thread (libsndfile releases the GIL)
+                # and fills the slab the worker will read
+                await loop.run_in_executor(None, _decode_into, source, src.array)
+                job.meta, job.receipt = await loop.run_in_executor(
+                    self._pool, _render_slab, src.handle, out.handle, sr, job.params, self.usage_log
+                )
+                spans.METRICS.observe_totals(job.meta.get("spans", {}))
+                if key is not None:
+                    await loop.run_in_executor(None, self._store, key, out.array, sr, job.receipt)
+            except BaseException:
+                out.release()
+                raise
+        finally:
+            src.release()
+
+        job.sample_rate = sr
+        if job.params.get("output"):
+            out.release()
+        else:
+            job.output = out
+
+    def stats(self) -> dict:
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "queue_length": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue,
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "utilisation": self._busy_s / (uptime * self.workers) if uptime else 0.0,
+            "uptime_s": uptime,
+            **self._counters,
+            "slabs": self._slabs.stats() if self._slabs is not None else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    # ---------------------------------------------------------------
+    # HTTP
+    # ---------------------------------------------------------------
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > self.max_body:
+                await self._send_json(writer, 413, {"error": "request body too large"})
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            query = dict(parse_qsl(url.query))
+            await self._route(writer, method, url.path.rstrip("/") or "/", query, headers, body)
+
+        except Exception as e:
+            try:
+                await self._send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+            except Exception:
+                pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _route(self, writer, method, path, query, headers, body):
+        parts = path.strip("/").split("/")
+
+        if path == "/stats" and method == "GET":
+            return await self._send_json(writer, 200, self.stats())
+
+        if path == "/metrics" and method == "GET":
+            data = spans.METRICS.prometheus_text().encode("utf-8")
+            await self._send_head(writer, 200, {
+                "Content-Type": "text/plain; version=0.0.4",
+                "Content-Length": str(len(data)),
+            })
+            writer.write(data)
+            return await writer.drain()
+
+        if path in ("/jobs", "/render") and method == "POST":
+            try:
+                source, params = self._parse_submission(query, headers, body)
+                job = self.submit(source, params)
+            except asyncio.QueueFull:
+                return await self._send_json(
+                    writer, 503, {"error": "render queue full", **self.stats()},
+                    extra={"Retry-After": "1"},
+                )
+            except (ValueError, KeyError) as e:
+                return await self._send_json(writer, 400, {"error": str(e)})
+
+            if path == "/jobs":
+                return await self._send_json(
+                    writer, 202, {"id": job.id, "status": job.status, "queue_length": self._queue.qsize()}
+                )
+            await job.done.wait()
+            return await self._send_json(writer, 200 if job.status == "done" else 500, job.to_dict())
+
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self._jobs.get(parts[1])
+            if job is None:
+                return await self._send_json(writer, 404, {"error": "unknown job"})
+
+            if len(parts) == 2 and method == "GET":
+                if query.get("wait"):
+                    await job.done.wait()
+                return await self._send_json(writer, 200, job.to_dict())
+
+            if len(parts) == 2 and method == "DELETE":
+                if job.status != "queued":
+                    return await self._send_json(writer, 409, {"error": f"job is {job.status}"})
+                job.status = "cancelled"
+                job.finished = time.time()
+                job.done.set()
+                self._counters["cancelled"] += 1
+                return await self._send_json(writer, 200, job.to_dict())
+
+            if len(parts) == 3 and parts[2] == "audio" and method == "GET":
+                await job.done.wait()
+                if not job.has_audio:
+                    return await self._send_json(writer, 409, job.to_dict())
+                return await self._send_stream(writer, job)
+
+        await self._send_json(writer, 404 if method in ("GET", "POST", "DELETE") else 405, {"error": "not found"})
+
+    @staticmethod
+    def _parse_submission(query, headers, body):
+        if headers.get("content-type", "").startswith("application/json"):
+            params = json.loads(body or b"{}")
+            source = params.pop("input", None)
+            if not source:
+                raise ValueError("JSON submissions need a local 'input' path")
+            if not os.path.isfile(source):
+                raise ValueError(f"No such file: {source}")
+        else:
+            if not body:
+                raise ValueError("empty request body (send the audio file)")
+            params, source = dict(query), body
+
+        # Query strings are text: coerce to the types the mode declares.
+        # Settings of other modes would be silently ignored by the render,
+        # so a request carrying them is refused rather than half-applied.
+        if params.get("mode") is not None:
+            spec = get_mode(params["mode"])
+            foreign = sorted((all_param_names() - set(spec.param_names)) & set(params))
+            if foreign:
+                raise ValueError(
+                    f"{spec.name} does not take {', '.join(foreign)} "
+                    f"(accepts {', '.join(spec.param_names) or 'none'})"
+                )
+            for p in spec.params:
+                if p.name in params:
+                    params[p.name] = p.validate(params[p.name])
+        return source, params
+
+    @staticmethod
+    async def _send_head(writer, status, headers):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json(self, writer, status, payload, extra=None):
+        data = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(data))}
+        headers.update(extra or {})
+        await self._send_head(writer, status, headers)
+        writer.write(data)
+        await writer.drain()
+
+    async def _send_stream(self, writer, job):
+        lease = job.output.retain() if job.output is not None else None
+        try:
+            if lease is not None:
+                # Straight out of the output slab behind a float WAV header
+                shape = lease.handle.shape
+                channels = shape[1] if len(shape) > 1 else 1
+                header = float_wav_header(shape[0], channels, job.sample_rate)
+                view = lease.buffer
+            elif job.array is not None:
+                shape = job.array.shape
+                channels = shape[1] if len(shape) > 1 else 1
+                header = float_wav_header(shape[0], channels, job.sample_rate)
+                view = memoryview(np.ascontiguousarray(job.array)).cast("B")
+            else:
+                header = b""
+                view = memoryview(job.audio)
+
+            headers = {
+                "Content-Type": "audio/wav",
+                "Content-Length": str(len(header) + len(view)),
+                "X-DRE-Receipt-Signature": job.receipt.get("signature", ""),
+                "X-DRE-DSP-Time": f"{job.meta.get('dsp_time_s', 0.0):.6f}",
+            }
+            await self._send_head(writer, 200, headers)
+            writer.write(header)
+            for pos in range(0, len(view), STREAM_CHUNK):
+                # write() copies into the transport buffer, so the slab is
+                # free to be recycled once the lease is released
+                writer.write(view[pos:pos + STREAM_CHUNK])
+                await writer.drain()
+            del view
+        finally:
+            if lease is not None:
+                lease.release()
@@ -0,0 +1,167 @@
+# core/io/audio_buffer.py
+
+import hashlib
+
+import numpy as np
+
+
+class AudioBuffer:
+    """
+    Canonical in-memory audio: C-contiguous frames x channels samples plus
+    the sample rate and a version counter.
+
+    samples is always 2-D (mono is (frames, 1)), so consumers never branch
+    on layout. data gives the engine's traditional layout ((frames,) for
+    mono) as a view, and np.asarray(buffer) returns the same thing, so an
+    AudioBuffer can be passed anywhere an ndarray was.
+
+    version is bumped by write() / touch(); caches keyed on a buffer can
+    compare it to notice in-place edits without hashing the audio.
+    """
+
+    __slots__ = ("_samples", "sample_rate", "version", "__weakref__")
+
+    def __init__(self, samples, sample_rate: int, copy: bool = False):
+        a = np.array(samples, copy=True) if copy else np.asarray(samples)
+        if a.ndim == 1:
+            a = a[:, None]
+        elif a.ndim != 2:
+            raise ValueError(f"AudioBuffer needs 1-D or 2-D samples, got shape {a.shape}")
+        if not a.flags.c_contiguous:
+            a = np.ascontiguousarray(a)
+
+        self._samples = a
+        self.sample_rate = int(sample_rate)
+        self.version = 0
+
+    # ---------------------------------------------------------------
+    # Constructors
+    # ---------------------------------------------------------------
+    @classmethod
+    def empty(cls, frames: int, channels: int, sample_rate: int, dtype=np.float32):
+        return cls(np.empty((int(frames), int(channels)), dtype=dtype), sample_rate)
+
+    @classmethod
+    def from_librosa(cls, y: np.ndarray, sample_rate: int):
+        """From librosa layout ((frames,) or (channels, frames)); one transpose copy."""
+        y = np.asarray(y)
+        return cls(y.T if y.ndim > 1 else y, sample_rate)
+
+    # ---------------------------------------------------------------
+    # Layout
+    # ---------------------------------------------------------------
+    @property
+    def samples(self) -> np.ndarray:
+        """frames x channels, C-contiguous."""
+        return self._samples
+
+    @property
+    def data(self) -> np.ndarray:
+        """(frames,) for mono, (frames, channels) otherwise; always a view."""
+        return self._samples[:, 0] if self.channels == 1 else self._samples
+
+    @property
+    def frames(self) -> int:
+        return self._samples.shape[0]
+
+    @property
+    def channels(self) -> int:
+        return self._samples.shape[1]
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self):
+        return self.data.ndim
+
+    @property
+    def dtype(self):
+        return self._samples.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self._samples.nbytes
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def __len__(self):
+        return self.frames
+
+    def __array__(self, dtype=None, copy=None):
+        a = self.data
+        if dtype is not None and np.dtype(dtype) != a.dtype:
+            return a.astype(dtype)
+        return a.copy() if copy else a
+
+    def __repr__(self):
+        return (
+            f"AudioBuffer(frames={self.frames}, channels={self.channels}, "
+            f"sample_rate={self.sample_rate}, dtype={self.dtype}, version={self.version})"
+        )
+
+    # ---------------------------------------------------------------
+    # Views
+    # ---------------------------------------------------------------
+    def __getitem__(self, key):
+        """Frame slices (step 1) return AudioBuffer views; anything else indexes data."""
+        if isinstance(key, slice) and key.step in (None, 1):
+            return self.view(key.start, key.stop)
+        return self.data[key]
+
+    def view(self, start: int = None, stop: int = None) -> "AudioBuffer":
+        """Frames [start, stop) without copying (rows of a C-contiguous array)."""
+        out = AudioBuffer.__new__(AudioBuffer)
+        out._samples = self._samples[start:stop]
+        out.sample_rate = self.sample_rate
+        out.version = self.version
+        return out
+
+    def channel(self, index: int) -> np.ndarray:
+        """One channel as a strided (non-contiguous) view."""
+        return self._samples[:, index]
+
+    def mono(self, out: np.ndarray = None) -> "AudioBuffer":
+        """
+        Mono version of the buffer. Already-mono buffers come back as a
+        view; otherwise the channels are averaged in one pass, into out
+        when given.
+        """
+        if self.channels == 1:
+            return self.view()
+        if out is None:
+            out = np.empty(self.frames, dtype=self.dtype)
+        np.mean(self._samples, axis=1, out=out)
+        return AudioBuffer(out, self.sample_rate)
+
+    def to_librosa(self) -> np.ndarray:
+        """(channels, frames) / (frames,) view for librosa analysis."""
+        return self.data.T
+
+    # ---------------------------------------------------------------
+    # Mutation / identity
+    # ---------------------------------------------------------------
+    def write(self, start: int, block) -> "AudioBuffer":
+        """Copy block into frames starting at start and bump the version."""
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block[:, None]
+        self._samples[start:start + len(block)] = block
+        self.version += 1
+        return self
+
+    def touch(self):
+        """Record an in-place edit made through samples/data directly."""
+        self.version += 1
+
+    def digest(self) -> str:
+        """sha256 of the sample bytes, hashed in place (same as data.tobytes())."""
+        return hashlib.sha256(self._samples).hexdigest()
+
+
+def as_array(audio):
+    """Unwrap an AudioBuffer to the engine layout; anything else passes through."""
+    return audio.data if isinstance(audio, AudioBuffer) else audio
@@ -1 +1,93 @@
-import soundfile as sfimport numpy as npimport librosadef load_audio(path: str, sr: int = None):    """    Loads WAV/MP3/FLAC/OGG/M4A using librosa for compressed formats.    Returns (audio, sample_rate).    """    try:        # Try soundfile first (works for WAV, FLAC, OGG)        audio, sample_rate = sf.read(path, always_2d=False)        if sr is not None and sr != sample_rate:            audio = librosa.resample(audio.T, orig_sr=sample_rate, target_sr=sr).T            sample_rate = sr        return audio.astype(np.float32), sample_rate    except Exception:        # Fallback to librosa for MP3/M4A/etc.        audio, sample_rate = librosa.load(path, sr=sr, mono=False)        if audio.ndim == 1:            audio = audio        else:            audio = audio.T        return audio.astype(np.float32), sample_ratedef save_audio(path: str, audio: np.ndarray, sample_rate: int):    """    Saves audio using soundfile. Handles mono or stereo.    """    if audio.ndim == 1:        sf.write(path, audio, sample_rate)    else:        sf.write(path, audio, sample_rate)
\ No newline at end of file
+import soundfile as sf
+import numpy as np
+import librosa
+
+from core.io.audio_buffer import AudioBuffer, as_array
+from core.spans import span
+
+
+def load_audio(path: str, sr: int = None):
+    """
+    Loads WAV/MP3/FLAC/OGG/M4A using librosa for compressed formats.
+    Returns (audio, sample_rate).
+    """
+    try:
+        # Try soundfile first (works for WAV, FLAC, OGG)
+        # Decode to float32 directly (no float64 intermediate)
+        with span("decode"):
+            audio, sample_rate = sf.read(path, dtype="float32", always_2d=False)
+        if sr is not None and sr != sample_rate:
+            with span("resample"):
+                audio = librosa.resample(audio.T, orig_sr=sample_rate, target_sr=sr).T
+            sample_rate = sr
+        return np.ascontiguousarray(audio, dtype=np.float32), sample_rate
+
+    except Exception:
+        # Fallback to librosa for MP3/M4A/etc.
+        with span("decode"):
+            audio, sample_rate = librosa.load(path, sr=sr, mono=False)
+        if audio.ndim == 1:
+            audio = audio
+        else:
+            audio = audio.T
+        # .T is a strided view; hand back frames x channels in C order
+        return np.ascontiguousarray(audio, dtype=np.float32), sample_rate
+
+
+def load_buffer(path: str, sr: int = None) -> AudioBuffer:
+    """load_audio() as an AudioBuffer."""
+    audio, sample_rate = load_audio(path, sr=sr)
+    return AudioBuffer(audio, sample_rate)
+
+
+def save_audio(path: str, audio: np.ndarray, sample_rate: int):
+    """
+    Saves audio using soundfile. Handles mono or stereo (ndarray or AudioBuffer).
+    """
+    audio = as_array(audio)
+    with span("encode"):
+        if audio.ndim == 1:
+            sf.write(path, audio, sample_rate)
+        else:
+            sf.write(path, audio, sample_rate)
+
+
+def audio_info(path):
+    """
+    Header-only probe: (frames, channels, sample_rate), or None when
+    soundfile cannot read the format (compressed files go through librosa).
+    path may also be a seekable file object.
+    """
+    try:
+        info = sf.info(path)
+    except Exception:
+        return None
+    finally:
+        if hasattr(path, "seek"):
+            path.seek(0)
+    return info.frames, info.channels, info.samplerate
+
+
+def iter_blocks(path, block_size: int = 1024):
+    """
+    Yield a file's audio as float32 (frames, channels) blocks of
+    block_size frames (the last one shorter), the way an input device
+    callback delivers them. Only one block is decoded at a time.
+    """
+    for block in sf.blocks(path, blocksize=block_size, dtype="float32", always_2d=True):
+        yield block
+
+
+def load_audio_into(path, out) -> int:
+    """
+    Decode straight into a preallocated float32 buffer shaped like
+    load_audio's result ((frames,) for mono, (frames, channels) otherwise),
+    e.g. a shared-memory slab, or into an AudioBuffer (its sample rate and
+    version are updated). Returns the sample rate.
+    """
+    with span("decode"):
+        _, sample_rate = sf.read(path, out=as_array(out), always_2d=False)
+    if isinstance(out, AudioBuffer):
+        out.sample_rate = sample_rate
+        out.touch()
+    return sample_rate
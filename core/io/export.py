@@ -0,0 +1,197 @@
+# core/io/export.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+import soundfile as sf
+
+from core.io.audio_buffer import as_array
+from core.io.pcm_stream import STREAM_BLOCK
+from core.spans import span
+
+# Frames handed to every encoder per step
+EXPORT_BLOCK = STREAM_BLOCK
+
+# Bit-depth shorthands accepted after the ':' of a target spec
+DEPTHS = {
+    "8": "PCM_S8",
+    "16": "PCM_16",
+    "24": "PCM_24",
+    "32": "PCM_32",
+    "float": "FLOAT",
+    "f32": "FLOAT",
+    "double": "DOUBLE",
+    "f64": "DOUBLE",
+}
+
+# Extensions whose soundfile format name is not the extension itself
+EXTENSION_FORMATS = {
+    "aif": "AIFF",
+    "oga": "OGG",
+    "opus": "OGG",
+}
+
+
+@dataclass
+class ExportTarget:
+    """One output file: path plus soundfile format / subtype (None = defaults)."""
+    path: str
+    subtype: str = None
+    format: str = None
+
+    def resolve(self):
+        """(format, subtype), validated against this libsndfile build."""
+        fmt = self.format
+        if fmt is None:
+            ext = os.path.splitext(self.path)[1][1:].lower()
+            fmt = EXTENSION_FORMATS.get(ext, ext.upper())
+        fmt = fmt.upper()
+        if fmt not in sf.available_formats():
+            raise ValueError(f"{self.path}: unsupported format {fmt!r}")
+
+        subtype = self.subtype
+        if subtype is None and self.path.lower().endswith(".opus"):
+            subtype = "OPUS"
+        subtype = sf.default_subtype(fmt) if subtype is None else subtype.upper()
+        if not sf.check_format(fmt, subtype):
+            raise ValueError(f"{self.path}: {fmt} cannot store {subtype}")
+        return fmt, subtype
+
+
+def parse_target(spec) -> ExportTarget:
+    """
+    "mix.wav", "mix.flac:24", "mix.wav:FLOAT", "mix.wav:PCM_U8" -> ExportTarget.
+
+    The part after the last ':' is a bit depth (see DEPTHS) or a soundfile
+    subtype name; anything else stays part of the path (C:\\mix.wav).
+    """
+    if isinstance(spec, ExportTarget):
+        return spec
+    path, sep, tail = str(spec).rpartition(":")
+    if sep and path:
+        key = tail.lower()
+        if key in DEPTHS:
+            return ExportTarget(path, DEPTHS[key])
+        if tail.upper() in sf.available_subtypes():
+            return ExportTarget(path, tail.upper())
+    return ExportTarget(str(spec))
+
+
+def parse_targets(specs) -> list:
+    """A path, spec or ExportTarget, or a list of them -> validated targets."""
+    if isinstance(specs, (str, os.PathLike, ExportTarget)):
+        specs = [specs]
+    targets = [parse_target(s) for s in specs]
+    if not targets:
+        raise ValueError("No export targets")
+
+    paths = [os.path.abspath(t.path) for t in targets]
+    if len(set(paths)) != len(paths):
+        raise ValueError("Export targets must be distinct files")
+    for t in targets:
+        t.resolve()
+    return targets
+
+
+def temp_path(path: str) -> str:
+    """Hidden sibling of path that export writes before renaming it into place."""
+    head, tail = os.path.split(path)
+    stem, ext = os.path.splitext(tail)
+    return os.path.join(head, f".{stem}.{os.getpid()}.{threading.get_ident()}.tmp{ext}")
+
+
+# -------------------------------------------------------------------
+# Encoding
+# -------------------------------------------------------------------
+
+class _TargetWriter:
+    """Encoder for one target: temp file while writing, renamed on commit."""
+
+    def __init__(self, target: ExportTarget, sample_rate: int, channels: int):
+        fmt, subtype = target.resolve()
+        self.path = target.path
+        self.tmp = temp_path(target.path)
+        self.file = sf.SoundFile(self.tmp, "w", sample_rate, channels, subtype=subtype, format=fmt)
+
+    def write(self, block: np.ndarray):
+        self.file.write(block)
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        try:
+            self.file.close()
+        except Exception:
+            pass
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+def export_audio(audio, sample_rate: int, targets, progress=None, cancel=None, block_size: int = EXPORT_BLOCK) -> list:
+    """
+    Encode one buffer to several files at once; returns the written paths.
+
+    audio is an ndarray / AudioBuffer (blocks are views, nothing is
+    copied) or a frame source with read(start, stop, out) and shape, such
+    as a VirtualBuffer (each block is gathered once, so a virtual render
+    is never materialized). targets are paths, "path:depth" specs (see
+    parse_target) or ExportTargets.
+
+    Every target gets its own encoder thread; all of them encode the same
+    block while the next one is read, so the export takes about as long as
+    the slowest format alone. Each file is written under a hidden
+    temporary name and renamed into place once complete: readers never
+    see a partial file, and a failed or cancelled export (cancel is a
+    CancelToken, polled between blocks) leaves existing files untouched.
+    progress(fraction) is called after every block.
+    """
+    targets = parse_targets(targets)
+    reader = getattr(audio, "read", None) if not isinstance(audio, np.ndarray) else None
+    if reader is None:
+        audio = as_array(audio)
+    frames = audio.shape[0]
+    channels = audio.shape[1] if len(audio.shape) > 1 else 1
+
+    if reader is not None:
+        # Double buffer: one block is encoded while the next is gathered
+        shape = (block_size,) + tuple(audio.shape[1:])
+        scratch = (np.empty(shape, dtype=np.float32), np.empty(shape, dtype=np.float32))
+
+    def block(index: int, start: int, stop: int):
+        if reader is None:
+            return audio[start:stop]
+        return reader(start, stop, out=scratch[index % 2][:stop - start])
+
+    writers, pending = [], []
+    with span("encode"), ThreadPoolExecutor(len(targets), thread_name_prefix="dre-export") as pool:
+        try:
+            for t in targets:
+                writers.append(_TargetWriter(t, sample_rate, channels))
+
+            current = block(0, 0, min(block_size, frames))
+            for i, start in enumerate(range(0, frames, block_size)):
+                stop = min(start + block_size, frames)
+                pending = [pool.submit(w.write, current) for w in writers]
+                if stop < frames:
+                    current = block(i + 1, stop, min(stop + block_size, frames))
+                for f in pending:
+                    f.result()
+                if progress is not None:
+                    progress(stop / frames)
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+
+            for w in writers:
+                w.commit()
+        except BaseException:
+            wait(pending)
+            for w in writers:
+                w.abort()
+            raise
+
+    return [t.path for t in targets]
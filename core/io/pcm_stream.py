@@ -0,0 +1,80 @@
+# core/io/pcm_stream.py
+
+import numpy as np
+
+from core.io.wav import PCM_FORMATS, decode_pcm, encode_pcm, read_wav_header, wav_header
+from core.spans import span
+
+# Frames decoded / encoded per pipe read or write
+STREAM_BLOCK = 1 << 16
+
+
+def read_stream(stream, sample_rate: int = None, channels: int = None, fmt: str = None, frames: int = None):
+    """
+    Decode a whole stream (e.g. sys.stdin.buffer) into float32.
+
+    With fmt / sample_rate / channels given the stream is raw interleaved
+    PCM; otherwise it must be a WAV stream and those come from its header.
+    The stream is read STREAM_BLOCK frames at a time and decoded straight
+    into the result: when the length is known (WAV data size, or frames
+    for raw input) that buffer is allocated once, otherwise it grows in
+    place. No copy of the encoded bytes is kept.
+
+    Returns (audio, sample_rate, fmt) with audio shaped like load_audio's
+    ((frames,) for mono, (frames, channels) otherwise).
+    """
+    with span("decode"):
+        return _read_stream(stream, sample_rate, channels, fmt, frames)
+
+
+def _read_stream(stream, sample_rate, channels, fmt, frames):
+    if fmt is None:
+        fmt, channels, sample_rate, frames = read_wav_header(stream)
+    elif sample_rate is None or channels is None:
+        raise ValueError("Raw PCM input needs a sample rate and channel count")
+
+    frame_bytes = PCM_FORMATS[fmt][0] * channels
+
+    audio = np.empty((frames if frames is not None else STREAM_BLOCK * 16, channels), dtype=np.float32)
+    filled = 0
+    pending = b""
+    while frames is None or filled < frames:
+        want = STREAM_BLOCK if frames is None else min(STREAM_BLOCK, frames - filled)
+        block = stream.read(want * frame_bytes - len(pending))
+        if not block:
+            break
+        block = pending + block
+        n = len(block) // frame_bytes
+        pending = block[n * frame_bytes:]
+        if filled + n > len(audio):
+            audio.resize((max(2 * len(audio), filled + n), channels), refcheck=False)
+        decode_pcm(block[:n * frame_bytes], fmt, channels, out=audio[filled:filled + n])
+        filled += n
+
+    if filled != len(audio):
+        audio.resize((filled, channels), refcheck=False)
+    if channels == 1:
+        audio = audio[:, 0]
+    return audio, sample_rate, fmt
+
+
+def write_stream(stream, reader, frames: int, channels: int, sample_rate: int, fmt: str = "f32le", wav: bool = True):
+    """
+    Encode frames of audio to a stream block by block.
+
+    reader(start, stop, out) must fill out with output frames [start, stop)
+    (e.g. a SlicePlan read, or a slice copy of a rendered array), so only
+    one STREAM_BLOCK buffer of samples is ever held here. With wav the
+    samples are preceded by a WAV header (exact sizes: frames is known).
+    """
+    if wav:
+        stream.write(wav_header(frames, channels, sample_rate, fmt))
+
+    shape = (STREAM_BLOCK, channels) if channels > 1 else (STREAM_BLOCK,)
+    block = np.empty(shape, dtype=np.float32)
+    for start in range(0, frames, STREAM_BLOCK):
+        stop = min(start + STREAM_BLOCK, frames)
+        out = block[:stop - start]
+        reader(start, stop, out)
+        stream.write(encode_pcm(out, fmt))
+    stream.flush()
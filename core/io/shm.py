@@ -0,0 +1,113 @@
+# core/io/shm.py
+
+import ctypes
+import os
+import uuid
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.io.audio_buffer import as_array
+
+
+@dataclass(frozen=True)
+class ShmHandle:
+    """Picklable description of an array living in a shared-memory segment."""
+    name: str
+    shape: tuple
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+
+class SharedArrayOwner:
+    """
+    Keeps a segment mapped for as long as any array built on it is alive.
+    np.asarray(owner) returns an array whose base is the owner, so the
+    segment is closed (and optionally unlinked) only after the last view
+    is gone.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: ShmHandle, unlink: bool = False):
+        self.shm = shm
+        self.handle = handle
+        self.unlink = unlink
+
+        # Address of the mapping without keeping a buffer export open,
+        # otherwise shm.close() would refuse to run later.
+        probe = ctypes.c_char.from_buffer(shm.buf)
+        address = ctypes.addressof(probe)
+        del probe
+
+        self.__array_interface__ = {
+            "shape": tuple(handle.shape),
+            "typestr": np.dtype(handle.dtype).str,
+            "data": (address, False),
+            "version": 3,
+        }
+
+    def __del__(self):
+        try:
+            self.shm.close()
+            if self.unlink:
+                self.shm.unlink()
+        except Exception:
+            pass
+
+
+def _size(shape, dtype) -> int:
+    # SharedMemory refuses zero-sized segments
+    return max(int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize, 1)
+
+
+def create(shape, dtype=np.float32):
+    """
+    Allocate a new segment. Returns (shm, handle, array view).
+    The caller owns the segment and must close() + unlink() it.
+    """
+    shape = tuple(int(d) for d in shape)
+    dtype = np.dtype(dtype)
+    name = f"dre_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+    shm = shared_memory.SharedMemory(name=name, create=True, size=_size(shape, dtype))
+    handle = ShmHandle(name=shm.name, shape=shape, dtype=dtype.str)
+    view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return shm, handle, view
+
+
+def share_array(audio, dtype=np.float32):
+    """
+    Copy audio (ndarray, or anything with materialize(out=...)) into a new
+    segment. Returns (shm, handle).
+    """
+    audio = as_array(audio)
+    shm, handle, view = create(audio.shape, dtype)
+    if hasattr(audio, "materialize"):
+        audio.materialize(out=view)
+    else:
+        np.copyto(view, audio, casting="unsafe")
+    del view
+    return shm, handle
+
+
+def attach(handle: ShmHandle):
+    """
+    Map an existing segment created by another process.
+    Returns (shm, array view); close() the shm when done, never unlink.
+
+    Workers are spawned from the creating process and share its resource
+    tracker, so attaching does not take ownership away from the creator.
+    """
+    shm = shared_memory.SharedMemory(name=handle.name)
+    view = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+    return shm, view
+
+
+def adopt(shm: shared_memory.SharedMemory, handle: ShmHandle) -> np.ndarray:
+    """
+    Hand a segment this process created over to the returned array: it is
+    closed and unlinked automatically once the array is garbage.
+    """
+    return np.asarray(SharedArrayOwner(shm, handle, unlink=True))
@@ -0,0 +1,223 @@
+# core/io/slab_pool.py
+
+import threading
+import traceback
+from collections import OrderedDict
+
+import numpy as np
+
+from core.io.shm import ShmHandle, attach, create
+
+# Smallest slab handed out; larger requests round up to a power of two
+MIN_SLAB = 1 << 20
+
+
+def _size_class(nbytes: int) -> int:
+    return max(MIN_SLAB, 1 << max(int(nbytes) - 1, 0).bit_length())
+
+
+class SlabLeakError(RuntimeError):
+    pass
+
+
+# -------------------------------------------------------------------
+# Leases
+# -------------------------------------------------------------------
+
+class SlabLease:
+    """
+    Reference-counted claim on one pooled slab.
+
+    The lease starts with one reference. retain() adds one for every extra
+    holder (a job, a response stream, ...) and each holder calls release()
+    exactly once; the slab goes back to the pool when the count hits zero.
+    handle is what crosses the process boundary.
+    """
+
+    def __init__(self, pool, slab, size: int, handle: ShmHandle, owner: str):
+        self._pool = pool
+        self._slab = slab
+        self.size = size
+        self.handle = handle
+        self.owner = owner
+        self.refs = 1
+        self.stack = "".join(traceback.format_stack(limit=6)[:-1]) if pool.track_stacks else None
+
+    @property
+    def released(self) -> bool:
+        return self.refs == 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the lease's region in this process."""
+        if self.released:
+            raise RuntimeError(f"Slab lease {self.owner!r} was already released")
+        return np.ndarray(self.handle.shape, dtype=np.dtype(self.handle.dtype), buffer=self._slab.buf)
+
+    @property
+    def buffer(self) -> memoryview:
+        """Raw bytes of the region (e.g. for streaming a response)."""
+        return self._slab.buf[:self.handle.nbytes]
+
+    def retain(self) -> "SlabLease":
+        with self._pool._lock:
+            if self.refs == 0:
+                raise RuntimeError(f"Slab lease {self.owner!r} was already released")
+            self.refs += 1
+        return self
+
+    def release(self):
+        with self._pool._lock:
+            if self.refs == 0:
+                raise RuntimeError(f"Slab lease {self.owner!r} released twice")
+            self.refs -= 1
+            if self.refs:
+                return
+        self._pool._recycle(self)
+
+
+# -------------------------------------------------------------------
+# Pool (owning process)
+# -------------------------------------------------------------------
+
+class SlabPool:
+    """
+    Shared-memory slab allocator for audio buffers.
+
+    Segments are created once, sized to power-of-two classes, and reused
+    across jobs instead of being created and unlinked per buffer. Idle slabs
+    above max_free_bytes are unlinked. Every outstanding lease is tracked,
+    so leaks() lists exactly who still holds memory, and close() refuses
+    to pass silently while any are live.
+    """
+
+    def __init__(self, max_free_bytes: int = 2 << 30, track_stacks: bool = False):
+        self.max_free_bytes = max_free_bytes
+        self.track_stacks = track_stacks
+        self._lock = threading.Lock()
+        self._free = {}          # size class -> [shm]
+        self._free_bytes = 0
+        self._leases = set()
+        self._slabs = {}         # name -> shm (every segment this pool created)
+        self._counters = {"acquired": 0, "reused": 0, "created": 0, "trimmed": 0}
+        self._closed = False
+
+    def acquire(self, shape, dtype=np.float32, owner: str = "") -> SlabLease:
+        shape = tuple(int(d) for d in shape)
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        size = _size_class(nbytes)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SlabPool is closed")
+            free = self._free.get(size)
+            slab = free.pop() if free else None
+            if slab is not None:
+                self._free_bytes -= size
+                self._counters["reused"] += 1
+            self._counters["acquired"] += 1
+
+        if slab is None:
+            slab, _, view = create((size,), np.uint8)
+            del view
+            with self._lock:
+                self._slabs[slab.name] = slab
+                self._counters["created"] += 1
+
+        lease = SlabLease(self, slab, size, ShmHandle(name=slab.name, shape=shape, dtype=dtype.str), owner)
+        with self._lock:
+            self._leases.add(lease)
+        return lease
+
+    def _recycle(self, lease: SlabLease):
+        slab = lease._slab
+        size = lease.size
+        with self._lock:
+            self._leases.discard(lease)
+            if not self._closed and self._free_bytes + size <= self.max_free_bytes:
+                self._free.setdefault(size, []).append(slab)
+                self._free_bytes += size
+                return
+            self._slabs.pop(slab.name, None)
+            self._counters["trimmed"] += 1
+        try:
+            slab.close()
+        except BufferError:
+            pass  # a stray view still maps it until it is garbage
+        slab.unlink()
+
+    def leaks(self) -> list:
+        """Outstanding leases as (owner, refs, shape, creation stack or None)."""
+        with self._lock:
+            return [(l.owner, l.refs, l.handle.shape, l.stack) for l in self._leases]
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_use = sum(l.size for l in self._leases)
+            return {
+                "slabs": len(self._slabs),
+                "leases": len(self._leases),
+                "bytes_in_use": in_use,
+                "bytes_free": self._free_bytes,
+                **self._counters,
+            }
+
+    def close(self, check: bool = True):
+        """
+        Unlink every segment. With check set, raises SlabLeakError if any
+        lease is still held (segments are unlinked either way).
+        """
+        with self._lock:
+            self._closed = True
+            leaked = [(l.owner, l.refs, l.handle.shape, l.stack) for l in self._leases]
+            slabs = list(self._slabs.values())
+            self._slabs.clear()
+            self._free.clear()
+            self._free_bytes = 0
+            self._leases.clear()
+
+        for slab in slabs:
+            try:
+                slab.close()
+            except BufferError:
+                pass  # a leaked view still maps it; unlinking still frees the name
+            try:
+                slab.unlink()
+            except FileNotFoundError:
+                pass
+
+        if check and leaked:
+            lines = [f"{owner} (refs={refs}, shape={shape})" for owner, refs, shape, _ in leaked]
+            raise SlabLeakError(f"{len(leaked)} slab lease(s) still held at close: " + "; ".join(lines))
+
+
+# -------------------------------------------------------------------
+# Worker side
+# -------------------------------------------------------------------
+
+_attached = OrderedDict()
+_ATTACH_CACHE = 16
+
+
+def attach_slab(handle: ShmHandle) -> np.ndarray:
+    """
+    Array view of a pooled slab inside a worker process.
+    Mappings are cached by segment name (slabs are reused across jobs), the
+    least recently used one is closed once more than a few are cached.
+    The view is only valid while the owning lease is held.
+    """
+    shm = _attached.get(handle.name)
+    if shm is None:
+        shm, view = attach(handle)
+        del view
+        _attached[handle.name] = shm
+        while len(_attached) > _ATTACH_CACHE:
+            _, old = _attached.popitem(last=False)
+            try:
+                old.close()
+            except BufferError:
+                pass
+    else:
+        _attached.move_to_end(handle.name)
+    return np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
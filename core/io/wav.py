@@ -0,0 +1,151 @@
+# core/io/wav.py
+
+import struct
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Size fields of a WAV whose length is unknown while it is written (a pipe)
+STREAMING_SIZE = 0xFFFFFFFF
+
+# Raw sample formats (ffmpeg -f names): (bytes per sample, WAV format tag)
+PCM_FORMATS = {
+    "f32le": (4, WAVE_FORMAT_IEEE_FLOAT),
+    "f64le": (8, WAVE_FORMAT_IEEE_FLOAT),
+    "s16le": (2, WAVE_FORMAT_PCM),
+    "s24le": (3, WAVE_FORMAT_PCM),
+    "s32le": (4, WAVE_FORMAT_PCM),
+}
+
+
+def float_wav_header(frames: int, channels: int, sample_rate: int) -> bytes:
+    """
+    58-byte header for a 32-bit float WAV (fmt + fact + data chunks).
+    Followed by frames * channels little-endian float32 samples, it is a
+    complete file, so an interleaved float32 buffer can be sent as-is.
+    """
+    return wav_header(frames, channels, sample_rate, "f32le")
+
+
+def wav_header(frames, channels: int, sample_rate: int, fmt: str = "f32le") -> bytes:
+    """
+    WAV header for frames of interleaved fmt samples (see PCM_FORMATS).
+    Float formats get an 18-byte fmt chunk plus a fact chunk, integer
+    formats the plain 16-byte fmt chunk. frames=None writes the streaming
+    sizes (0xFFFFFFFF) that readers treat as "until end of stream".
+    """
+    width, tag = PCM_FORMATS[fmt]
+    block_align = channels * width
+    fields = (tag, channels, sample_rate, sample_rate * block_align, block_align, width * 8)
+    if tag == WAVE_FORMAT_IEEE_FLOAT:
+        fmt_chunk = struct.pack("<HHIIHHH", *fields, 0)
+        fact = b"fact" + struct.pack("<I", 4) + struct.pack("<I", STREAMING_SIZE if frames is None else frames)
+    else:
+        fmt_chunk = struct.pack("<HHIIHH", *fields)
+        fact = b""
+
+    if frames is None:
+        riff_size = data_bytes = STREAMING_SIZE
+    else:
+        data_bytes = frames * block_align
+        riff_size = 4 + (8 + len(fmt_chunk)) + len(fact) + (8 + data_bytes)
+    return b"".join([
+        b"RIFF", struct.pack("<I", riff_size), b"WAVE",
+        b"fmt ", struct.pack("<I", len(fmt_chunk)), fmt_chunk,
+        fact,
+        b"data", struct.pack("<I", data_bytes),
+    ])
+
+
+def _read_exact(stream, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        block = stream.read(n - len(data))
+        if not block:
+            raise ValueError("Stream ended inside the WAV header")
+        data += block
+    return data
+
+
+def read_wav_header(stream):
+    """
+    Parse a WAV header from a (possibly non-seekable) stream, leaving it
+    positioned at the first sample. Returns (fmt, channels, sample_rate,
+    frames); frames is None when the writer did not know the length
+    (streaming sizes, as ffmpeg writes to a pipe).
+    """
+    riff = _read_exact(stream, 12)
+    if riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE stream")
+
+    fmt = None
+    while True:
+        chunk_id, size = struct.unpack("<4sI", _read_exact(stream, 8))
+        if chunk_id == b"data":
+            break
+        body = _read_exact(stream, size + (size & 1))
+        if chunk_id == b"fmt ":
+            tag, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                tag = struct.unpack("<H", body[24:26])[0]
+            fmt = _format_name(tag, bits)
+
+    if fmt is None:
+        raise ValueError("WAV stream has no fmt chunk before its data")
+    frames = None if size in (0, STREAMING_SIZE) else size // block_align
+    return fmt, channels, sample_rate, frames
+
+
+def _format_name(tag: int, bits: int) -> str:
+    for name, (width, t) in PCM_FORMATS.items():
+        if t == tag and width * 8 == bits:
+            return name
+    raise ValueError(f"Unsupported WAV sample format (tag {tag}, {bits} bits)")
+
+
+# -------------------------------------------------------------------
+# Sample conversion (integer <-> float scaling by 2^(bits-1) both ways,
+# so integer input passes through permutation modes bit-exact)
+# -------------------------------------------------------------------
+def decode_pcm(raw, fmt: str, channels: int, out: np.ndarray = None) -> np.ndarray:
+    """Interleaved raw samples -> float32 (frames, channels)."""
+    width, _ = PCM_FORMATS[fmt]
+    frames = len(raw) // (width * channels)
+    raw = memoryview(raw)[:frames * width * channels]
+    if out is None:
+        out = np.empty((frames, channels), dtype=np.float32)
+
+    if fmt == "f32le":
+        out[...] = np.frombuffer(raw, dtype="<f4").reshape(frames, channels)
+    elif fmt == "f64le":
+        out[...] = np.frombuffer(raw, dtype="<f8").reshape(frames, channels)
+    elif fmt == "s16le":
+        np.multiply(np.frombuffer(raw, dtype="<i2").reshape(frames, channels), 1.0 / 0x8000, out=out, casting="unsafe")
+    elif fmt == "s32le":
+        np.multiply(np.frombuffer(raw, dtype="<i4").reshape(frames, channels), 1.0 / 0x80000000, out=out, casting="unsafe")
+    else:  # s24le: sign-extend three bytes into the top of an int32
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = (b[:, 0] << 8) | (b[:, 1] << 16) | (b[:, 2] << 24)
+        np.multiply(v.reshape(frames, channels), 1.0 / 0x80000000, out=out, casting="unsafe")
+    return out
+
+
+def encode_pcm(samples: np.ndarray, fmt: str) -> bytes:
+    """float32 (frames[, channels]) -> interleaved raw samples."""
+    x = np.asarray(samples)
+    if fmt == "f32le":
+        return np.ascontiguousarray(x, dtype="<f4").tobytes()
+    if fmt == "f64le":
+        return np.ascontiguousarray(x, dtype="<f8").tobytes()
+
+    bits = {"s16le": 16, "s24le": 24, "s32le": 32}[fmt]
+    full = float(1 << (bits - 1))
+    v = np.clip(np.rint(x.astype(np.float64) * full), -full, full - 1)
+    if fmt == "s16le":
+        return v.astype("<i2").tobytes()
+    if fmt == "s32le":
+        return v.astype("<i4").tobytes()
+    return v.astype("<i4").reshape(-1, 1).view(np.uint8)[:, :3].tobytes()
@@ -0,0 +1,202 @@
+# core/spans.py
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds (seconds), Prometheus style; +Inf is implied
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+# Off unless enabled here or with DRE_SPANS=1 (inherited by pool workers)
+_enabled = os.environ.get("DRE_SPANS", "") not in ("", "0")
+_local = threading.local()
+
+
+def enable(flag: bool = True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+# -------------------------------------------------------------------
+# Spans
+# -------------------------------------------------------------------
+
+class _NoSpan:
+    """What span() hands out while disabled: enter / exit do nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter_ns() - self.t0)
+        return False
+
+
+def span(name: str):
+    """
+    Context manager timing one pipeline stage (decode, resample, grid,
+    dsp, hash, cost, sign, encode, ...) with perf_counter_ns. While spans
+    are disabled this is one global check and a shared no-op object.
+    Spans may nest (grid runs inside dsp); each is recorded on its own.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(name)
+
+
+def record(name: str, ns: int):
+    """Add a finished span to the current job (see collect) and to METRICS."""
+    job = getattr(_local, "job", None)
+    if job is not None:
+        job.append((name, ns))
+    METRICS.observe(name, ns / 1e9)
+
+
+class collect:
+    """
+    Gather the spans recorded on this thread while the block runs:
+
+        with spans.collect() as recorded:
+            ...
+        meta["spans"] = spans.totals(recorded)
+
+    Nested collect() blocks also pass their spans on to the outer one.
+    """
+
+    def __enter__(self):
+        self._outer = getattr(_local, "job", None)
+        self.spans = []
+        _local.job = self.spans
+        return self.spans
+
+    def __exit__(self, *exc):
+        _local.job = self._outer
+        if self._outer is not None:
+            self._outer.extend(self.spans)
+        return False
+
+
+def totals(recorded) -> dict:
+    """Seconds per stage name (repeated stages summed), in first-seen order."""
+    out = {}
+    for name, ns in recorded:
+        out[name] = out.get(name, 0.0) + ns / 1e9
+    return out
+
+
+# -------------------------------------------------------------------
+# Aggregates
+# -------------------------------------------------------------------
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class SpanMetrics:
+    """
+    Per-stage latency histograms. Safe to update from several threads;
+    a process pool's spans can be folded in from each job's meta["spans"]
+    with observe_totals().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            h = self._stages.get(stage)
+            if h is None:
+                h = self._stages[stage] = Histogram()
+            h.observe(seconds)
+
+    def observe_totals(self, stage_seconds: dict):
+        for stage, seconds in stage_seconds.items():
+            self.observe(stage, seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> dict:
+        """stage -> {"count", "sum_s", "buckets": {le: cumulative count}}."""
+        with self._lock:
+            stages = {k: (list(h.counts), h.count, h.sum) for k, h in self._stages.items()}
+        out = {}
+        for stage, (counts, count, total) in sorted(stages.items()):
+            cumulative, buckets = 0, {}
+            for le, c in zip(BUCKETS + (float("inf"),), counts):
+                cumulative += c
+                buckets["+Inf" if le == float("inf") else repr(le)] = cumulative
+            out[stage] = {"count": count, "sum_s": total, "buckets": buckets}
+        return out
+
+    # ---------------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------------
+    def prometheus_text(self, metric: str = "dre_stage_seconds") -> str:
+        lines = [
+            f"# HELP {metric} Time spent per pipeline stage.",
+            f"# TYPE {metric} histogram",
+        ]
+        for stage, s in self.snapshot().items():
+            for le, c in s["buckets"].items():
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {c}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {s["sum_s"]!r}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Replace path atomically (node_exporter textfile collector style)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def append_jsonl(self, path: str):
+        """Append one line per stage: timestamp, stage, count, sum_s, buckets."""
+        now = time.time()
+        with open(path, "a") as f:
+            for stage, s in self.snapshot().items():
+                f.write(json.dumps({"timestamp": now, "stage": stage, **s}) + "\n")
+
+
+METRICS = SpanMetrics()
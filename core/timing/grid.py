@@ -1 +1,89 @@
-# core/timing/grid.pyfrom dataclasses import dataclass@dataclassclass TimingGrid:    sample_rate: int    tempo: float = 120.0          # BPM    beats_per_bar: int = 4        # usually 4    @property    def beat_duration_seconds(self) -> float:        return 60.0 / self.tempo    @property    def bar_duration_seconds(self) -> float:        return self.beat_duration_seconds * self.beats_per_bar    @property    def beat_samples(self) -> int:        return int(self.beat_duration_seconds * self.sample_rate)    @property    def bar_samples(self) -> int:        return int(self.bar_duration_seconds * self.sample_rate)    def subdivision_samples(self, fraction: float) -> int:        """        fraction = 0.25 -> quarter-beat        fraction = 0.5  -> half-beat        fraction = 1.0  -> one beat        """        return max(int(self.beat_samples * fraction), 128)    def build_grid(self, total_samples: int, unit: str = "beat", fraction: float = 1.0):        """        unit: "beat", "bar", "subdivision"        fraction: used only for "subdivision"        Returns an array of sample indices [0, ..., total_samples]        """        if unit == "beat":            step = self.beat_samples        elif unit == "bar":            step = self.bar_samples        elif unit == "subdivision":            step = self.subdivision_samples(fraction)        else:            raise ValueError(f"Unknown unit for TimingGrid: {unit}")        if step <= 0:            step = 128        import numpy as np        grid = np.arange(0, total_samples, step, dtype=int)        if len(grid) == 0 or grid[-1] != total_samples:            grid = np.append(grid, total_samples)        return grid
\ No newline at end of file
+# core/timing/grid.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.spans import span
+
+@dataclass
+class TimingGrid:
+    sample_rate: int
+    tempo: float = 120.0          # BPM
+    beats_per_bar: int = 4        # usually 4
+
+    @property
+    def beat_duration_seconds(self) -> float:
+        return 60.0 / self.tempo
+
+    @property
+    def bar_duration_seconds(self) -> float:
+        return self.beat_duration_seconds * self.beats_per_bar
+
+    @property
+    def beat_samples(self) -> int:
+        return int(self.beat_duration_seconds * self.sample_rate)
+
+    @property
+    def bar_samples(self) -> int:
+        return int(self.bar_duration_seconds * self.sample_rate)
+
+    def subdivision_samples(self, fraction: float) -> int:
+        """
+        fraction = 0.25 -> quarter-beat
+        fraction = 0.5  -> half-beat
+        fraction = 1.0  -> one beat
+        """
+        return max(int(self.beat_samples * fraction), 128)
+
+    def build_grid(self, total_samples: int, unit: str = "beat", fraction: float = 1.0):
+        """
+        unit: "beat", "bar", "subdivision"
+        fraction: used only for "subdivision"
+        Returns an array of sample indices [0, ..., total_samples]
+        """
+        if unit == "beat":
+            step = self.beat_samples
+        elif unit == "bar":
+            step = self.bar_samples
+        elif unit == "subdivision":
+            step = self.subdivision_samples(fraction)
+        else:
+            raise ValueError(f"Unknown unit for TimingGrid: {unit}")
+
+        if step <= 0:
+            step = 128
+
+        with span("grid"):
+            return regular_grid(total_samples, step)
+
+
+def regular_grid(total_samples: int, step: int):
+    """Sample indices [0, step, 2*step, ..., total_samples]."""
+    grid = np.arange(0, total_samples, step, dtype=int)
+    if len(grid) == 0 or grid[-1] != total_samples:
+        grid = np.append(grid, total_samples)
+    return grid
+
+
+def grid_steps(sample_rate: int, tempo, beats_per_bar=4, unit: str = "beat", fraction=1.0) -> np.ndarray:
+    """
+    Vectorized TimingGrid step: the slice length build_grid() uses, for
+    arrays of tempos / beats per bar / fractions at once (broadcast
+    together). Same arithmetic as the properties above, so every entry
+    matches TimingGrid(sample_rate, tempo, beats_per_bar) exactly.
+    """
+    beat_seconds = 60.0 / np.asarray(tempo, dtype=np.float64)
+
+    if unit == "beat":
+        step = np.trunc(beat_seconds * sample_rate)
+    elif unit == "bar":
+        step = np.trunc(beat_seconds * np.asarray(beats_per_bar) * sample_rate)
+    elif unit == "subdivision":
+        beat = np.trunc(beat_seconds * sample_rate)
+        step = np.maximum(np.trunc(beat * np.asarray(fraction, dtype=np.float64)), 128)
+    else:
+        raise ValueError(f"Unknown unit for TimingGrid: {unit}")
+
+    step = step.astype(np.int64)
+    return np.where(step <= 0, 128, step)
@@ -0,0 +1,28 @@
+# core/timing/tempo.py
+
+import numpy as np
+
+
+def estimate_tempo(y: np.ndarray, sr: int, default: float = 120.0) -> float:
+    """
+    Onset-envelope tempo estimate (librosa).
+    y is in librosa layout: (samples,) or (channels, samples).
+    Falls back to default for very short or silent input.
+    """
+    import librosa
+
+    try:
+        if y.ndim > 1:
+            y = y.mean(axis=0)
+        if len(y) < 2048:
+            return default
+        onset_env = librosa.onset.onset_strength(y=y.astype(np.float32), sr=sr)
+        tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=sr, aggregate=None)
+
+        if hasattr(tempo, "__len__"):
+            val = float(tempo[0])
+        else:
+            val = float(tempo)
+        return val if val > 0 else default
+    except Exception:
+        return default
@@ -1 +1,467 @@
-#!/usr/bin/env python3import argparsefrom core.io.audio_loader import load_audio, save_audiofrom core.hybrid.pipeline import process_audiodef main():    parser = argparse.ArgumentParser(        description="Digital Reverse Engine — Deterministic Timing Edition"    )    parser.add_argument("input", type=str, help="Input audio file")    parser.add_argument(        "--mode",        type=str,        required=True,        choices=[            "TRUE_REVERSE",            "QBEAT_REVERSE",            "HQ_REVERSE",            "STUDIO_REVERSE",            "TATUM_REVERSE",        ],        help="Reverse mode",    )    parser.add_argument("--output", type=str, required=True, help="Output audio file")    # Deterministic timing parameters    parser.add_argument(        "--tempo",        type=float,        default=120.0,        help="Tempo in BPM (default: 120.0)",    )    parser.add_argument(        "--beats-per-bar",        type=int,        default=4,        help="Beats per bar (default: 4)",    )    # Tatum-specific parameter    parser.add_argument(        "--tatum-fraction",        type=float,        default=0.25,        help="Subdivision for TATUM_REVERSE (default: 0.25 = quarter-beat)",    )    args = parser.parse_args()    # Load audio    audio, sr = load_audio(args.input)    # Dispatch based on mode    if args.mode == "TATUM_REVERSE":        out = process_audio(            audio,            sr,            mode=args.mode,            tempo=args.tempo,            beats_per_bar=args.beats_per_bar,            tatum_fraction=args.tatum_fraction,        )    else:        out = process_audio(            audio,            sr,            mode=args.mode,            tempo=args.tempo,            beats_per_bar=args.beats_per_bar,        )    # Save output    save_audio(args.output, out, sr)if __name__ == "__main__":    main()
\ No newline at end of file
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from core.io.audio_loader import audio_info, load_audio, save_audio
+from core.io.export import export_audio, parse_targets
+from core.io.pcm_stream import read_stream, write_stream
+from core.io.wav import PCM_FORMATS
+from core.hybrid.memory_plan import MemoryBudgetExceeded, MemoryProbe, parse_size
+from core.hybrid.modes import all_modes, get_mode, mode_names
+from core.hybrid.pipeline import build_plan, process_audio, process_file, process_sweep
+from core.hybrid.render_cache import RenderCache
+from core.dsp.virtual_buffer import VirtualBuffer
+from core import spans
+from core.spans import span
+
+
+def parse_sweep(spec: str) -> list:
+    """
+    "127.5:128.5:0.05" -> 127.5, 127.55, ..., 128.5 (stop inclusive)
+    "0.25,0.5"         -> 0.25, 0.5
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [float(v) for v in np.round(start + step * np.arange(count), 6)]
+    return [float(x) for x in spec.split(",")]
+
+
+def sweep_output(pattern: str, params: dict, swept: list) -> str:
+    """
+    Output path for one sweep render: pattern.format(**params) when the
+    pattern has fields (e.g. "rev_{tempo}.wav"), else the swept values are
+    appended to the file name (rev.wav -> rev_tempo128.05.wav).
+    """
+    if "{" in pattern:
+        return pattern.format(**params)
+    stem, ext = os.path.splitext(pattern)
+    tag = "_".join(f"{name}{params[name]:g}" for name in swept)
+    return f"{stem}_{tag}{ext}"
+
+
+def crossfade_frames(args, sr: int) -> int:
+    """--declick milliseconds as crossfade frames at this sample rate."""
+    return int(round(args.declick * sr / 1000.0))
+
+
+def mode_params(args, sr: int) -> dict:
+    """The process_audio keyword parameters args select for args.mode (those its ModeSpec declares)."""
+    params = {}
+    for p in get_mode(args.mode).params:
+        value = crossfade_frames(args, sr) if p.name == "crossfade" else getattr(args, p.name, None)
+        if value is not None:
+            params[p.name] = value
+    return params
+
+
+# Mode parameters with hand-written options in main(); every other one a
+# registered mode declares gets a generated option (see add_mode_arguments)
+CLI_PARAMS = ("tempo", "beats_per_bar", "tatum_fraction", "grain_fraction", "overlap", "crossfade")
+
+
+def add_mode_arguments(parser):
+    """--option per mode parameter without a hand-written one (e.g. --subdivision, plugin modes')."""
+    users = {}
+    for spec in all_modes():
+        for p in spec.params:
+            if p.name not in CLI_PARAMS:
+                users.setdefault(p.name, (p, []))[1].append(spec.name)
+    for name, (p, modes) in users.items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=p.type,
+            default=None,
+            help=f"{p.help or name} for {', '.join(modes)} (default: {p.default})",
+        )
+
+
+def output_targets(args) -> list:
+    """--output plus every --export target (path or path:depth)."""
+    return [args.output] + (args.export or [])
+
+
+def run_stream(args):
+    """
+    Render with "-" as input and/or output (shell pipelines, e.g. between
+    ffmpeg stages), never touching disk.
+
+    Grid modes reverse the slice order of the whole input, so the input is
+    decoded once into memory (allocated up front when its length is
+    known); the output is then rendered through the slice plan and encoded
+    one block at a time, so no full output buffer or encoded copy exists.
+    Modes without a slice plan render the full output first.
+    """
+    if args.input == "-":
+        audio, sr, in_fmt = read_stream(
+            sys.stdin.buffer,
+            sample_rate=args.rate,
+            channels=args.channels,
+            fmt=args.format,
+            frames=args.frames,
+        )
+    else:
+        audio, sr = load_audio(args.input)
+        in_fmt = "f32le"
+
+    params = mode_params(args, sr)
+    if get_mode(args.mode).permutation:
+        plan = build_plan(len(audio), sr, args.mode, **params)
+        view = VirtualBuffer(audio, plan, crossfade=params.get("crossfade", 0))
+        reader = view.read
+    else:
+        rendered = process_audio(audio, sr, mode=args.mode, **params)
+
+        def reader(start, stop, out):
+            out[...] = rendered[start:stop]
+
+    if args.output != "-":
+        export_audio(view if get_mode(args.mode).permutation else rendered, sr, output_targets(args))
+        return
+
+    out_fmt = args.output_format
+    if out_fmt is None:
+        out_fmt = in_fmt if args.format is not None else "wav"
+    wav = out_fmt == "wav"
+    channels = audio.shape[1] if audio.ndim > 1 else 1
+    try:
+        write_stream(
+            sys.stdout.buffer, reader, len(audio), channels, sr,
+            fmt=in_fmt if wav else out_fmt, wav=wav,
+        )
+    except BrokenPipeError:
+        # Downstream stopped reading; not an engine error. Point stdout at
+        # devnull so the interpreter's final flush does not raise again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+
+
+def run_sweep(args):
+    sweep = {}
+    if args.sweep_tempo:
+        sweep["tempo"] = parse_sweep(args.sweep_tempo)
+    if args.sweep_tatum:
+        sweep["tatum_fraction"] = parse_sweep(args.sweep_tatum)
+
+    audio, sr = load_audio(args.input)
+
+    results = []
+    for params, out, score in process_sweep(
+        audio,
+        sr,
+        mode=args.mode,
+        sweep=sweep,
+        score=args.score,
+        tempo=args.tempo,
+        beats_per_bar=args.beats_per_bar,
+        tatum_fraction=args.tatum_fraction,
+        threads=args.threads,
+        crossfade=crossfade_frames(args, sr),
+    ):
+        path = sweep_output(args.output, params, list(sweep))
+        save_audio(path, out, sr)
+        results.append((score, path, params))
+        line = ", ".join(f"{name}={params[name]:g}" for name in sweep)
+        print(f"[sweep] {line} -> {path}" + (f"  discontinuity={score:.3e}" if score is not None else ""))
+
+    if args.score and results:
+        score, path, params = min(results, key=lambda r: r[0])
+        line = ", ".join(f"{name}={params[name]:g}" for name in sweep)
+        print(f"[sweep] best: {line} ({path})")
+
+
+def write_metrics(args):
+    """Export the stage histograms (--metrics-prom / --metrics-jsonl) and summarise them on stderr."""
+    if not spans.enabled():
+        return
+    if args.metrics_prom:
+        spans.METRICS.write_prometheus(args.metrics_prom)
+    if args.metrics_jsonl:
+        spans.METRICS.append_jsonl(args.metrics_jsonl)
+    stages = spans.METRICS.snapshot()
+    print("[spans] " + "  ".join(f"{k}={v['sum_s'] * 1000:.1f}ms" for k, v in stages.items()), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Digital Reverse Engine — Deterministic Timing Edition"
+    )
+
+    parser.add_argument("input", type=str, help="Input audio file ('-' = stdin)")
+    parser.add_argument(
+        "output_path",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Output audio file ('-' = stdout); same as --output",
+    )
+
+    parser.add_argument(
+        "--mode",
+        type=str,
+        required=True,
+        choices=mode_names(),
+        help="Reverse mode (built-in or registered through the dre.modes entry point group)",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Output audio file (sweeps: file name pattern, e.g. rev_{tempo}.wav)",
+    )
+
+    parser.add_argument(
+        "--export",
+        type=str,
+        action="append",
+        default=None,
+        metavar="PATH[:DEPTH]",
+        help="Also write this file (e.g. mix.flac:24, mix.mp3); repeatable. All outputs are "
+             "encoded concurrently from one render. --output takes :DEPTH too (16, 24, 32, float)",
+    )
+
+    # Deterministic timing parameters
+    parser.add_argument(
+        "--tempo",
+        type=float,
+        default=120.0,
+        help="Tempo in BPM (default: 120.0)",
+    )
+
+    parser.add_argument(
+        "--beats-per-bar",
+        type=int,
+        default=4,
+        help="Beats per bar (default: 4)",
+    )
+
+    # Tatum-specific parameter
+    parser.add_argument(
+        "--tatum-fraction",
+        type=float,
+        default=0.25,
+        help="Subdivision for TATUM_REVERSE (default: 0.25 = quarter-beat)",
+    )
+
+    # Grain-specific parameters
+    parser.add_argument(
+        "--grain-fraction",
+        type=float,
+        default=0.125,
+        help="Grain length for GRAIN_REVERSE as a fraction of a beat (default: 0.125)",
+    )
+
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=0.5,
+        help="Grain overlap for GRAIN_REVERSE (default: 0.5)",
+    )
+
+    add_mode_arguments(parser)
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Copy threads for large renders (default: CPU count; 1 = serial)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Render cache directory; repeated renders skip decode and DSP",
+    )
+
+    parser.add_argument(
+        "--declick",
+        type=float,
+        default=0.0,
+        help="Crossfade every slice boundary over this many milliseconds (default: 0 = off)",
+    )
+
+    # Sweep (render many candidates from one decode)
+    parser.add_argument(
+        "--sweep-tempo",
+        type=str,
+        default=None,
+        help="Render every tempo in START:STOP:STEP or a comma list (e.g. 127.5:128.5:0.05)",
+    )
+
+    parser.add_argument(
+        "--sweep-tatum",
+        type=str,
+        default=None,
+        help="Render every tatum fraction in START:STOP:STEP or a comma list",
+    )
+
+    parser.add_argument(
+        "--score",
+        action="store_true",
+        help="Score each sweep render for boundary clicks and report the cleanest",
+    )
+
+    # Pipes (stdin / stdout)
+    parser.add_argument(
+        "--format",
+        type=str,
+        default=None,
+        choices=sorted(PCM_FORMATS),
+        help="stdin is raw interleaved PCM in this format (default: stdin is a WAV stream)",
+    )
+
+    parser.add_argument("--rate", type=int, default=None, help="Sample rate of raw PCM on stdin")
+    parser.add_argument("--channels", type=int, default=None, help="Channel count of raw PCM on stdin")
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="Length of raw PCM on stdin, when known (buffer is allocated once)",
+    )
+
+    parser.add_argument(
+        "--output-format",
+        type=str,
+        default=None,
+        choices=["wav"] + sorted(PCM_FORMATS),
+        help="stdout format (default: raw PCM like the input for raw input, else WAV)",
+    )
+
+    # Memory
+    parser.add_argument(
+        "--memory-budget",
+        type=str,
+        default=None,
+        help="Run within this much memory (e.g. 512M, 2G): in place, chunked from disk or memory-mapped as needed",
+    )
+
+    parser.add_argument(
+        "--memory-probe",
+        type=str,
+        default=None,
+        choices=MemoryProbe.KINDS,
+        help="Measure the peak memory of the render and report it next to the prediction",
+    )
+
+    # Instrumentation
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        default=None,
+        help="Time each stage and write the histograms here (Prometheus text format)",
+    )
+
+    parser.add_argument(
+        "--metrics-jsonl",
+        type=str,
+        default=None,
+        help="Time each stage and append the histograms here as JSON lines",
+    )
+
+    args = parser.parse_args()
+
+    if args.output is None:
+        args.output = args.output_path
+    if args.output is None:
+        parser.error("an output file is required (positional or --output)")
+
+    streaming = "-" in (args.input, args.output)
+    if streaming:
+        if args.sweep_tempo or args.sweep_tatum or args.cache or args.memory_budget:
+            parser.error("--sweep-*, --cache and --memory-budget need file paths, not '-'")
+        if args.format is not None and (args.rate is None or args.channels is None):
+            parser.error("raw PCM input (--format) needs --rate and --channels")
+
+    if args.export and (args.output == "-" or args.sweep_tempo or args.sweep_tatum):
+        parser.error("--export needs a file --output and cannot be combined with --sweep-*")
+    if args.output != "-" and not (args.sweep_tempo or args.sweep_tatum):
+        try:
+            parse_targets(output_targets(args))
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Bad mode parameters fail here, before anything is decoded
+    try:
+        get_mode(args.mode).validate(**mode_params(args, 0))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.cache and (args.memory_budget or args.memory_probe):
+        parser.error("--cache stores whole renders; it cannot be combined with --memory-budget / --memory-probe")
+
+    if args.metrics_prom or args.metrics_jsonl:
+        spans.enable()
+    try:
+        if streaming:
+            run_stream(args)
+        elif args.sweep_tempo or args.sweep_tatum:
+            run_sweep(args)
+        else:
+            run_file(args)
+    finally:
+        write_metrics(args)
+
+
+def run_file(args):
+    """File in, file out (optionally through the render cache)."""
+    cache = key = None
+    if args.cache:
+        cache = RenderCache(args.cache)
+        params = dict(tempo=args.tempo, beats_per_bar=args.beats_per_bar)
+        params.update(mode_params(args, 0))
+        params.pop("crossfade", None)
+        if args.declick and "crossfade" in get_mode(args.mode).param_names:
+            params["declick_ms"] = args.declick
+        key = cache.file_key(args.input, args.mode, **params)
+        entry = cache.get(key)
+        if entry is not None:
+            export_audio(entry.audio, entry.sample_rate, output_targets(args))
+            print(f"[cache] hit {key[:12]}")
+            return
+
+    if args.memory_budget or args.memory_probe:
+        info = audio_info(args.input)
+        if info is not None:
+            try:
+                with span("dsp"):
+                    plan = process_file(
+                        args.input,
+                        output_targets(args),
+                        args.mode,
+                        memory_budget=parse_size(args.memory_budget) if args.memory_budget else None,
+                        memory_probe=args.memory_probe,
+                        threads=args.threads,
+                        **mode_params(args, info[2]),
+                    )
+            except MemoryBudgetExceeded as e:
+                sys.exit(f"[memory] {e}")
+            actual = f", actual {plan.actual_bytes / (1 << 20):.1f} MB" if plan.actual_bytes is not None else ""
+            print(f"[memory] {plan.strategy}: predicted {plan.predicted_bytes / (1 << 20):.1f} MB{actual} ({plan.reason})")
+            return
+        print(f"[memory] {args.input} has no readable header; decoding in full")
+
+    # Load audio
+    audio, sr = load_audio(args.input)
+
+    # The mode's parameters come from its ModeSpec; threads only reach
+    # modes that declare themselves parallel
+    with span("dsp"):
+        out = process_audio(audio, sr, mode=args.mode, threads=args.threads, **mode_params(args, sr))
+
+    # Save output (every target encoded concurrently from this render)
+    export_audio(out, sr, output_targets(args))
+
+    if cache is not None:
+        from core.economic.receipt_generator import _hash_audio
+        cache.put(key, out, sr, input_hash=_hash_audio(audio), output_hash=_hash_audio(out))
+        print(f"[cache] stored {key[:12]}")
+
+
+if __name__ == "__main__":
+    main()
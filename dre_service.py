@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+
+from core.hybrid.service import RenderService
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Digital Reverse Engine — local render service"
+    )
+
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Loopback address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix-socket", type=str, default=None, help="Serve on a Unix socket instead of TCP")
+
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=64, help="Queued jobs before new ones get 503 (default: 64)")
+    parser.add_argument("--keep-results", type=int, default=128, help="Finished jobs kept for download (default: 128)")
+    parser.add_argument("--usage-log", type=str, default=None, help="Append receipts to this usage log")
+    parser.add_argument(
+        "--no-shared-memory",
+        action="store_true",
+        help="Pickle audio to and from workers instead of using shared-memory slabs",
+    )
+
+    parser.add_argument("--cache-dir", type=str, default=None, help="Serve repeated renders from this render cache")
+    parser.add_argument("--cache-max-mb", type=int, default=4096, help="Render cache size cap in MB (default: 4096)")
+
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Time every pipeline stage and serve the histograms on GET /metrics",
+    )
+
+    args = parser.parse_args()
+
+    service = RenderService(
+        workers=args.workers,
+        max_queue=args.max_queue,
+        keep_results=args.keep_results,
+        usage_log=args.usage_log,
+        shared_memory=not args.no_shared_memory,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_mb << 20,
+        metrics=args.metrics,
+    )
+
+    where = args.unix_socket or f"http://{args.host}:{args.port}"
+    print(f"DRE render service: {service.workers} workers on {where}")
+
+    try:
+        asyncio.run(service.serve_forever(host=args.host, port=args.port, unix_socket=args.unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
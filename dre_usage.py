@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+from core.economic.usage_log import DEFAULT_LOG_PATH
+from core.economic.usage_store import STRING_FIELDS, UsageStore, compact
+
+DEFAULT_STORE = os.path.join(os.path.dirname(DEFAULT_LOG_PATH), "columnar")
+
+
+def parse_time(value: str):
+    """
+    Accepts epoch seconds, an ISO date/datetime (UTC) or a relative
+    age such as 30d / 12h / 15m.
+    """
+    if value is None:
+        return None
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([dhm])", value)
+    if m:
+        scale = {"d": 86400, "h": 3600, "m": 60}[m.group(2)]
+        return time.time() - float(m.group(1)) * scale
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def cmd_compact(args):
+    added = compact(args.log_dir, args.store, include_live=args.include_live, remove_source=args.remove)
+    for entry in added:
+        print(f"compacted {entry['source']}: {entry['rows']} rows")
+    if not added:
+        print("nothing to compact")
+
+
+def cmd_query(args):
+    if args.compact:
+        compact(args.log_dir, args.store, include_live=True)
+
+    group_by = [f for f in args.by.split(",") if f] if args.by else []
+    where = {}
+    for field in STRING_FIELDS:
+        value = getattr(args, field)
+        if value is not None:
+            where[field] = value
+
+    t0 = time.perf_counter()
+    store = UsageStore(args.store)
+    rows = store.query(parse_time(args.since), parse_time(args.until), group_by=group_by, where=where)
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    header = group_by + ["count", "datacostunits"]
+    widths = [max([len(h)] + [len(_fmt(r[h])) for r in rows]) for h in header]
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    for r in rows:
+        print("  ".join(_fmt(r[h]).ljust(w) for h, w in zip(header, widths)))
+    print(f"\n{sum(r['count'] for r in rows)} receipts, {store.rows} stored, {elapsed * 1000:.1f} ms")
+
+
+def _fmt(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Digital Reverse Engine — A2A usage log queries"
+    )
+    parser.add_argument("--log-dir", default=os.path.dirname(DEFAULT_LOG_PATH), help="Usage log directory")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Columnar store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compact", help="Compact closed log segments into columnar parts")
+    p.add_argument("--include-live", action="store_true", help="Also snapshot the live usage_log.jsonl")
+    p.add_argument("--remove", action="store_true", help="Delete closed segments once compacted")
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser("query", help="Sum datacostunits and count receipts per group")
+    p.add_argument("--since", help="Start time (epoch, ISO date or age like 30d)")
+    p.add_argument("--until", help="End time, exclusive (same formats)")
+    p.add_argument("--by", default="tier,mode", help="Comma-separated group fields: mode, tier, gate_status")
+    p.add_argument("--mode", help="Only this mode")
+    p.add_argument("--tier", help="Only this tier")
+    p.add_argument("--gate-status", dest="gate_status", help="Only this gate status")
+    p.add_argument("--compact", action="store_true", help="Compact (including the live log) before querying")
+    p.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    p.set_defaults(func=cmd_query)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+
+from core.economic.receipt_audit import audit, iter_jobs
+from core.economic.receipt_generator import HASH_BLOCK
+
+
+def describe(result: dict) -> str:
+    failed = [c for c in ("signature", "input_hash", "output_hash") if result.get(c) is False]
+    if result["status"] == "error":
+        detail = result["error"]
+    else:
+        detail = ", ".join(
+            f"{c} (file is {result[c + '_subtype']})" if c + "_subtype" in result else c
+            for c in failed
+        ) + " mismatch"
+    target = result.get("output") or result.get("input") or result.get("source")
+    return f"[{result['status']}] {target}: {detail}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Digital Reverse Engine — verify receipts against their audio"
+    )
+
+    parser.add_argument(
+        "receipts",
+        nargs="+",
+        help="Receipt files (.json: one receipt or a list; .jsonl: one per line) or manifests "
+             'of {"receipt" | "receipt_path", "input", "output"} entries',
+    )
+    parser.add_argument("--input", type=str, default=None, help="Input audio a bare receipt describes")
+    parser.add_argument("--output", type=str, default=None, help="Rendered audio a bare receipt describes")
+
+    parser.add_argument("--workers", type=int, default=None, help="Verifier processes (default: CPU count)")
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Results file; receipts already in it are skipped, so a rerun resumes the audit",
+    )
+    parser.add_argument("--retry-errors", action="store_true", help="Redo receipts that errored in an earlier run")
+    parser.add_argument("--block-size", type=int, default=HASH_BLOCK, help="Frames decoded per step while hashing")
+    parser.add_argument("--json", action="store_true", help="Print every result as a JSON line")
+
+    args = parser.parse_args()
+
+    if (args.input or args.output) and len(args.receipts) > 1:
+        parser.error("--input / --output describe a single receipt file")
+
+    def report(result):
+        if args.json:
+            print(json.dumps(result), flush=True)
+        elif result["status"] != "ok":
+            print(describe(result), flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        counts = audit(
+            iter_jobs(args.receipts, input=args.input, output=args.output),
+            workers=args.workers,
+            checkpoint=args.checkpoint,
+            retry_errors=args.retry_errors,
+            block_size=args.block_size,
+            on_result=report,
+        )
+    except KeyboardInterrupt:
+        print("[verify] interrupted" + (f"; rerun to resume from {args.checkpoint}" if args.checkpoint else ""),
+              file=sys.stderr)
+        sys.exit(130)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - t0
+
+    print(
+        f"[verify] {counts['ok']} ok, {counts['mismatch']} mismatched, {counts['error']} errors, "
+        f"{counts['skipped']} already checkpointed ({elapsed:.1f}s)",
+        file=sys.stderr,
+    )
+    # A resumed audit fails on mismatches found by any of its runs
+    totals = counts.get("checkpoint", counts)
+    if "checkpoint" in counts:
+        print(
+            f"[verify] checkpoint: {totals['ok']} ok, {totals['mismatch']} mismatched, {totals['error']} errors",
+            file=sys.stderr,
+        )
+    sys.exit(1 if totals["mismatch"] or totals["error"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import argparse
+import signal
+
+from core.hybrid.ingest import IngestDaemon
+from core.hybrid.memory_plan import parse_size
+from core.hybrid.modes import all_modes, get_mode, mode_names
+
+
+def add_mode_arguments(parser):
+    """--option per parameter a registered mode declares (plugin modes' included)."""
+    users = {}
+    for spec in all_modes():
+        for p in spec.params:
+            users.setdefault(p.name, (p, []))[1].append(spec.name)
+    for name, (p, modes) in users.items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=p.type,
+            default=None,
+            help=f"{p.help or name} for {', '.join(modes)} (default: {p.default})",
+        )
+
+
+def mode_params(args) -> dict:
+    """The options given on the command line that args.mode's ModeSpec declares."""
+    params = {}
+    for p in get_mode(args.mode).params:
+        value = getattr(args, p.name, None)
+        if value is not None:
+            params[p.name] = value
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Digital Reverse Engine — watch-folder ingest daemon"
+    )
+
+    parser.add_argument("input_dir", type=str, help="Folder to watch for new audio files")
+    parser.add_argument("output_dir", type=str, help="Folder rendered files are written to")
+
+    parser.add_argument("--mode", type=str, default="HQ_REVERSE", choices=mode_names(), help="Reverse mode")
+    add_mode_arguments(parser)
+    parser.add_argument(
+        "--name",
+        type=str,
+        default="{stem}_{mode}.wav",
+        help="Output file name pattern (default: {stem}_{mode}.wav)",
+    )
+
+    parser.add_argument("--decode-workers", type=int, default=1, help="Decoder threads (default: 1)")
+    parser.add_argument("--dsp-workers", type=int, default=None, help="Render threads (default: CPU count)")
+    parser.add_argument("--encode-workers", type=int, default=1, help="Encoder threads (default: 1)")
+    parser.add_argument("--queue-size", type=int, default=2, help="Files buffered between stages (default: 2)")
+    parser.add_argument(
+        "--memory-budget",
+        type=str,
+        default=None,
+        help="Per-render memory budget (e.g. 1G); renders in place when a second buffer does not fit",
+    )
+
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between folder scans (default: 1.0)")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Seconds a file's size and mtime must stay unchanged before it is ingested (default: 2.0)",
+    )
+    parser.add_argument("--journal", type=str, default=None, help="Bookkeeping file (default: <output_dir>/.dre_ingest.jsonl)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Give up on a file after this many failures")
+
+    args = parser.parse_args()
+
+    params = mode_params(args)
+    if args.memory_budget:
+        params["memory_budget"] = parse_size(args.memory_budget)
+
+    try:
+        daemon = IngestDaemon(
+            args.input_dir,
+            args.output_dir,
+            mode=args.mode,
+            params=params,
+            output_name=args.name,
+            journal=args.journal,
+            decode_workers=args.decode_workers,
+            dsp_workers=args.dsp_workers,
+            encode_workers=args.encode_workers,
+            queue_size=args.queue_size,
+            poll_interval=args.poll,
+            settle=args.settle,
+            max_attempts=args.max_attempts,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    # First SIGINT / SIGTERM drains, a second one abandons queued work
+    def shutdown(signum, frame):
+        drain = not daemon.stopping
+        print(f"[ingest] {'draining' if drain else 'stopping now'}...", flush=True)
+        daemon.stop(drain=drain)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    w = daemon.workers
+    print(
+        f"DRE ingest: {args.input_dir} -> {args.output_dir} ({args.mode}; "
+        f"decode {w['decode']} / dsp {w['dsp']} / encode {w['encode']} workers)",
+        flush=True,
+    )
+    daemon.run_forever()
+
+    s = daemon.stats()
+    print(f"[ingest] stopped: {s['done']} done, {s['errors']} retried, {s['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,11 @@ A tempo-aware, reversible audio engine with upgraded UX, logging, and visual fee
 
 import sys
 import os
+import multiprocessing
 import time
 import shutil
 import tempfile
 import numpy as np
-import soundfile as sf
 import sounddevice as sd
 import librosa
 
@@ -24,7 +24,32 @@ from PyQt6.QtWidgets import (
     QTextEdit, QSizePolicy, QFrame
 )
 from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QLinearGradient
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QThread, QObject, pyqtSignal
+
+from core.dsp.edit_history import EditHistory
+from core.dsp.transport import ABTransport
+from core.dsp.streaming import StreamingReverser
+from core.dsp.waveform import waveform_peaks
+from core.hybrid.scheduler import RenderScheduler
+from core.hybrid.dsp_worker import DSPWorker
+from core.timing.tempo import estimate_tempo
+from core.io.audio_buffer import AudioBuffer
+
+# GUI button names that differ from the engine's MODE_MAP keys
+MODE_ALIASES = {
+    "STUDIO_MODE": "STUDIO_REVERSE",
+}
+
+# Export dialog filters -> (extension, soundfile subtype) per file written;
+# a multi-format preset writes every file from the one chosen name
+EXPORT_PRESETS = {
+    "WAV 16-bit (*.wav)": [(".wav", "PCM_16")],
+    "WAV 24-bit (*.wav)": [(".wav", "PCM_24")],
+    "WAV 32-bit float (*.wav)": [(".wav", "FLOAT")],
+    "FLAC 24-bit (*.flac)": [(".flac", "PCM_24")],
+    "MP3 (*.mp3)": [(".mp3", None)],
+    "WAV 24-bit + FLAC + MP3 (*.wav *.flac *.mp3)": [(".wav", "PCM_24"), (".flac", "PCM_24"), (".mp3", None)],
+}
 
 # ============================================================
 # MODERN CYBER-TECH STYLED CONTROLS
@@ -144,12 +169,8 @@ class NeonWaveform(QWidget):
         self.sr = sr
         self.audio_len = len(audio)
 
-        samples = 2000
-        step = max(1, len(audio) // samples)
-        self.peaks = np.array([
-            np.max(np.abs(audio[i:i + step]))
-            for i in range(0, len(audio), step)
-        ])
+        # Works for mono, (frames, channels) and VirtualBuffer views
+        self.peaks = waveform_peaks(audio)
         self.total_peaks = len(self.peaks)
 
         # Reset zoom
@@ -308,36 +329,38 @@ class NeonWaveform(QWidget):
 class TempoWorker(QThread):
     tempo_ready = pyqtSignal(float)
 
-    def __init__(self, audio, sr, parent=None):
+    def __init__(self, audio, sr, dsp_worker=None, parent=None):
         super().__init__(parent)
         self.audio = audio
         self.sr = sr
+        self.dsp_worker = dsp_worker
 
     def run(self):
         try:
-            y = self.audio
-            if y.ndim > 1:
-                y = y.mean(axis=0)
-            if len(y) < 2048:
-                self.tempo_ready.emit(120.0)
-                return
-            onset_env = librosa.onset.onset_strength(y=y.astype(np.float32), sr=self.sr)
-            tempo = librosa.beat.tempo(onset_envelope=onset_env, sr=self.sr, aggregate=None)
-
-            if hasattr(tempo, "__len__"):
-                val = float(tempo[0])
+            if self.dsp_worker is not None:
+                # Analysis runs in the DSP process; this thread just waits
+                val = self.dsp_worker.detect_tempo(self.audio, self.sr)
             else:
-                val = float(tempo)
-            self.tempo_ready.emit(val if val > 0 else 120.0)
+                val = estimate_tempo(self.audio, self.sr)
+            self.tempo_ready.emit(val)
         except Exception:
             self.tempo_ready.emit(120.0)
 
 
-class ReverseWorker(QThread):
-    finished = pyqtSignal(np.ndarray, str)
+class ReverseWorker(QObject):
+    """
+    Qt front for one render on the shared RenderScheduler.
+    Scheduler callbacks arrive on pool threads; the signals queue them
+    back onto the GUI thread.
+    """
+    finished = pyqtSignal(object, str)
+    progress = pyqtSignal(float)
 
-    def __init__(self, audio, sr, mode, tempo, grid_params, parent=None):
+    def __init__(self, scheduler, audio, sr, mode, tempo, grid_params, dsp_worker=None, parent=None):
         super().__init__(parent)
+        self.scheduler = scheduler
+        self.dsp_worker = dsp_worker
+        self.job = None
         self.params = {
             "audio": audio,
             "sample_rate": sr,
@@ -346,14 +369,63 @@ class ReverseWorker(QThread):
             **grid_params,
         }
 
-    def run(self):
-        try:
-            from core.hybrid.pipeline import process_audio
-            processed = process_audio(**self.params)
-            self.finished.emit(processed, self.params["mode"])
-        except Exception as e:
-            print("PIPELINE ERROR:", e)
+    def start(self):
+        # Same key for every GUI render: a new press supersedes the last one
+        from core.hybrid.pipeline import process_audio
+        fn = self.dsp_worker.render if self.dsp_worker is not None else process_audio
+        self.job = self.scheduler.submit(
+            "gui",
+            fn=fn,
+            on_progress=lambda job, fraction: self.progress.emit(fraction),
+            on_done=self._done,
+            **self.params,
+        )
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def _done(self, job, processed, error):
+        if error is not None:
+            print("PIPELINE ERROR:", error)
             self.finished.emit(self.params["audio"], "ERROR_FALLBACK")
+            return
+        self.finished.emit(processed, self.params["mode"])
+
+class ExportWorker(QObject):
+    """
+    Qt front for one export on the RenderScheduler: every target is
+    encoded in the background, so playback keeps running meanwhile.
+    """
+    finished = pyqtSignal(list, str)
+    progress = pyqtSignal(float)
+
+    def __init__(self, scheduler, key, audio, sr, targets, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.key = key
+        self.job = None
+        self.params = {"audio": audio, "sample_rate": sr, "targets": targets}
+
+    def start(self):
+        from core.io.export import export_audio
+        self.job = self.scheduler.submit(
+            self.key,
+            fn=export_audio,
+            on_progress=lambda job, fraction: self.progress.emit(fraction),
+            on_done=self._done,
+            **self.params,
+        )
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def _done(self, job, paths, error):
+        if error is not None:
+            self.finished.emit([], str(error))
+            return
+        self.finished.emit(paths, "")
 
 # ============================================================
 # MAIN APPLICATION: "VIRTUAL STUDIO 3.2"
@@ -367,13 +439,29 @@ class CyberReverseEngine(QWidget):
         self.resize(1200, 669)
 
         # Shared Audio State
+        self.buffer = None              # AudioBuffer of the loaded file
         self.original_audio = None
         self.current_audio = None
+        self.history = None
         self.sr = 44100
         self.stream = None
+        self.live_stream = None         # duplex device stream for live reverse
+        self.live_reverser = None
         self.play_idx = 0
+        self.transport = ABTransport(self.sr)
+        self.scheduler = RenderScheduler()
+        self.rev_worker = None
+        self.export_workers = []        # running exports (kept alive until done)
+        self.export_count = 0
+
+        # Optional out-of-process DSP (keeps the GIL free for playback)
+        self.dsp_worker = None
         self.temp_dir = tempfile.mkdtemp()
 
+        # Virtual render: modes are auditioned through a slice plan and
+        # only materialized on export (or by ReverseWorker when it is switched off)
+        self.virtual_render = True
+
         # Metronome
         self.click_enabled = False
         self.click_timer = QTimer()
@@ -514,11 +602,21 @@ class CyberReverseEngine(QWidget):
 
         self.reset_btn = CyberButton("Clear Buffer", "#ff6b8b")
         self.reset_btn.clicked.connect(self.reset_audio)
+
+        # Undo / redo through the edit history
+        history_layout = QHBoxLayout()
+        self.undo_btn = CyberButton("Undo", "#8b949e")
+        self.undo_btn.clicked.connect(self.undo_edit)
+        self.redo_btn = CyberButton("Redo", "#8b949e")
+        self.redo_btn.clicked.connect(self.redo_edit)
+        history_layout.addWidget(self.undo_btn)
+        history_layout.addWidget(self.redo_btn)
     
         math_pod.layout.addWidget(self.metro_btn)
         math_pod.layout.addStretch()
         math_pod.layout.addWidget(album_wrap)
         math_pod.layout.addStretch()
+        math_pod.layout.addLayout(history_layout)
         math_pod.layout.addWidget(self.reset_btn)
 
         
@@ -534,17 +632,36 @@ class CyberReverseEngine(QWidget):
         btn_hq = CyberButton("High Fidelity", "#00ffc8")
         btn_tatum = CyberButton("Tatum Logic", "#ff7b72")
         btn_studio = CyberButton("Studio Shuf", "#79c0ff")
+        btn_grain = CyberButton("Grain Cloud", "#ffa657")
 
         btn_true.clicked.connect(lambda: self.trigger_process("TRUE_REVERSE"))
         btn_hq.clicked.connect(lambda: self.trigger_process("HQ_REVERSE"))
         btn_tatum.clicked.connect(lambda: self.trigger_process("TATUM_REVERSE"))
         btn_studio.clicked.connect(lambda: self.trigger_process("STUDIO_MODE"))
+        btn_grain.clicked.connect(lambda: self.trigger_process("GRAIN_REVERSE"))
 
         modes_layout.addWidget(btn_true)
         modes_layout.addWidget(btn_hq)
         modes_layout.addWidget(btn_tatum)
         modes_layout.addWidget(btn_studio)
+        modes_layout.addWidget(btn_grain)
+
+        self.virtual_btn = CyberButton("Virtual Render: ON", "#f2cc60")
+        self.virtual_btn.clicked.connect(self.toggle_virtual_render)
+        modes_layout.addWidget(self.virtual_btn)
+
+        self.isolate_btn = CyberButton("Isolated DSP: OFF", "#f2cc60")
+        self.isolate_btn.clicked.connect(self.toggle_isolated_dsp)
+        modes_layout.addWidget(self.isolate_btn)
+
+        self.cancel_btn = CyberButton("Cancel Render", "#ff6b8b")
+        self.cancel_btn.clicked.connect(self.cancel_render)
+        modes_layout.addWidget(self.cancel_btn)
+
         mode_pod.layout.addLayout(modes_layout)
+
+        self.render_status = QLabel("RENDER: IDLE")
+        mode_pod.layout.addWidget(self.render_status)
         main_layout.addWidget(mode_pod)
 
         # --- ROW 4: TRANSPORT & LOGS ---
@@ -556,7 +673,13 @@ class CyberReverseEngine(QWidget):
         self.play_btn.clicked.connect(self.toggle_play)
         self.save_btn = CyberButton("Export Master", "#f2f2f2")
         self.save_btn.clicked.connect(self.save_file)
+        self.ab_btn = CyberButton("A/B: Processed", "#f2cc60")
+        self.ab_btn.clicked.connect(self.toggle_ab)
+        self.live_btn = CyberButton("Live Reverse: OFF", "#ff7b72")
+        self.live_btn.clicked.connect(self.toggle_live)
         t_layout.addWidget(self.play_btn)
+        t_layout.addWidget(self.ab_btn)
+        t_layout.addWidget(self.live_btn)
         t_layout.addWidget(self.save_btn)
         transport_pod.layout.addLayout(t_layout)
 
@@ -651,18 +774,24 @@ class CyberReverseEngine(QWidget):
             return
 
         y, sr = librosa.load(path, sr=None, mono=False)
-        self.original_audio = y.T if y.ndim > 1 else y
-        self.current_audio = self.original_audio.copy()
+        # One C-contiguous frames x channels copy instead of a strided .T view
+        self.buffer = AudioBuffer.from_librosa(y, sr)
+        del y
+        self.original_audio = self.buffer.data
+        self.current_audio = self.original_audio
+        self.history = EditHistory(self.original_audio)
         self.sr = sr
+        self.transport = ABTransport(sr)
+        self.transport.set_sources(self.original_audio, self.current_audio)
+        self.ab_btn.setText("A/B: Processed")
         self.file_path_display.setText(os.path.basename(path))
         self.load_album_art(path)
 
-        vis = y.mean(axis=0) if y.ndim > 1 else y
-        self.waveform.set_waveform(vis, sr)
+        self.waveform.set_waveform(self.buffer.mono().data, sr)
         self.log.append(f"[INIT] Loaded {path}")
 
         self.log.append("[ENGINE] Detecting BPM…")
-        self.tempo_worker = TempoWorker(y, sr)
+        self.tempo_worker = TempoWorker(self.buffer.to_librosa(), sr, self.dsp_worker)
         self.tempo_worker.tempo_ready.connect(self.on_tempo_detected)
         self.tempo_worker.start()
 
@@ -690,32 +819,153 @@ class CyberReverseEngine(QWidget):
             "beats_per_bar": beats,
             "tatum_fraction": tatum,
         }
+        mode = MODE_ALIASES.get(mode, mode)
+
+        # Out-of-range values are reported before anything is queued
+        from core.hybrid.modes import get_mode
+        spec = get_mode(mode)
+        try:
+            spec.validate(tempo=tempo, **grid_params)
+        except ValueError as e:
+            self.log.append(f"[ERROR] {e}")
+            return
 
         self.log.append(
             f"[COMPUTE] {mode} | BPM={tempo:.2f} | bars={bars}, beats={beats}, tatum={tatum}"
         )
 
         # --------------------------------------------------------
-        # NEW: Notify user if audio is long (over ~30 seconds)
+        # VIRTUAL RENDER: build the slice plan only (instant, no copy)
+        # --------------------------------------------------------
+        if self.virtual_render and spec.permutation:
+            from core.hybrid.pipeline import build_plan
+            plan = build_plan(
+                len(self.current_audio), self.sr, mode, tempo=tempo, **grid_params
+            )
+            self.history.push_plan(mode, plan, tempo=tempo, **grid_params)
+            self.refresh_buffer()
+            self.log.append(f"[DONE] {mode} Applied (virtual).")
+            return
+
+        # --------------------------------------------------------
+        # Notify user when the mode's cost model predicts a slow render
         # --------------------------------------------------------
-        if len(self.current_audio) > self.sr * 30:
-            self.log.append("[ENGINE] Processing large audio buffer… please wait.")
+        shape = self.current_audio.shape
+        channels = shape[1] if len(shape) > 1 else 1
+        seconds = spec.estimate(len(self.current_audio), channels, self.sr, tempo=tempo, **grid_params)
+        if seconds > 1.0:
+            self.log.append(f"[ENGINE] Processing large audio buffer (~{seconds:.0f}s)… please wait.")
 
         self.rev_worker = ReverseWorker(
-            self.current_audio, self.sr, mode, tempo, grid_params
+            self.scheduler, self.current_audio, self.sr, mode, tempo, grid_params,
+            dsp_worker=self.dsp_worker,
         )
         self.rev_worker.finished.connect(self.on_rev_done)
+        self.rev_worker.progress.connect(self.on_rev_progress)
+        self.render_status.setText(f"RENDER: {mode} 0%")
         self.rev_worker.start()
 
-    def on_rev_done(self, audio, mode):
-        self.current_audio = audio
-        vis = audio.T.mean(axis=0) if audio.ndim > 1 else audio
-        self.waveform.set_waveform(vis, self.sr)
+    def on_rev_progress(self, fraction):
+        self.render_status.setText(
+            f"RENDER: {self.rev_worker.params['mode']} {fraction * 100:.0f}%"
+        )
+
+    def cancel_render(self):
+        if self.rev_worker is None or self.rev_worker.job is None:
+            return
+        if self.rev_worker.job.status in ("queued", "running"):
+            self.rev_worker.cancel()
+            self.render_status.setText("RENDER: CANCELLED")
+            self.log.append("[ENGINE] Render cancelled.")
 
+    def on_rev_done(self, audio, mode):
+        self.render_status.setText("RENDER: IDLE")
         if mode == "ERROR_FALLBACK":
             self.log.append("[FAIL] DSP pipeline failed, fallback buffer used.")
+            return
+
+        self.history.push_audio(mode, audio)
+        self.refresh_buffer()
+        self.log.append(f"[DONE] {mode} Applied.")
+
+    def refresh_buffer(self):
+        """Point playback and the waveform at the current history state."""
+        self.current_audio = self.history.view()
+        self.transport.set_sources(
+            self.original_audio, self.current_audio, self.history.base_plan()
+        )
+        self.waveform.set_waveform(self.transport.active_source, self.sr)
+
+    def toggle_ab(self):
+        """
+        Flip between original (A) and processed (B) without stopping the
+        stream. The switch lands on the same musical position and is
+        crossfaded at the next audio block.
+        """
+        if self.current_audio is None:
+            return
+
+        side = "A" if self.transport.active == "B" else "B"
+        playing = self.stream is not None and self.stream.active
+        if playing:
+            self.transport.toggle()
+        else:
+            self.transport.seek(self.transport.map_position(self.play_idx, side))
+            self.transport.active = side
+            self.play_idx = self.transport.position
+
+        source = self.original_audio if side == "A" else self.current_audio
+        self.waveform.set_waveform(source, self.sr)
+        self.ab_btn.setText("A/B: Original" if side == "A" else "A/B: Processed")
+        self.log.append(f"[A/B] Monitoring {'original' if side == 'A' else 'processed'}")
+
+    def undo_edit(self):
+        if self.history is None or not self.history.undo():
+            self.log.append("[HISTORY] Nothing to undo.")
+            return
+        self.refresh_buffer()
+        self.log.append(
+            f"[HISTORY] Undo → {self.history.label} "
+            f"({self.history.cursor}/{len(self.history.steps)})"
+        )
+
+    def redo_edit(self):
+        if self.history is None or not self.history.redo():
+            self.log.append("[HISTORY] Nothing to redo.")
+            return
+        self.refresh_buffer()
+        self.log.append(
+            f"[HISTORY] Redo → {self.history.label} "
+            f"({self.history.cursor}/{len(self.history.steps)})"
+        )
+
+    def toggle_isolated_dsp(self):
+        """Run tempo analysis and renders in a separate DSP process."""
+        if self.dsp_worker is None:
+            try:
+                self.dsp_worker = DSPWorker().start()
+            except Exception as e:
+                self.log.append(f"[ERROR] Could not start DSP process: {e}")
+                return
+            self.isolate_btn.setText("Isolated DSP: ON")
+            self.log.append("[ENGINE] Isolated DSP process started.")
         else:
-            self.log.append(f"[DONE] {mode} Applied.")
+            self.dsp_worker.stop()
+            self.dsp_worker = None
+            self.isolate_btn.setText("Isolated DSP: OFF")
+            self.log.append("[ENGINE] Isolated DSP process stopped.")
+
+    def toggle_virtual_render(self):
+        """Switch between slice-plan auditioning and fully rendered buffers."""
+        self.virtual_render = not self.virtual_render
+
+        if self.virtual_render:
+            self.virtual_btn.setText("Virtual Render: ON")
+            self.log.append("[ENGINE] Virtual render ON — modes audition instantly.")
+            return
+
+        self.virtual_btn.setText("Virtual Render: OFF")
+        self.log.append("[ENGINE] Virtual render OFF.")
     # --------------------------------------------------------
     # METRONOME
     # --------------------------------------------------------
@@ -774,6 +1024,7 @@ class CyberReverseEngine(QWidget):
             return
 
         self.play_idx = 0
+        self.transport.seek(0)
         audio = self.current_audio
         chs = 1 if audio.ndim == 1 else audio.shape[1]
 
@@ -796,35 +1047,64 @@ class CyberReverseEngine(QWidget):
         self.play_btn.setText("Cease Playback")
 
     def audio_callback(self, outdata, frames, time_info, status):
-        """Stream audio to the output device."""
-        audio = self.current_audio
-        n = len(audio)
-
-        start = self.play_idx
-        end = min(start + frames, n)
-
-        if audio.ndim == 1:
-            chunk = audio[start:end]
-            if len(chunk) < frames:
-                outdata[:len(chunk), 0] = chunk
-                outdata[len(chunk):].fill(0)
-                self.play_idx = 0
-                raise sd.CallbackStop()
-            else:
-                outdata[:, 0] = chunk
-                if outdata.shape[1] > 1:
-                    outdata[:, 1:] = 0
-                self.play_idx = end
-        else:
-            chunk = audio[start:end, :]
-            if len(chunk) < frames:
-                outdata[:len(chunk)] = chunk
-                outdata[len(chunk):].fill(0)
-                self.play_idx = 0
-                raise sd.CallbackStop()
-            else:
-                outdata[:] = chunk
-                self.play_idx = end
+        """Stream audio to the output device (A/B switches happen here)."""
+        more = self.transport.read(outdata, frames)
+        self.play_idx = self.transport.position
+        if not more:
+            self.play_idx = 0
+            self.transport.seek(0)
+            raise sd.CallbackStop()
+
+    # --------------------------------------------------------
+    # LIVE REVERSE (input device -> StreamingReverser -> output)
+    # --------------------------------------------------------
+    def toggle_live(self):
+        """Reverse the input device bar by bar, one bar behind."""
+        if self.live_stream is not None:
+            try:
+                self.live_stream.stop()
+                self.live_stream.close()
+            except Exception:
+                pass
+            self.live_stream = None
+            self.live_reverser = None
+            self.live_btn.setText("Live Reverse: OFF")
+            self.log.append("[LIVE] OFF")
+            return
+
+        try:
+            tempo = float(self.bpm_in.text())
+            bars = int(self.bars_in.text())
+            beats = int(self.beats_in.text())
+        except ValueError:
+            self.log.append("[ERROR] Invalid grid or tempo values.")
+            return
+
+        try:
+            chs = max(min(int(sd.query_devices(kind="input")["max_input_channels"]), 2), 1)
+            self.live_reverser = StreamingReverser(
+                self.sr, channels=chs, tempo=tempo, beats_per_bar=beats, unit="bar", bars=bars
+            )
+            self.live_stream = sd.Stream(
+                samplerate=self.sr,
+                channels=chs,
+                dtype="float32",
+                callback=self.live_callback,
+            )
+            self.live_stream.start()
+        except Exception as e:
+            self.live_stream = None
+            self.live_reverser = None
+            self.log.append(f"[LIVE] Could not open audio input: {e}")
+            return
+
+        latency_ms = self.live_reverser.latency / self.sr * 1000.0
+        self.live_btn.setText("Live Reverse: ON")
+        self.log.append(f"[LIVE] ON | {bars} bar window @ {tempo:.2f} BPM ({latency_ms:.0f} ms latency)")
+
+    def live_callback(self, indata, outdata, frames, time_info, status):
+        """Device callback: no allocation, writes straight into outdata."""
+        self.live_reverser.process(indata, out=outdata)
 
     def sync_ui(self):
         """Update playhead and sweep indicator during playback."""
@@ -857,6 +1137,7 @@ class CyberReverseEngine(QWidget):
 
         sample_pos = int((ms / 1000.0) * self.sr)
         self.play_idx = max(0, min(sample_pos, len(self.current_audio) - 1))
+        self.transport.seek(self.play_idx)
 
         self.waveform.update_playhead(ms)
 
@@ -955,14 +1236,11 @@ class CyberReverseEngine(QWidget):
     # BUFFER + SAVE
     # --------------------------------------------------------
     def reset_audio(self):
-        if self.original_audio is not None:
-            self.current_audio = self.original_audio.copy()
-            vis = (
-                self.current_audio.T.mean(axis=0)
-                if self.current_audio.ndim > 1
-                else self.current_audio
-            )
-            self.waveform.set_waveform(vis, self.sr)
+        if self.history is not None:
+            # No copy: the original is never written to, and the edits stay
+            # in the history for redo.
+            self.history.reset()
+            self.refresh_buffer()
             self.log.append("[MIX] Buffer Purged to Original.")
 
     def save_file(self):
@@ -970,34 +1248,71 @@ class CyberReverseEngine(QWidget):
             self.log.append("[SAVE] No buffer to export.")
             return
 
-        path, _ = QFileDialog.getSaveFileName(
+        path, chosen = QFileDialog.getSaveFileName(
             self,
             "Export",
             "",
-            "WAV (*.wav);;MP3 (*.mp3);;FLAC (*.flac)",
+            ";;".join(EXPORT_PRESETS),
         )
         if not path:
             return
 
+        # Bad name or unsupported format: report now, before anything runs
+        from core.io.export import ExportTarget, parse_targets
+        preset = EXPORT_PRESETS.get(chosen, [(os.path.splitext(path)[1], None)])
+        stem, ext = os.path.splitext(path)
+        if ext.lower() not in {e for p in EXPORT_PRESETS.values() for e, _ in p}:
+            stem = path
         try:
-            sf.write(path, self.current_audio, self.sr)
-            self.log.append(f"[SAVE] Exported to {path}")
-        except Exception as e:
+            targets = parse_targets([ExportTarget(stem + e, subtype) for e, subtype in preset])
+        except ValueError as e:
             self.log.append(f"[ERROR] Export failed: {e}")
+            return
+
+        # A virtual render is exported straight through its slice plan
+        # (never materialized); the buffer is read-only, so auditioning
+        # and new renders can go on while the encoders run.
+        self.export_count += 1
+        worker = ExportWorker(self.scheduler, f"export-{self.export_count}", self.current_audio, self.sr, targets)
+        worker.progress.connect(self.on_export_progress)
+        worker.finished.connect(lambda paths, error, w=worker: self.on_export_done(w, paths, error))
+        self.export_workers.append(worker)
+        names = ", ".join(os.path.basename(t.path) for t in targets)
+        self.log.append(f"[SAVE] Exporting {names} in the background…")
+        worker.start()
+
+    def on_export_progress(self, fraction):
+        self.save_btn.setText(f"Exporting {int(fraction * 100)}%")
+
+    def on_export_done(self, worker, paths, error):
+        if worker in self.export_workers:
+            self.export_workers.remove(worker)
+        if not self.export_workers:
+            self.save_btn.setText("Export Master")
+        if error:
+            self.log.append(f"[ERROR] Export failed: {error}")
+            return
+        for path in paths:
+            self.log.append(f"[SAVE] Exported to {path}")
 
     def closeEvent(self, event):
-        try:
-            if self.stream is not None:
-                self.stream.stop()
-                self.stream.close()
-        except Exception:
-            pass
+        for stream in (self.stream, self.live_stream):
+            try:
+                if stream is not None:
+                    stream.stop()
+                    stream.close()
+            except Exception:
+                pass
 
+        self.scheduler.shutdown(wait=False)
+        if self.dsp_worker is not None:
+            self.dsp_worker.stop()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
         event.accept()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = CyberReverseEngine()
     window.show()
@@ -0,0 +1,87 @@
+import hashlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.economic.receipt_generator import _hash_audio
+from core.hybrid.pipeline import process_audio
+from core.io.audio_buffer import AudioBuffer, as_array
+from core.io.audio_loader import load_buffer, save_audio
+from core.io.shm import share_array, attach
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def stereo():
+    return np.random.default_rng(0).standard_normal((3000, 2)).astype(np.float32)
+
+
+def test_layout_and_views(stereo):
+    buf = AudioBuffer(stereo, SAMPLE_RATE)
+    assert buf.samples is stereo                # no copy for C-contiguous input
+    assert (buf.frames, buf.channels, buf.shape, len(buf)) == (3000, 2, (3000, 2), 3000)
+    assert buf.duration == pytest.approx(3000 / SAMPLE_RATE)
+
+    mono = AudioBuffer(stereo[:, 0], SAMPLE_RATE)
+    assert mono.samples.shape == (3000, 1) and mono.samples.flags.c_contiguous
+    assert mono.data.shape == (3000,) and np.asarray(mono).shape == (3000,)
+    np.testing.assert_array_equal(mono.data, stereo[:, 0])
+
+    part = buf[100:200]
+    assert isinstance(part, AudioBuffer) and np.shares_memory(part.samples, stereo)
+    np.testing.assert_array_equal(part.data, stereo[100:200])
+    np.testing.assert_array_equal(buf[::2], stereo[::2])
+    assert as_array(buf) is buf.data and as_array(stereo) is stereo
+
+    np.testing.assert_array_equal(buf.to_librosa(), stereo.T)
+    back = AudioBuffer.from_librosa(buf.to_librosa(), SAMPLE_RATE)
+    np.testing.assert_array_equal(back.data, stereo)
+    np.testing.assert_allclose(buf.mono().data, stereo.mean(axis=1), rtol=1e-6)
+    assert np.shares_memory(mono.mono().samples, mono.samples)
+
+    with pytest.raises(ValueError):
+        AudioBuffer(np.zeros((2, 2, 2)), SAMPLE_RATE)
+
+
+def test_version_and_digest(stereo):
+    buf = AudioBuffer(stereo, SAMPLE_RATE, copy=True)
+    assert buf.digest() == hashlib.sha256(stereo.tobytes()).hexdigest()
+    buf.write(10, np.ones((5, 2), dtype=np.float32))
+    assert buf.version == 1 and buf.data[10:15].all() and not np.shares_memory(buf.samples, stereo)
+    buf.touch()
+    assert buf.version == 2
+    assert buf.digest() == hashlib.sha256(buf.data.tobytes()).hexdigest()
+
+
+def test_engine_accepts_buffers(stereo, tmp_path):
+    buf = AudioBuffer(stereo, SAMPLE_RATE)
+    expected = process_audio(stereo, SAMPLE_RATE, "HQ_REVERSE")
+    for mode in ("HQ_REVERSE", "GRAIN_REVERSE"):
+        out = process_audio(buf, SAMPLE_RATE, mode)
+        assert isinstance(out, AudioBuffer) and out.sample_rate == SAMPLE_RATE
+        np.testing.assert_array_equal(out.data, process_audio(stereo, SAMPLE_RATE, mode))
+
+    target = AudioBuffer.empty(3000, 2, SAMPLE_RATE)
+    assert process_audio(buf, SAMPLE_RATE, "HQ_REVERSE", out=target) is target
+    assert target.version == 1
+    np.testing.assert_array_equal(target.data, expected)
+
+    # Receipts hash a buffer exactly like the array it wraps
+    assert _hash_audio(buf) == _hash_audio(stereo) == buf.digest()
+    assert _hash_audio(target) == hashlib.sha256(expected.tobytes()).hexdigest()
+
+    shm, handle = share_array(buf)
+    peer, view = attach(handle)
+    np.testing.assert_array_equal(view, stereo)
+    del view
+    peer.close()
+    shm.close()
+    shm.unlink()
+
+    path = tmp_path / "x.wav"
+    save_audio(path, AudioBuffer(stereo * 0.1, SAMPLE_RATE), SAMPLE_RATE)
+    loaded = load_buffer(str(path))
+    assert loaded.sample_rate == SAMPLE_RATE and loaded.shape == stereo.shape
+    np.testing.assert_allclose(loaded.data, sf.read(path, dtype="float32")[0])
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from core.hybrid import pipeline
+from core.hybrid.pipeline import process_audio, process_batch
+from core.io.audio_buffer import AudioBuffer
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def clips():
+    """One-shots of a few shared lengths, stereo and mono, two rates."""
+    rng = np.random.default_rng(0)
+    out = []
+    for i in range(24):
+        frames = (3000, 4500, 6001)[i % 3]
+        shape = (frames,) if i % 4 == 0 else (frames, 2)
+        out.append(rng.standard_normal(shape).astype(np.float32))
+    return out
+
+
+def rates_for(clips):
+    return [SAMPLE_RATE if i % 5 else 11025 for i in range(len(clips))]
+
+
+@pytest.mark.parametrize("mode", ["TRUE_REVERSE", "HQ_REVERSE", "TATUM_REVERSE", "STUDIO_REVERSE", "GRAIN_REVERSE"])
+def test_batch_matches_process_audio(clips, mode):
+    rates = rates_for(clips)
+    overrides = [{"tempo": 90.0 + 10 * (i % 2)} if i % 3 else {} for i in range(len(clips))]
+    results = process_batch(clips, rates, mode, tempo=128.0, clip_params=overrides)
+    assert len(results) == len(clips)
+    for clip, sr, extra, out in zip(clips, rates, overrides, results):
+        params = {"tempo": 128.0, "beats_per_bar": 4, "tatum_fraction": 0.25, **extra}
+        expected = process_audio(clip, sr, mode, **params)
+        assert out.shape == clip.shape
+        np.testing.assert_array_equal(out, expected)
+
+
+def test_stacked_input_and_crossfade():
+    stack = np.random.default_rng(1).standard_normal((10, 5000, 2)).astype(np.float32)
+    before = pipeline._batch_plan.cache_info().hits
+    for _ in range(2):
+        results = process_batch(stack, SAMPLE_RATE, "HQ_REVERSE", tempo=200.0, crossfade=32)
+        for clip, out in zip(stack, results):
+            np.testing.assert_array_equal(
+                out, process_audio(clip, SAMPLE_RATE, "HQ_REVERSE", tempo=200.0, crossfade=32)
+            )
+    # The second batch reuses the first one's plan
+    assert pipeline._batch_plan.cache_info().hits > before
+
+
+def test_buffers_in_buffers_out(clips):
+    buffers = [AudioBuffer(c, SAMPLE_RATE) for c in clips[:6]]
+    results = process_batch(buffers, mode="HQ_REVERSE")
+    for buf, out in zip(buffers, results):
+        assert isinstance(out, AudioBuffer) and out.sample_rate == SAMPLE_RATE
+        np.testing.assert_array_equal(out.data, process_audio(buf.data, SAMPLE_RATE, "HQ_REVERSE"))
+
+
+def test_bad_clip_fails_before_rendering(clips, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(pipeline, "_gather_batch", lambda *a: rendered.append(a))
+    with pytest.raises(ValueError):
+        process_batch(clips[:3], SAMPLE_RATE, "HQ_REVERSE", clip_params=[{}, {}, {"tempo": -1}])
+    with pytest.raises(ValueError):
+        process_batch(clips[:3], [SAMPLE_RATE, None, SAMPLE_RATE], "HQ_REVERSE")
+    assert rendered == []
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from core.dsp import declick as declick_module
+from core.dsp.declick import declick
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.virtual_buffer import VirtualBuffer
+from core.hybrid.pipeline import build_plan, process_audio
+from tests.test_slice_plan import naive_index, random_plan
+
+SAMPLE_RATE = 8000
+TOTAL = 6000
+
+
+def naive_declick(plan, source, crossfade):
+    """One boundary at a time: continue both slices and mix them sample by sample."""
+    out = source[naive_index(plan)].astype(np.float64)
+    half = min(crossfade, int(min(plan.length))) // 2
+    if len(plan.length) < 2 or half < 1:
+        return out
+    last = len(source) - 1
+    for k in range(1, len(plan.length)):
+        b = int(plan.dst[k])
+        for j in range(2 * half):
+            frame = b - half + j
+            a = plan.src[k - 1] + (frame - plan.dst[k - 1]) * plan.step[k - 1]
+            c = plan.src[k] + (j - half) * plan.step[k]
+            theta = (j + 0.5) / (2 * half) * (np.pi / 2.0)
+            out[frame] = (
+                source[min(max(a, 0), last)] * np.cos(theta)
+                + source[min(max(c, 0), last)] * np.sin(theta)
+            )
+    return out
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((TOTAL, 2)).astype(np.float32)
+
+
+@pytest.fixture
+def plans():
+    rng = np.random.default_rng(1)
+    grid = np.array([0, 40, 1000, 1001, 2500, 4096, TOTAL])
+    return [
+        SlicePlan.from_grid(np.arange(0, TOTAL + 1, 500), TOTAL),
+        SlicePlan.from_grid(grid, TOTAL),               # a 1-frame slice clamps the fade away
+        random_plan(TOTAL, rng, pieces=20),
+        random_plan(TOTAL, rng, pieces=60),
+    ]
+
+
+@pytest.mark.parametrize("crossfade", [2, 17, 64, 400])
+def test_whole_render_matches_naive(audio, plans, crossfade, monkeypatch):
+    # Several batches per render
+    monkeypatch.setattr(declick_module, "DECLICK_BATCH", 7)
+    for plan in plans:
+        out = plan.render(audio)
+        assert declick(plan, audio, out, crossfade=crossfade) is out
+        np.testing.assert_allclose(out, naive_declick(plan, audio, crossfade), rtol=1e-5, atol=1e-6)
+
+        mono = np.ascontiguousarray(audio[:, 0])
+        out = declick(plan, mono, plan.render(mono), crossfade=crossfade)
+        np.testing.assert_allclose(out, naive_declick(plan, mono, crossfade), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("block", [1, 33, 250, 1024])
+def test_block_wise_matches_whole(audio, plans, block):
+    for plan in plans:
+        whole = declick(plan, audio, plan.render(audio), crossfade=64)
+        for start in range(0, TOTAL, block):
+            part = plan.read(audio, start, start + block)
+            declick(plan, audio, part, start=start, crossfade=64)
+            np.testing.assert_array_equal(part, whole[start:start + block])
+
+
+def test_virtual_buffer_and_process_audio(audio, plans):
+    plan = plans[2]
+    whole = declick(plan, audio, plan.render(audio), crossfade=32)
+    view = VirtualBuffer(audio, plan, crossfade=32)
+    np.testing.assert_array_equal(view[1234:4567], whole[1234:4567])
+
+    # Reading through another view takes the sliced-gather path
+    inner = VirtualBuffer(audio, SlicePlan.identity(TOTAL))
+    np.testing.assert_array_equal(declick(plan, inner, plan.render(audio), crossfade=32), whole)
+
+    out = process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", tempo=200.0, crossfade=32)
+    hq = build_plan(TOTAL, SAMPLE_RATE, "HQ_REVERSE", tempo=200.0)
+    np.testing.assert_allclose(out, naive_declick(hq, audio, 32), rtol=1e-5, atol=1e-6)
+
+
+def test_no_crossfade_leaves_output_alone(audio, plans):
+    for crossfade in (0, None, 1):
+        out = plans[0].render(audio)
+        np.testing.assert_array_equal(declick(plans[0], audio, out, crossfade=crossfade), audio[naive_index(plans[0])])
+    flip = SlicePlan.flip(TOTAL)
+    np.testing.assert_array_equal(declick(flip, audio, flip.render(audio)), audio[::-1])
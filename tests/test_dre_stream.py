@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from core.hybrid.modes import mode_names
+from core.hybrid.pipeline import process_audio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 8000
+
+
+@pytest.mark.parametrize("mode", mode_names())
+def test_stream_pipe_every_mode(mode):
+    """dre.py - - renders raw PCM stdin to stdout like process_audio."""
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((SAMPLE_RATE * 3, 2)) * 0.25).astype(np.float32)
+
+    proc = subprocess.run(
+        [
+            sys.executable, "dre.py", "-", "-", "--mode", mode,
+            "--format", "f32le", "--rate", str(SAMPLE_RATE), "--channels", "2",
+        ],
+        input=audio.tobytes(),
+        capture_output=True,
+        cwd=ROOT,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr.decode()
+
+    out = np.frombuffer(proc.stdout, dtype=np.float32).reshape(-1, 2)
+    expected = np.asarray(process_audio(audio.copy(), SAMPLE_RATE, mode))
+    assert out.shape == expected.shape
+    np.testing.assert_allclose(out, expected, atol=1e-6)
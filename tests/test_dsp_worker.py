@@ -0,0 +1,85 @@
+import gc
+import os
+
+import numpy as np
+import pytest
+
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.hybrid.dsp_worker import DSPWorker
+from core.hybrid.pipeline import process_audio
+from core.io.shm import attach, create, adopt, share_array
+
+SAMPLE_RATE = 8000
+
+
+def segments():
+    if not os.path.isdir("/dev/shm"):
+        pytest.skip("no /dev/shm to inspect")
+    return {n for n in os.listdir("/dev/shm") if n.startswith(f"dre_{os.getpid()}_")}
+
+
+@pytest.fixture(scope="module")
+def worker():
+    w = DSPWorker().start()
+    yield w
+    w.stop()
+    assert not w.alive
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((SAMPLE_RATE * 3, 2)).astype(np.float32)
+
+
+def test_share_attach_adopt_roundtrip(audio):
+    before = segments()
+    shm, handle = share_array(audio)
+    peer, view = attach(handle)
+    np.testing.assert_array_equal(view, audio)
+    del view
+    peer.close()
+
+    out = adopt(shm, handle)
+    np.testing.assert_array_equal(out, audio)
+    assert segments() - before
+    del out
+    gc.collect()
+    assert not segments() - before
+
+
+def test_render_matches_process_audio(worker, audio):
+    before = segments()
+    seen = []
+    for mode, params in (("HQ_REVERSE", {}), ("TRUE_REVERSE", {"tempo": 120.0})):
+        out = worker.render(audio, SAMPLE_RATE, mode, progress=seen.append, **params)
+        np.testing.assert_array_equal(out, process_audio(audio, SAMPLE_RATE, mode, **params))
+        del out
+    assert seen == [1.0, 1.0]
+    gc.collect()
+    assert not segments() - before
+
+
+def test_worker_errors_and_cancel(worker, audio):
+    before = segments()
+    with pytest.raises(RuntimeError, match="DSP worker failed"):
+        worker.render(audio, SAMPLE_RATE, "NO_SUCH_MODE")
+    # The worker survives a failed request
+    np.testing.assert_array_equal(
+        worker.render(audio[:1000], SAMPLE_RATE, "HQ_REVERSE"),
+        process_audio(audio[:1000], SAMPLE_RATE, "HQ_REVERSE"),
+    )
+
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(RenderCancelled):
+        worker.render(audio, SAMPLE_RATE, "HQ_REVERSE", cancel=token)
+    gc.collect()
+    assert not segments() - before
+
+
+def test_create_owns_zero_sized_segment():
+    shm, handle, view = create((0, 2))
+    assert view.shape == (0, 2) and handle.nbytes == 0
+    del view
+    shm.close()
+    shm.unlink()
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from core.dsp.edit_history import EditHistory
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.virtual_buffer import VirtualBuffer
+from tests.test_slice_plan import naive_index, random_plan
+
+TOTAL = 3000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((TOTAL, 2)).astype(np.float32)
+
+
+@pytest.fixture
+def plans():
+    rng = np.random.default_rng(1)
+    grid = np.array([0, 400, 1000, 1001, 2200, TOTAL])
+    return [
+        SlicePlan.flip(TOTAL),
+        SlicePlan.from_grid(grid, TOTAL),
+        random_plan(TOTAL, rng),
+        random_plan(TOTAL, rng, pieces=30),
+    ]
+
+
+def test_then_is_render_after_render(audio, plans):
+    for a in plans:
+        for b in plans:
+            composite = a.then(b)
+            expected = audio[naive_index(a)][naive_index(b)]
+            np.testing.assert_array_equal(composite.render(audio), expected)
+            np.testing.assert_array_equal(naive_index(composite), naive_index(a)[naive_index(b)])
+
+
+def test_then_rejects_mismatched_lengths(plans):
+    with pytest.raises(ValueError):
+        plans[0].then(SlicePlan.identity(TOTAL - 1))
+
+
+def test_inverse_composes_to_identity(audio, plans):
+    identity = np.arange(TOTAL)
+    for plan in plans:
+        inv = plan.inverse()
+        np.testing.assert_array_equal(naive_index(inv)[naive_index(plan)], identity)
+        for composite in (inv.then(plan), plan.then(inv)):
+            np.testing.assert_array_equal(naive_index(composite), identity)
+            # coalesce() inside then() folds the identity into one segment
+            assert len(composite.length) == 1
+            np.testing.assert_array_equal(composite.render(audio), audio)
+
+
+def test_inverse_rejects_non_permutations():
+    repeat = SlicePlan.from_segments(10, [0, 0], [5, 5])
+    with pytest.raises(ValueError):
+        repeat.inverse()
+
+
+def test_coalesce_merges_continuing_segments():
+    plan = SlicePlan.from_segments(12, [0, 3, 6, 11, 8], [3, 3, 2, 3, 1], [1, 1, 1, -1, 1])
+    merged = plan.coalesce()
+    np.testing.assert_array_equal(naive_index(merged), naive_index(plan))
+    assert merged.src.tolist() == [0, 11, 8]
+    assert merged.length.tolist() == [8, 3, 1]
+    assert merged.step.tolist() == [1, -1, 1]
+
+
+def test_history_composes_and_navigates(audio, plans):
+    h = EditHistory(audio)
+    assert h.label == "ORIGINAL" and not h.can_undo
+    np.testing.assert_array_equal(h.render(), audio)
+
+    expected = [audio]
+    for n, plan in enumerate(plans):
+        h.push_plan(f"edit{n}", plan)
+        expected.append(expected[-1][naive_index(plan)])
+        assert isinstance(h.view(), VirtualBuffer)
+        np.testing.assert_array_equal(h.render(), expected[-1])
+
+    # Every state is one composite plan from the source
+    for i in range(len(expected)):
+        np.testing.assert_array_equal(h.render(i), expected[i])
+    np.testing.assert_array_equal(h.base_plan().render(audio), expected[-1])
+
+    assert h.undo() and h.undo()
+    np.testing.assert_array_equal(h.render(), expected[-3])
+    assert h.redo()
+    np.testing.assert_array_equal(h.render(), expected[-2])
+    assert h.label == f"edit{len(plans) - 2}"
+
+    # A new edit after an undo drops the redo branch
+    h.push_plan("flip", SlicePlan.flip(TOTAL))
+    assert not h.can_redo
+    np.testing.assert_array_equal(h.render(), expected[-2][::-1])
+
+    h.reset()
+    np.testing.assert_array_equal(h.render(), audio)
+    assert h.can_redo and not h.can_undo
+
+
+def test_history_rendered_step_becomes_anchor(audio, plans):
+    h = EditHistory(audio)
+    h.push_plan("p0", plans[1])
+    rendered = np.ascontiguousarray(h.render() * 0.5)
+    h.push_audio("gain", rendered)
+    assert h.base_plan() is None
+    np.testing.assert_array_equal(h.render(), rendered)
+
+    h.push_plan("p1", plans[2])
+    assert h.base_plan() is None      # relative to the rendered anchor
+    np.testing.assert_array_equal(h.render(), rendered[naive_index(plans[2])])
+
+    h.undo()
+    h.undo()
+    np.testing.assert_array_equal(h.render(), audio[naive_index(plans[1])])
+    assert h.base_plan() is not None
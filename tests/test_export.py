@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.dsp.virtual_buffer import VirtualBuffer
+from core.io.audio_buffer import AudioBuffer
+from core.io.export import ExportTarget, export_audio, parse_target, parse_targets
+from tests.test_slice_plan import naive_index, random_plan
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((10_000, 2)).astype(np.float32) * 0.1
+
+
+def read(path):
+    return sf.read(path, dtype="float32")
+
+
+def test_parse_targets():
+    assert parse_target("mix.wav") == ExportTarget("mix.wav")
+    assert parse_target("mix.flac:24") == ExportTarget("mix.flac", "PCM_24")
+    assert parse_target("mix.wav:float") == ExportTarget("mix.wav", "FLOAT")
+    assert parse_target("mix.wav:PCM_U8") == ExportTarget("mix.wav", "PCM_U8")
+    assert parse_target("C:\\mix.wav") == ExportTarget("C:\\mix.wav")
+    assert ExportTarget("x.aif").resolve()[0] == "AIFF"
+
+    with pytest.raises(ValueError, match="distinct"):
+        parse_targets(["a.wav", "./a.wav:24"])
+    with pytest.raises(ValueError, match="unsupported format"):
+        parse_targets("a.xyz")
+    with pytest.raises(ValueError, match="cannot store"):
+        parse_targets("a.flac:float")
+    with pytest.raises(ValueError):
+        parse_targets([])
+
+
+def test_several_formats_from_one_pass(audio, tmp_path):
+    specs = [f"{tmp_path}/a.wav:float", f"{tmp_path}/a.flac:24", f"{tmp_path}/a16.wav:16", f"{tmp_path}/a.aiff"]
+    seen = []
+    paths = export_audio(AudioBuffer(audio, SAMPLE_RATE), SAMPLE_RATE, specs, progress=seen.append, block_size=1000)
+    assert paths == [f"{tmp_path}/{name}" for name in ("a.wav", "a.flac", "a16.wav", "a.aiff")]
+    assert seen == [min((i + 1) * 1000, 10_000) / 10_000 for i in range(10)]
+
+    np.testing.assert_array_equal(read(paths[0])[0], audio)
+    np.testing.assert_allclose(read(paths[1])[0], audio, atol=2 ** -23)
+    np.testing.assert_allclose(read(paths[2])[0], audio, atol=2 ** -15)
+    np.testing.assert_allclose(read(paths[3])[0], audio, atol=2 ** -15)
+    assert sf.info(paths[1]).subtype == "PCM_24" and sf.info(paths[3]).format == "AIFF"
+    assert sorted(os.listdir(tmp_path)) == ["a.aiff", "a.flac", "a.wav", "a16.wav"]
+
+
+def test_virtual_and_mono_sources(audio, tmp_path):
+    plan = random_plan(len(audio), np.random.default_rng(1), pieces=30)
+    view = VirtualBuffer(audio, plan)
+    (path,) = export_audio(view, SAMPLE_RATE, f"{tmp_path}/v.wav:float", block_size=777)
+    np.testing.assert_array_equal(read(path)[0], audio[naive_index(plan)])
+
+    mono = np.ascontiguousarray(audio[:, 0])
+    (path,) = export_audio(mono, SAMPLE_RATE, f"{tmp_path}/m.wav:float", block_size=777)
+    out, sr = read(path)
+    assert out.ndim == 1 and sr == SAMPLE_RATE
+    np.testing.assert_array_equal(out, mono)
+
+
+def test_cancel_and_failure_leave_existing_files(audio, tmp_path):
+    old = tmp_path / "keep.wav"
+    sf.write(old, np.zeros(10, np.float32), SAMPLE_RATE)
+    before = old.read_bytes()
+
+    token = CancelToken()
+    with pytest.raises(RenderCancelled):
+        export_audio(
+            audio, SAMPLE_RATE, [str(old), f"{tmp_path}/new.flac"],
+            progress=lambda f: f > 0.3 and token.cancel(), cancel=token, block_size=1000,
+        )
+    assert old.read_bytes() == before
+    assert sorted(os.listdir(tmp_path)) == ["keep.wav"]
+
+    # The second target's directory does not exist
+    with pytest.raises(RuntimeError):
+        export_audio(audio, SAMPLE_RATE, [str(old), f"{tmp_path}/missing/x.wav"])
+    assert old.read_bytes() == before
+    assert sorted(os.listdir(tmp_path)) == ["keep.wav"]
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from core.dsp import granular
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.dsp.granular import grain_reverse_ola
+from core.hybrid.pipeline import process_audio
+from core.timing.grid import TimingGrid
+
+SAMPLE_RATE = 8000
+
+
+def naive_ola(audio, grain, hop):
+    """The loop version: one windowed, reversed grain per hop start."""
+    n = len(audio)
+    a = audio.reshape(n, -1).astype(np.float64)
+    w = np.hanning(grain)
+    padded = np.zeros((n + grain, a.shape[1]))
+    padded[:n] = a
+    acc = np.zeros_like(padded)
+    norm = np.zeros(len(padded))
+    for start in range(0, n, hop):
+        acc[start:start + grain] += padded[start:start + grain][::-1] * w[:, None]
+        norm[start:start + grain] += w
+    norm[norm == 0] = 1.0
+    return (acc[:n] / norm[:n, None]).reshape(audio.shape)
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((5003, 2)).astype(np.float32)
+
+
+@pytest.mark.parametrize("grain, hop", [(1, 1), (64, 32), (100, 30), (257, 257), (300, 1), (7000, 1000), (480, 600)])
+def test_matches_per_grain_overlap_add(audio, grain, hop):
+    expected = naive_ola(audio, grain, hop)
+    np.testing.assert_allclose(grain_reverse_ola(audio, grain, hop), expected, rtol=1e-4, atol=1e-5)
+    mono = np.ascontiguousarray(audio[:, 0])
+    np.testing.assert_allclose(grain_reverse_ola(mono, grain, hop), expected[:, 0], rtol=1e-4, atol=1e-5)
+
+
+def test_batches_and_in_place_are_bit_identical(audio, monkeypatch):
+    whole = grain_reverse_ola(audio, 200, 50)
+    # One or a few grains per batch
+    for block in (1, 600, 5000):
+        monkeypatch.setattr(granular, "GRAIN_BLOCK", block)
+        np.testing.assert_array_equal(grain_reverse_ola(audio, 200, 50), whole)
+
+        buf = audio.copy()
+        assert grain_reverse_ola(buf, 200, 50, out=buf) is buf
+        np.testing.assert_array_equal(buf, whole)
+
+
+def test_mode_uses_grid_grain(audio):
+    grain = TimingGrid(SAMPLE_RATE, 100.0, 4).subdivision_samples(0.25)
+    hop = int(grain * (1.0 - 0.75))
+    out = process_audio(audio, SAMPLE_RATE, "GRAIN_REVERSE", tempo=100.0, grain_fraction=0.25, overlap=0.75)
+    np.testing.assert_array_equal(out, grain_reverse_ola(audio, grain, hop))
+    np.testing.assert_allclose(out, naive_ola(audio, grain, hop), rtol=1e-4, atol=1e-5)
+
+
+def test_progress_cancel_and_empty(audio, monkeypatch):
+    monkeypatch.setattr(granular, "GRAIN_BLOCK", 1000)
+    seen = []
+    grain_reverse_ola(audio, 100, 50, progress=seen.append)
+    assert len(seen) > 1 and seen == sorted(seen) and seen[-1] == 1.0
+
+    token = CancelToken()
+    with pytest.raises(RenderCancelled):
+        grain_reverse_ola(audio, 100, 50, progress=lambda f: token.cancel(), cancel=token)
+
+    assert grain_reverse_ola(np.zeros((0, 2), np.float32), 100, 50).shape == (0, 2)
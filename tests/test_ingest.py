@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+import dre_watch
+from core.hybrid.ingest import IngestDaemon, IngestJournal
+from core.hybrid.pipeline import process_audio
+
+SAMPLE_RATE = 8000
+PARAMS = {"tempo": 100.0}
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def journal_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    inbox, outbox = tmp_path / "in", tmp_path / "out"
+    inbox.mkdir()
+    return inbox, outbox
+
+
+@pytest.fixture
+def clips():
+    rng = np.random.default_rng(0)
+    return {
+        "a.wav": rng.standard_normal((SAMPLE_RATE * 2, 2)).astype(np.float32) * 0.1,
+        "b.flac": rng.standard_normal(SAMPLE_RATE * 3).astype(np.float32) * 0.1,
+        "c.wav": rng.standard_normal((SAMPLE_RATE, 2)).astype(np.float32) * 0.1,
+    }
+
+
+def drop(inbox, name, audio):
+    """Write under a partial name and rename, like an uploader."""
+    part = inbox / f"{name}.part"
+    sf.write(part, audio, SAMPLE_RATE, format="FLAC" if name.endswith(".flac") else "WAV", subtype="PCM_24")
+    os.replace(part, inbox / name)
+    return sf.read(inbox / name, dtype="float32")[0]
+
+
+class Running:
+    """An IngestDaemon polling on a thread."""
+
+    def __init__(self, inbox, outbox, **kwargs):
+        kwargs.setdefault("mode", "HQ_REVERSE")
+        kwargs.setdefault("params", PARAMS)
+        self.logged = []
+        self.daemon = IngestDaemon(str(inbox), str(outbox), poll_interval=0.01, settle=0.0,
+                                   log=self.logged.append, **kwargs)
+        self.thread = threading.Thread(target=self.daemon.run_forever)
+        self.thread.start()
+
+    def stop(self, drain=True):
+        self.daemon.stop(drain=drain)
+        self.thread.join(20)
+        assert not self.thread.is_alive()
+        return self.daemon.stats()
+
+
+def test_daemon_renders_dropped_files(dirs, clips):
+    inbox, outbox = dirs
+    (inbox / ".hidden.wav").write_bytes(b"x")
+    (inbox / "notes.txt").write_text("not audio")
+
+    run = Running(inbox, outbox, dsp_workers=2)
+    decoded = {name: drop(inbox, name, audio) for name, audio in clips.items()}
+    wait_for(lambda: run.daemon.stats()["done"] == len(clips))
+    stats = run.stop()
+    assert (stats["claimed"], stats["errors"], stats["failed"], stats["in_flight"]) == (3, 0, 0, 0)
+
+    for name, audio in decoded.items():
+        stem = os.path.splitext(name)[0]
+        out, sr = sf.read(outbox / f"{stem}_HQ_REVERSE.wav", dtype="float32")
+        assert sr == SAMPLE_RATE
+        np.testing.assert_allclose(out, process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", **PARAMS), atol=2 ** -15)
+    assert sorted(os.listdir(outbox)) == [".dre_ingest.jsonl", "a_HQ_REVERSE.wav", "b_HQ_REVERSE.wav", "c_HQ_REVERSE.wav"]
+
+    # "done" is written once every stage, encode included, has been timed
+    done = [e for e in journal_events(outbox / ".dre_ingest.jsonl") if e["event"] == "done"]
+    assert len(done) == 3
+    for event in done:
+        assert set(event["seconds"]) == {"decode", "dsp", "encode"}
+    assert all("encode" in line for line in run.logged)
+
+
+def test_restart_skips_done_and_retries_interrupted(dirs, clips):
+    inbox, outbox = dirs
+    drop(inbox, "a.wav", clips["a.wav"])
+    run = Running(inbox, outbox)
+    wait_for(lambda: run.daemon.stats()["done"] == 1)
+    run.stop()
+
+    # A crash after claiming b: the journal holds "claimed" and a torn line
+    b = drop(inbox, "b.flac", clips["b.flac"])
+    st = os.stat(inbox / "b.flac")
+    key = f"b.flac:{st.st_size}:{st.st_mtime_ns}"
+    journal = IngestJournal(str(outbox / ".dre_ingest.jsonl"))
+    journal.record("claimed", key)
+    journal.close()
+    with open(outbox / ".dre_ingest.jsonl", "a") as f:
+        f.write('{"event": "do')
+
+    run = Running(inbox, outbox)
+    wait_for(lambda: run.daemon.stats()["done"] == 1)
+    stats = run.stop()
+    assert stats["claimed"] == 1
+    out, _ = sf.read(outbox / "b_HQ_REVERSE.wav", dtype="float32")
+    np.testing.assert_allclose(out, process_audio(b, SAMPLE_RATE, "HQ_REVERSE", **PARAMS), atol=2 ** -15)
+
+    journal = IngestJournal(str(outbox / ".dre_ingest.jsonl"))
+    assert not journal.pending(key) and journal.attempts(key) == 2
+    journal.close()
+
+
+def test_failures_retry_then_give_up(dirs, clips, monkeypatch):
+    inbox, outbox = dirs
+    attempts = []
+
+    def broken(self, item):
+        attempts.append(item.path)
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(IngestDaemon, "_dsp", broken)
+    drop(inbox, "c.wav", clips["c.wav"])
+    run = Running(inbox, outbox, max_attempts=3)
+    wait_for(lambda: run.daemon.stats()["failed"] == 1)
+    time.sleep(0.1)     # more scans, no more attempts
+    stats = run.stop()
+
+    assert len(attempts) == 3 and (stats["errors"], stats["failed"], stats["done"]) == (2, 1, 0)
+    events = [e["event"] for e in journal_events(outbox / ".dre_ingest.jsonl")]
+    assert events == ["claimed", "error", "claimed", "error", "claimed", "failed"]
+    assert not (outbox / "c_HQ_REVERSE.wav").exists()
+
+
+def test_bad_setup_fails_up_front(dirs):
+    inbox, outbox = dirs
+    with pytest.raises(ValueError):
+        IngestDaemon(str(inbox), str(outbox), params={"tempo": -1})
+    with pytest.raises(ValueError):
+        IngestDaemon(str(inbox), str(inbox))
+
+
+def test_watch_cli_params_follow_the_mode_spec():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode")
+    dre_watch.add_mode_arguments(parser)
+
+    args = parser.parse_args(["--mode", "QBEAT_REVERSE", "--subdivision", "0.5", "--overlap", "0.25"])
+    assert dre_watch.mode_params(args) == {"subdivision": 0.5}
+
+    args = parser.parse_args(["--mode", "STUDIO_REVERSE", "--bars-per-slice", "2", "--tempo", "90"])
+    assert dre_watch.mode_params(args) == {"tempo": 90.0, "bars_per_slice": 2}
+
+    args = parser.parse_args(["--mode", "TRUE_REVERSE", "--tempo", "90", "--crossfade", "64"])
+    assert dre_watch.mode_params(args) == {}
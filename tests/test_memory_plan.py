@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.hybrid.memory_plan import (
+    MemoryBudgetExceeded, legal_strategies, parse_size, plan_memory, predict_peak,
+)
+from core.hybrid.modes import get_mode
+from core.hybrid.pipeline import process_audio, process_file
+
+SAMPLE_RATE = 8000
+FRAMES = SAMPLE_RATE * 40           # well above the streaming block sizes
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((FRAMES, 2)).astype(np.float32) * 0.1
+
+
+def peaks(mode, source="array", allow_in_place=True, channels=2, **params):
+    """Each legal strategy with its predicted peak, fastest first."""
+    params = get_mode(mode).validate(**params)
+    return [
+        (s, predict_peak(s, FRAMES, channels, SAMPLE_RATE, mode, **params).predicted_bytes)
+        for s in legal_strategies(mode, source=source, allow_in_place=allow_in_place, **params)
+    ]
+
+
+@pytest.mark.parametrize("mode, params", [
+    ("HQ_REVERSE", {}),
+    ("TATUM_REVERSE", {"tempo": 90.0, "crossfade": 64}),
+    ("GRAIN_REVERSE", {}),
+])
+def test_shrinking_budget_picks_smaller_strategies(audio, mode, params):
+    expected = process_audio(audio, SAMPLE_RATE, mode, **params)
+    chosen = []
+    for strategy, peak in peaks(mode, **params):
+        plan = plan_memory(FRAMES, 2, SAMPLE_RATE, mode, budget=peak, allow_in_place=True,
+                           **get_mode(mode).validate(**params))
+        # The fastest strategy that fits is never a slower one with a bigger peak
+        assert plan.strategy == strategy and plan.predicted_bytes == peak
+        chosen.append(strategy)
+
+        report = {}
+        buf = audio.copy()
+        out = process_audio(buf, SAMPLE_RATE, mode, memory_budget=peak, allow_in_place=True,
+                            memory_report=report, **params)
+        assert report["strategy"] == strategy and report["budget"] == peak
+        np.testing.assert_array_equal(np.asarray(out), expected)
+
+    assert chosen[0] == "gather" and chosen[-1] == "memmap"
+    # Declick reads the untouched source, so it never renders in place
+    assert ("in_place" in chosen) == ("crossfade" not in params)
+
+    smallest = min(p for _, p in peaks(mode, **params))
+    with pytest.raises(MemoryBudgetExceeded):
+        process_audio(audio, SAMPLE_RATE, mode, memory_budget=smallest - 1, **params)
+
+
+def test_without_permission_input_is_never_overwritten(audio):
+    buf = audio.copy()
+    budget = dict(peaks("HQ_REVERSE"))["in_place"]
+    report = {}
+    process_audio(buf, SAMPLE_RATE, "HQ_REVERSE", memory_budget=budget, memory_report=report)
+    assert report["strategy"] == "memmap"
+    np.testing.assert_array_equal(buf, audio)
+
+
+@pytest.mark.parametrize("mode, params", [
+    ("HQ_REVERSE", {"tempo": 100.0}),
+    ("STUDIO_REVERSE", {}),
+    ("QBEAT_REVERSE", {"crossfade": 32}),
+    ("GRAIN_REVERSE", {"overlap": 0.75}),
+])
+def test_process_file_strategies_are_bit_exact(audio, tmp_path, mode, params):
+    src = tmp_path / "in.wav"
+    sf.write(src, audio, SAMPLE_RATE, subtype="FLOAT")
+    expected = process_audio(audio, SAMPLE_RATE, mode, **params)
+
+    strategies = peaks(mode, source="file", **params)
+    budgets = [peak for _, peak in strategies]
+    assert budgets == sorted(budgets, reverse=True)
+    if get_mode(mode).permutation and "crossfade" not in params:
+        assert [s for s, _ in strategies] == ["gather", "in_place", "chunked", "memmap"]
+
+    for strategy, peak in strategies:
+        dst = tmp_path / f"{strategy}.wav"
+        plan = process_file(str(src), f"{dst}:float", mode, memory_budget=peak, **params)
+        assert plan.strategy == strategy
+        out, sr = sf.read(dst, dtype="float32")
+        assert sr == SAMPLE_RATE
+        np.testing.assert_array_equal(out, expected)
+
+    with pytest.raises(MemoryBudgetExceeded):
+        process_file(str(src), str(tmp_path / "none.wav"), mode, memory_budget=budgets[-1] - 1, **params)
+    assert not (tmp_path / "none.wav").exists()
+
+
+def test_probe_measures_and_sizes_parse(audio):
+    report = {}
+    process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", memory_probe="tracemalloc", memory_report=report)
+    assert report["strategy"] == "gather"
+    # The output buffer is the bulk of the gather strategy's allocations
+    assert report["actual_bytes"] - report["input_bytes"] >= audio.nbytes
+
+    assert parse_size("512M") == 512 << 20
+    assert parse_size("1.5GB") == int(1.5 * (1 << 30))
+    assert parse_size("2GiB") == 2 << 30
+    assert parse_size(1000) == parse_size("1000") == 1000
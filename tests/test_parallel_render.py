@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from core.dsp import slice_plan
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.dsp.slice_plan import SlicePlan, get_render_threads, set_render_threads
+from core.hybrid.modes import all_modes
+from core.hybrid.pipeline import process_audio
+from tests.test_slice_plan import naive_index, random_plan
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((SAMPLE_RATE * 6, 2)).astype(np.float32)
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Enough blocks that every thread count really splits the output
+    monkeypatch.setattr(slice_plan, "RENDER_BLOCK", 256)
+
+
+def test_threaded_read_is_bit_identical(audio, small_blocks):
+    rng = np.random.default_rng(1)
+    total = len(audio)
+    for plan in (SlicePlan.flip(total), random_plan(total, rng, pieces=50)):
+        full = audio[naive_index(plan)]
+        for threads in (1, 2, 3, 7, 64):
+            np.testing.assert_array_equal(plan.render(audio, threads=threads), full)
+            np.testing.assert_array_equal(plan.read(audio, 1001, 40001, threads=threads), full[1001:40001])
+
+            seen = []
+            plan.render(audio, progress=seen.append, threads=threads)
+            assert seen == sorted(seen) and seen[-1] == pytest.approx(1.0)
+
+
+def test_modes_match_serial_render(audio, small_blocks):
+    for spec in all_modes():
+        if not spec.parallel:
+            continue
+        serial = process_audio(audio, SAMPLE_RATE, spec.name, threads=1)
+        np.testing.assert_array_equal(process_audio(audio, SAMPLE_RATE, spec.name, threads=4), serial)
+
+
+def test_default_threads_only_for_large_outputs(audio, small_blocks, monkeypatch):
+    calls = []
+    parallel = SlicePlan._read_parallel
+    monkeypatch.setattr(SlicePlan, "_read_parallel", lambda self, *a: calls.append(a[-1]) or parallel(self, *a))
+    previous = get_render_threads()
+    set_render_threads(3)
+    try:
+        plan = SlicePlan.flip(len(audio))
+        plan.render(audio)
+        assert calls == []
+        monkeypatch.setattr(slice_plan, "PARALLEL_MIN_BYTES", audio.nbytes)
+        np.testing.assert_array_equal(plan.render(audio), audio[::-1])
+        assert calls == [3]
+    finally:
+        set_render_threads(previous)
+
+
+def test_cancel_stops_every_chunk(audio, small_blocks):
+    plan = random_plan(len(audio), np.random.default_rng(2), pieces=30)
+    token = CancelToken()
+
+    def cancel_early(fraction):
+        if fraction > 0.2:
+            token.cancel()
+
+    with pytest.raises(RenderCancelled):
+        plan.render(audio, progress=cancel_early, cancel=token, threads=4)
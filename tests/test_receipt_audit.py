@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.economic.receipt import ReceiptGenerator
+from core.economic.receipt_audit import AuditCheckpoint, audit, iter_jobs, verify_receipt
+from core.hybrid.pipeline import process_audio_hybrid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 8000
+
+METADATA = {
+    "contribution_type": "test",
+    "complexity_factor": 1.0,
+    "transient_density": 0.2,
+    "quality_proxy_score": 1.0,
+}
+
+
+def render(tmp_path, name, seed):
+    """Render a clip, store input / output as FLOAT WAVs and return its manifest entry."""
+    audio = np.random.default_rng(seed).standard_normal((SAMPLE_RATE, 2)).astype(np.float32) * 0.1
+    out, _, receipt = process_audio_hybrid(audio, SAMPLE_RATE, "HQ_REVERSE", "free", METADATA)
+    sf.write(tmp_path / f"{name}_in.wav", audio, SAMPLE_RATE, subtype="FLOAT")
+    sf.write(tmp_path / f"{name}_out.wav", np.asarray(out), SAMPLE_RATE, subtype="FLOAT")
+    return {"receipt": receipt, "input": f"{name}_in.wav", "output": f"{name}_out.wav"}
+
+
+def write_manifest(path, entries):
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """Six receipts: four intact, one edited after signing, one with its output missing."""
+    entries = [render(tmp_path, f"clip{i}", i) for i in range(6)]
+    entries[2]["receipt"]["datacostunits"] += 1.0
+    entries[4]["output"] = "gone.wav"
+    return write_manifest(tmp_path / "manifest.jsonl", entries)
+
+
+def test_verify_catches_tampering_in_both_formats(tmp_path):
+    entry = render(tmp_path, "a", 0)
+    receipt, src, dst = entry["receipt"], tmp_path / "a_in.wav", tmp_path / "a_out.wav"
+    assert verify_receipt(receipt, src, dst)["status"] == "ok"
+
+    edited = dict(receipt, tier="pro")
+    result = verify_receipt(edited, src, dst)
+    assert result["status"] == "mismatch" and result["signature"] is False
+    assert result["input_hash"] and result["output_hash"]
+
+    # A PCM copy of the render no longer stores it exactly
+    pcm = tmp_path / "a_pcm.wav"
+    sf.write(pcm, sf.read(dst, dtype="float32")[0], SAMPLE_RATE, subtype="PCM_16")
+    result = verify_receipt(receipt, src, pcm)
+    assert result["status"] == "mismatch" and result["output_hash"] is False
+    assert result["output_hash_subtype"] == "PCM_16" and result["signature"] is True
+
+    # ReceiptGenerator receipts hash the samples as JSON
+    audio = sf.read(src, dtype="float32")[0]
+    out = sf.read(dst, dtype="float32")[0]
+    legacy = ReceiptGenerator(os.path.join(ROOT, "config/economic/attribution_schema.json")).generate(
+        audio, out, METADATA, 1.0, {"allowed": True},
+    )
+    result = verify_receipt(legacy, src, dst, block_size=1000)
+    assert result["format"] == "legacy" and result["status"] == "ok"
+    assert verify_receipt(legacy, dst, src)["input_hash"] is False
+    assert verify_receipt(dict(legacy, datacostunits=2.0))["signature"] is False
+
+
+def test_audit_reports_each_receipt(manifest):
+    results = []
+    counts = audit(iter_jobs([manifest]), workers=2, on_result=results.append)
+    assert counts == {"ok": 4, "mismatch": 1, "error": 1, "skipped": 0}
+
+    by_output = {os.path.basename(r["output"]): r for r in results}
+    assert by_output["clip2_out.wav"]["status"] == "mismatch"
+    assert by_output["clip2_out.wav"]["signature"] is False
+    assert by_output["gone.wav"]["status"] == "error"
+
+
+def test_interrupted_audit_resumes_from_checkpoint(manifest, tmp_path):
+    ckpt = str(tmp_path / "audit.jsonl")
+
+    def interrupted():
+        for n, job in enumerate(iter_jobs([manifest])):
+            if n == 5:
+                raise KeyboardInterrupt
+            yield job
+
+    # One worker holds four jobs in flight, so the fifth waits for a result
+    with pytest.raises(KeyboardInterrupt):
+        audit(interrupted(), workers=1, checkpoint=ckpt)
+    # A crash mid-write leaves a torn last line
+    with open(ckpt, "a") as f:
+        f.write('{"key": "tor')
+    first = AuditCheckpoint(ckpt)
+    recorded = sum(first.counts().values())
+    first.close()
+    assert 0 < recorded < 6
+
+    counts = audit(iter_jobs([manifest]), workers=2, checkpoint=ckpt)
+    assert counts["skipped"] == recorded
+    assert counts["ok"] + counts["mismatch"] + counts["error"] == 6 - recorded
+    assert counts["checkpoint"] == {"ok": 4, "mismatch": 1, "error": 1}
+
+    # Everything is recorded now; only the error is redone on request
+    counts = audit(iter_jobs([manifest]), workers=2, checkpoint=ckpt)
+    assert counts["skipped"] == 6 and counts["checkpoint"] == {"ok": 4, "mismatch": 1, "error": 1}
+    counts = audit(iter_jobs([manifest]), workers=2, checkpoint=ckpt, retry_errors=True)
+    assert (counts["skipped"], counts["error"]) == (5, 1)
+
+
+def test_verify_cli_exit_status(manifest, tmp_path):
+    def run(receipts, ckpt):
+        return subprocess.run(
+            [sys.executable, "dre_verify.py", receipts, "--workers", "2", "--checkpoint", str(ckpt)],
+            capture_output=True, text=True, cwd=ROOT, timeout=120,
+        )
+
+    proc = run(manifest, tmp_path / "cli.jsonl")
+    assert proc.returncode == 1
+    assert "clip2_out.wav: signature mismatch" in proc.stdout
+    assert "gone.wav" in proc.stdout and "4 ok, 1 mismatched, 1 errors" in proc.stderr
+
+    # A rerun verifies nothing new but still fails on the recorded mismatch
+    proc = run(manifest, tmp_path / "cli.jsonl")
+    assert proc.returncode == 1 and "6 already checkpointed" in proc.stderr
+
+    clean = write_manifest(tmp_path / "clean.jsonl", [render(tmp_path, "ok", 9)])
+    assert run(clean, tmp_path / "clean_ckpt.jsonl").returncode == 0
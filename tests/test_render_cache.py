@@ -0,0 +1,39 @@
+import pytest
+
+from core.hybrid.render_cache import RenderCache, render_params
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "renders"), engine_version="test")
+
+
+def test_key_ignores_parameters_the_mode_does_not_declare(cache):
+    a = cache.audio_key("abc", "TRUE_REVERSE", tempo=90.0, beats_per_bar=3)
+    b = cache.audio_key("abc", "TRUE_REVERSE", tempo=140.0, tatum_fraction=0.5)
+    assert a == b == cache.audio_key("abc", "TRUE_REVERSE")
+
+
+def test_key_ignores_defaults_and_zero_crossfade(cache):
+    base = cache.audio_key("abc", "QBEAT_REVERSE")
+    assert cache.audio_key("abc", "QBEAT_REVERSE", crossfade=0) == base
+    assert cache.audio_key("abc", "QBEAT_REVERSE", crossfade=None) == base
+    assert cache.audio_key("abc", "QBEAT_REVERSE", tempo=120, subdivision=0.25, beats_per_bar=4.0) == base
+
+
+def test_key_separates_renders_that_differ(cache):
+    base = cache.audio_key("abc", "HQ_REVERSE")
+    assert cache.audio_key("abc", "HQ_REVERSE", tempo=128.0) != base
+    assert cache.audio_key("abc", "HQ_REVERSE", crossfade=64) != base
+    assert cache.audio_key("abc", "STUDIO_REVERSE") != base
+    assert cache.audio_key("abd", "HQ_REVERSE") != base
+
+
+def test_render_params_drops_execution_kwargs_and_keeps_extras():
+    params = render_params("HQ_REVERSE", tempo=100, threads=8, memory_budget=1 << 30, declick_ms=5.0)
+    assert params == {"mode": "HQ_REVERSE", "tempo": 100.0, "declick_ms": 5.0}
+
+
+def test_render_params_rejects_bad_values():
+    with pytest.raises(ValueError):
+        render_params("HQ_REVERSE", tempo=-1)
@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+import pytest
+
+from core.dsp import slice_plan
+from core.dsp.cancel import CancelToken, RenderCancelled
+from core.hybrid.pipeline import process_audio
+from core.hybrid.scheduler import RenderScheduler
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((SAMPLE_RATE * 4, 2)).astype(np.float32)
+
+
+def blocking_render(started, release):
+    """A render that polls its token until released, like a slice loop."""
+    def fn(progress, cancel, value=None):
+        started.set()
+        while not release.wait(0.005):
+            cancel.raise_if_cancelled()
+        cancel.raise_if_cancelled()
+        progress(1.0)
+        return value
+    return fn
+
+
+def test_process_audio_reports_progress_and_cancels(audio, monkeypatch):
+    monkeypatch.setattr(slice_plan, "RENDER_BLOCK", 512)
+    seen = []
+    out = process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", progress=seen.append, cancel=CancelToken())
+    np.testing.assert_array_equal(out, process_audio(audio, SAMPLE_RATE, "HQ_REVERSE"))
+    assert len(seen) > 2 and seen == sorted(seen) and seen[-1] == pytest.approx(1.0)
+
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(RenderCancelled):
+        process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", cancel=token)
+
+
+def test_new_job_supersedes_running_one():
+    scheduler = RenderScheduler(max_workers=2)
+    started, release = threading.Event(), threading.Event()
+    done = []
+
+    first = scheduler.submit("gui", blocking_render(started, release), on_done=lambda j, r, e: done.append(r), value=1)
+    assert started.wait(5)
+    second = scheduler.submit("gui", blocking_render(threading.Event(), release), on_done=lambda j, r, e: done.append(r), value=2)
+    release.set()
+
+    assert second.future.result(5) == 2
+    assert first.future.result(5) is None
+    assert first.status == "cancelled" and second.status == "done"
+    assert done == [2]
+    assert scheduler.active() == {}
+    scheduler.shutdown()
+
+
+def test_superseded_queued_job_never_runs():
+    scheduler = RenderScheduler(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def record(progress, cancel, value):
+        ran.append(value)
+        return value
+
+    busy = scheduler.submit("other", blocking_render(started, release))
+    assert started.wait(5)
+    queued = scheduler.submit("gui", record, value="queued")
+    latest = scheduler.submit("gui", record, value="latest")
+    release.set()
+
+    assert latest.future.result(5) == "latest"
+    busy.future.result(5)
+    assert queued.status == "cancelled"
+    assert ran == ["latest"]
+    scheduler.shutdown()
+
+
+def test_progress_is_throttled_and_errors_reach_on_done():
+    scheduler = RenderScheduler(max_workers=1, progress_step=0.1)
+    reports, errors = [], []
+
+    def steps(progress, cancel):
+        for i in range(1, 101):
+            progress(i / 100)
+        raise RuntimeError("boom")
+
+    job = scheduler.submit(
+        "gui", steps,
+        on_progress=lambda j, f: reports.append(f),
+        on_done=lambda j, r, e: errors.append(e),
+    )
+    with pytest.raises(RuntimeError):
+        job.future.result(5)
+    assert len(reports) == 10 and reports[-1] == pytest.approx(1.0)
+    assert job.status == "failed"
+    assert isinstance(errors[0], RuntimeError)
+    scheduler.shutdown()
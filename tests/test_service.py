@@ -0,0 +1,159 @@
+import asyncio
+import io
+import json
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.hybrid.pipeline import process_audio
+from core.hybrid.service import RenderService
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((SAMPLE_RATE * 2, 2)).astype(np.float32)
+
+
+def wav_bytes(audio, sr=SAMPLE_RATE):
+    buf = io.BytesIO()
+    sf.write(buf, audio, sr, format="WAV", subtype="FLOAT")
+    return buf.getvalue()
+
+
+@asynccontextmanager
+async def serve(tmp_path, **kwargs):
+    service = RenderService(workers=1, **kwargs)
+    sock = str(tmp_path / "dre.sock")
+    await service.start(unix_socket=sock)
+    try:
+        yield service, sock
+    finally:
+        await service.close()
+
+
+async def request(sock, method, target, body=b"", content_type="application/octet-stream"):
+    reader, writer = await asyncio.open_unix_connection(sock)
+    head = f"{method} {target} HTTP/1.1\r\nHost: dre\r\nContent-Length: {len(body)}\r\n"
+    if body:
+        head += f"Content-Type: {content_type}\r\n"
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    status = int(lines[0].split(" ")[1])
+    if headers.get("Content-Type") == "application/json":
+        payload = json.loads(payload)
+    return status, headers, payload
+
+
+async def render(sock, query, body):
+    status, _, job = await request(sock, "POST", f"/render?{query}", body)
+    assert status == 200, job
+    status, headers, data = await request(sock, "GET", job["audio"])
+    assert status == 200 and headers["X-DRE-Receipt-Signature"] == job["receipt"]["signature"]
+    out, sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=False)
+    assert sr == SAMPLE_RATE
+    return job, out
+
+
+def test_pickled_path_returns_process_audio_output(tmp_path, audio):
+    async def scenario():
+        async with serve(tmp_path, shared_memory=False) as (service, sock):
+            for query, params in (
+                ("mode=TRUE_REVERSE", {}),
+                ("mode=HQ_REVERSE&tempo=100&beats_per_bar=3", {"tempo": 100.0, "beats_per_bar": 3}),
+            ):
+                mode = query.split("&")[0].split("=")[1]
+                job, out = await render(sock, query, wav_bytes(audio))
+                np.testing.assert_array_equal(out, process_audio(audio, SAMPLE_RATE, mode, **params))
+                assert job["meta"]["output_shape"] == list(audio.shape)
+            assert service.stats()["completed"] == 2
+            assert service.stats()["slabs"] is None
+
+    asyncio.run(scenario())
+
+
+def test_bad_params_are_rejected_before_rendering(tmp_path, audio):
+    async def scenario():
+        async with serve(tmp_path, shared_memory=False) as (service, sock):
+            body = wav_bytes(audio[:1000])
+            for query, words in (
+                ("mode=HQ_REVERSE&tempo=abc", "tempo must be float"),
+                ("mode=HQ_REVERSE&tempo=-5", "tempo must be >"),
+                ("mode=HQ_REVERSE&temp=120", "Unknown parameter"),
+                ("mode=TRUE_REVERSE&tempo=abc", "TRUE_REVERSE does not take tempo"),
+                ("mode=HQ_REVERSE&overlap=0.5", "HQ_REVERSE does not take overlap"),
+                ("mode=NO_SUCH_MODE", "NO_SUCH_MODE"),
+                ("tier=pro", "mode is required"),
+            ):
+                status, _, payload = await request(sock, "POST", f"/jobs?{query}", body)
+                assert status == 400 and words in payload["error"], (query, payload)
+
+            status, _, payload = await request(sock, "POST", "/jobs?mode=HQ_REVERSE")
+            assert status == 400 and "empty request body" in payload["error"]
+            assert service.stats()["submitted"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_json_submission_writes_output(tmp_path, audio):
+    audio = audio * 0.1     # inside [-1, 1] for 16-bit PCM
+    src, dst = tmp_path / "in.wav", tmp_path / "out.wav"
+    sf.write(src, audio, SAMPLE_RATE, subtype="FLOAT")
+
+    async def scenario():
+        async with serve(tmp_path, shared_memory=False) as (service, sock):
+            body = json.dumps({"input": str(src), "output": str(dst), "mode": "HQ_REVERSE"}).encode()
+            status, _, job = await request(sock, "POST", "/render", body, "application/json")
+            assert status == 200 and job["audio"] is None and job["output"] == str(dst)
+
+            body = json.dumps({"input": str(tmp_path / "missing.wav"), "mode": "HQ_REVERSE"}).encode()
+            status, _, payload = await request(sock, "POST", "/jobs", body, "application/json")
+            assert status == 400 and "No such file" in payload["error"]
+
+    asyncio.run(scenario())
+    out, _ = sf.read(dst, dtype="float32")
+    np.testing.assert_allclose(out, process_audio(audio, SAMPLE_RATE, "HQ_REVERSE"), atol=2 ** -15)
+
+
+def test_slab_path_returns_process_audio_output(tmp_path, audio):
+    mono = np.ascontiguousarray(audio[:, 0])
+
+    async def scenario():
+        async with serve(tmp_path) as (service, sock):
+            for source, query, params in (
+                (audio, "mode=TRUE_REVERSE", {}),
+                (audio, "mode=TATUM_REVERSE&tempo=90&tatum_fraction=0.5", {"tempo": 90.0, "tatum_fraction": 0.5}),
+                (mono, "mode=HQ_REVERSE&crossfade=16", {"crossfade": 16}),
+            ):
+                mode = query.split("&")[0].split("=")[1]
+                job, out = await render(sock, query, wav_bytes(source))
+                np.testing.assert_array_equal(out, process_audio(source, SAMPLE_RATE, mode, **params))
+
+            # Only the finished jobs' output slabs stay leased
+            assert service.stats()["slabs"]["leases"] == 3
+
+    # close() raises SlabLeakError if any input slab was never released
+    asyncio.run(scenario())
+
+
+def test_cache_hit_streams_cached_render(tmp_path, audio):
+    async def scenario():
+        async with serve(tmp_path, cache_dir=str(tmp_path / "cache")) as (service, sock):
+            # The same upload twice (float WAVs carry a timestamped PEAK chunk)
+            body, query = wav_bytes(audio), "mode=HQ_REVERSE&tempo=100"
+            first, a = await render(sock, query, body)
+            second, b = await render(sock, query, body)
+            assert (first["meta"]["cache"], second["meta"].get("cache")) == ("miss", "hit")
+            np.testing.assert_array_equal(a, process_audio(audio, SAMPLE_RATE, "HQ_REVERSE", tempo=100.0))
+            np.testing.assert_array_equal(b, a)
+            assert second["receipt"]["output_hash"] == first["receipt"]["output_hash"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from core.dsp import slice_plan
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.virtual_buffer import VirtualBuffer
+
+
+def random_plan(total, rng, pieces=12):
+    """A permutation of random pieces, shuffled, some read backwards."""
+    cuts = np.sort(rng.choice(np.arange(1, total), size=pieces - 1, replace=False))
+    bounds = np.concatenate([[0], cuts, [total]])
+    order = rng.permutation(pieces)
+    src, length, step = [], [], []
+    for i in order:
+        lo, hi = int(bounds[i]), int(bounds[i + 1])
+        backward = rng.random() < 0.5
+        src.append(hi - 1 if backward else lo)
+        length.append(hi - lo)
+        step.append(-1 if backward else 1)
+    return SlicePlan.from_segments(total, src, length, step)
+
+
+def naive_index(plan):
+    """Output frame -> source frame, straight from the segment lists."""
+    return np.concatenate([
+        s + np.arange(n) * k for s, n, k in zip(plan.src, plan.length, plan.step)
+    ])
+
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((5000, 2)).astype(np.float32)
+
+
+@pytest.fixture
+def plans(audio):
+    rng = np.random.default_rng(1)
+    total = len(audio)
+    grid = np.concatenate([[0], np.sort(rng.choice(np.arange(1, total), 9, replace=False)), [total]])
+    return [
+        SlicePlan.identity(total),
+        SlicePlan.flip(total),
+        SlicePlan.from_grid(grid, total),
+        random_plan(total, rng),
+        random_plan(total, rng, pieces=40),
+    ]
+
+
+def test_render_matches_numpy_indexing(audio, plans):
+    for plan in plans:
+        idx = naive_index(plan)
+        assert sorted(idx.tolist()) == list(range(len(audio)))
+        np.testing.assert_array_equal(plan.source_index(), idx)
+        np.testing.assert_array_equal(plan.render(audio), audio[idx])
+
+
+def test_render_mono_and_into_out(audio, plans):
+    mono = np.ascontiguousarray(audio[:, 0])
+    for plan in plans:
+        out = np.empty_like(mono)
+        assert plan.render(mono, out=out) is out
+        np.testing.assert_array_equal(out, mono[naive_index(plan)])
+
+
+def test_read_across_block_edges(audio, plans, monkeypatch):
+    # Small blocks so reads straddle block and segment edges everywhere
+    monkeypatch.setattr(slice_plan, "RENDER_BLOCK", 97)
+    rng = np.random.default_rng(2)
+    for plan in plans:
+        full = audio[naive_index(plan)]
+        for _ in range(20):
+            start, stop = sorted(rng.integers(0, len(audio) + 1, 2))
+            np.testing.assert_array_equal(plan.read(audio, start, stop), full[start:stop])
+
+        seen = []
+        np.testing.assert_array_equal(plan.render(audio, progress=seen.append), full)
+        assert seen[-1] == pytest.approx(1.0)
+        assert seen == sorted(seen)
+
+        np.testing.assert_array_equal(plan.render(audio, threads=4), full)
+
+
+def test_map_position_matches_source_index(plans):
+    for plan in plans:
+        idx = naive_index(plan)
+        for frame in (0, 1, 777, len(idx) - 1):
+            assert plan.map_position(frame) == idx[frame]
+
+
+def test_render_in_place_matches_render(audio, monkeypatch):
+    monkeypatch.setattr(slice_plan, "RENDER_BLOCK", 64)
+    total = len(audio)
+    grid = np.array([0, 700, 701, 2300, 4096, total])
+    for plan in (SlicePlan.flip(total), SlicePlan.from_grid(grid, total)):
+        assert plan.in_place_capable
+        buf = audio.copy()
+        assert plan.render_in_place(buf) is buf
+        np.testing.assert_array_equal(buf, plan.render(audio))
+
+    assert not random_plan(total, np.random.default_rng(3)).in_place_capable
+
+
+def test_virtual_buffer_reads_through_plan(audio, plans):
+    plan = plans[-1]
+    full = audio[naive_index(plan)]
+    view = VirtualBuffer(audio, plan)
+
+    assert view.shape == audio.shape and len(view) == len(audio)
+    np.testing.assert_array_equal(view[1234:4321], full[1234:4321])
+    np.testing.assert_array_equal(view[10:20, 1], full[10:20, 1])
+    np.testing.assert_array_equal(view[-1], full[-1])
+    np.testing.assert_array_equal(np.asarray(view), full)
+    with pytest.raises(IndexError):
+        view[::2]
+    with pytest.raises(ValueError):
+        VirtualBuffer(audio[:-1], plan)
+
+
+def test_virtual_buffer_over_virtual_buffer(audio, plans):
+    """A plan can read through another view; the result is the composition."""
+    inner, outer = plans[3], plans[4]
+    view = VirtualBuffer(VirtualBuffer(audio, inner), outer)
+    np.testing.assert_array_equal(view[0:len(audio)], audio[naive_index(inner)][naive_index(outer)])
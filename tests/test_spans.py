@@ -0,0 +1,108 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from core import spans
+from core.hybrid.pipeline import process_audio_hybrid
+
+SAMPLE_RATE = 8000
+
+METADATA = {
+    "contribution_type": "test",
+    "complexity_factor": 1.0,
+    "transient_density": 0.2,
+    "quality_proxy_score": 1.0,
+}
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(spans, "_enabled", True)
+    monkeypatch.setattr(spans, "METRICS", spans.SpanMetrics())
+    return spans.METRICS
+
+
+def render():
+    audio = np.random.default_rng(0).standard_normal((SAMPLE_RATE, 2)).astype(np.float32)
+    return process_audio_hybrid(audio, SAMPLE_RATE, "HQ_REVERSE", "free", METADATA)
+
+
+def test_disabled_spans_record_nothing(monkeypatch):
+    monkeypatch.setattr(spans, "_enabled", False)
+    monkeypatch.setattr(spans, "METRICS", spans.SpanMetrics())
+    assert spans.span("dsp") is spans.span("hash")
+    with spans.collect() as recorded:
+        _, meta, _ = render()
+    assert recorded == [] and "spans" not in meta
+    assert spans.METRICS.snapshot() == {}
+
+
+def test_pipeline_reports_stage_times(metrics):
+    _, meta, _ = render()
+    stages = meta["spans"]
+    assert {"hash", "dsp", "grid", "cost", "sign"} <= set(stages)
+    assert all(s >= 0 for s in stages.values())
+    # grid runs inside dsp
+    assert stages["grid"] <= stages["dsp"] <= meta["dsp_time_s"] + 1e-3
+
+    snap = metrics.snapshot()
+    assert snap["dsp"]["count"] == 1 and snap["hash"]["count"] == 2
+    assert snap["dsp"]["sum_s"] == pytest.approx(stages["dsp"])
+
+
+def test_collect_nests_and_is_per_thread(metrics):
+    other = []
+
+    def worker():
+        with spans.collect() as mine:
+            spans.record("decode", 5)
+        other.extend(mine)
+
+    with spans.collect() as outer:
+        spans.record("decode", 1_000)
+        with spans.collect() as inner:
+            spans.record("encode", 2_000)
+            spans.record("encode", 3_000)
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+    assert inner == [("encode", 2_000), ("encode", 3_000)]
+    assert outer == [("decode", 1_000), ("encode", 2_000), ("encode", 3_000)]
+    assert other == [("decode", 5)]
+    assert spans.totals(outer) == pytest.approx({"decode": 1e-6, "encode": 5e-6})
+
+
+def test_histograms_and_exports(metrics, tmp_path):
+    for seconds in (0.0001, 0.0002, 0.003, 500.0):
+        metrics.observe("dsp", seconds)
+    metrics.observe_totals({"encode": 0.02})
+
+    dsp = metrics.snapshot()["dsp"]
+    assert dsp["count"] == 4 and dsp["sum_s"] == pytest.approx(500.0033)
+    # A bucket counts observations <= its bound, cumulatively
+    assert dsp["buckets"]["0.0001"] == 1
+    assert dsp["buckets"]["0.00025"] == 2
+    assert dsp["buckets"]["0.005"] == 3
+    assert dsp["buckets"]["300.0"] == 3 and dsp["buckets"]["+Inf"] == 4
+
+    text = metrics.prometheus_text()
+    assert "# TYPE dre_stage_seconds histogram" in text
+    assert 'dre_stage_seconds_bucket{stage="dsp",le="+Inf"} 4' in text
+    assert 'dre_stage_seconds_count{stage="encode"} 1' in text
+
+    prom = tmp_path / "dre.prom"
+    metrics.write_prometheus(str(prom))
+    assert prom.read_text() == text and list(tmp_path.iterdir()) == [prom]
+
+    log = tmp_path / "spans.jsonl"
+    metrics.append_jsonl(str(log))
+    metrics.append_jsonl(str(log))
+    rows = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r["stage"] for r in rows] == ["dsp", "encode", "dsp", "encode"]
+    assert rows[0]["buckets"] == dsp["buckets"]
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from core.dsp.streaming import StreamingReverser
+from core.io.audio_loader import iter_blocks
+
+SAMPLE_RATE = 8000
+TEMPO = 120.0       # one beat = 4000 frames at 8 kHz
+
+
+def reverser(channels=2):
+    return StreamingReverser(SAMPLE_RATE, channels=channels, tempo=TEMPO, unit="beat")
+
+
+def window_reversed(audio, window):
+    return np.concatenate([audio[i:i + window][::-1] for i in range(0, len(audio), window)])
+
+
+@pytest.fixture
+def wav(tmp_path):
+    """Two and a half beats of stereo noise on disk, plus the samples as decoded."""
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((10000, 2)) * 0.25).astype(np.float32)
+    path = str(tmp_path / "live.wav")
+    sf.write(path, audio, SAMPLE_RATE, subtype="FLOAT")
+    return path, sf.read(path, dtype="float32", always_2d=True)[0]
+
+
+@pytest.mark.parametrize("block_size", [1, 511, 4000 + 37, 4096])
+def test_file_blocks_reverse_per_window(wav, block_size):
+    path, audio = wav
+    rev = reverser()
+    assert rev.latency == rev.window == 4000
+
+    out = np.concatenate([rev.process(b) for b in iter_blocks(path, block_size=block_size)])
+    assert out.shape == audio.shape
+    assert not out[:rev.latency].any()
+
+    # After the latency, output is each input window reversed; flush()
+    # supplies the rest of the playing window and the final partial one
+    out = np.concatenate([out, rev.flush()])
+    expected = window_reversed(audio, rev.window)
+    np.testing.assert_array_equal(out[rev.latency:], expected)
+
+
+def test_flush_resets(wav):
+    path, audio = wav
+    rev = reverser()
+    first = np.concatenate([rev.process(b) for b in iter_blocks(path, block_size=511)] + [rev.flush()])
+    assert rev.position == 0
+
+    again = np.concatenate([rev.process(b) for b in iter_blocks(path, block_size=511)] + [rev.flush()])
+    np.testing.assert_array_equal(again, first)
+
+
+def test_flush_before_first_window():
+    rev = reverser(channels=1)
+    x = np.arange(100, dtype=np.float32)
+    assert not rev.process(x).any()
+    np.testing.assert_array_equal(rev.flush()[:, 0], x[::-1])
+
+
+def test_reset_discards_captured_input(wav):
+    path, audio = wav
+    rev = reverser()
+    rev.process(np.ones((6000, 2), dtype=np.float32))
+    rev.reset()
+    assert rev.position == 0
+
+    out = np.concatenate([rev.process(b) for b in iter_blocks(path, block_size=511)] + [rev.flush()])
+    np.testing.assert_array_equal(out[rev.latency:], window_reversed(audio, rev.window))
+
+
+def test_process_fills_callers_buffer(wav):
+    path, audio = wav
+    rev, ref = reverser(), reverser()
+    out = np.empty((511, 2), dtype=np.float32)
+    for block in iter_blocks(path, block_size=511):
+        if len(block) != len(out):
+            break
+        assert rev.process(block, out=out) is out
+        np.testing.assert_array_equal(out, ref.process(block))
+
+    mono = reverser(channels=1)
+    out = np.empty(300, dtype=np.float32)
+    assert mono.process(audio[:300, 0], out=out) is out
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from core.dsp.boundaries import boundary_discontinuity
+from core.dsp.slice_plan import SlicePlan
+from core.hybrid.pipeline import (
+    SWEEP_MODES, build_plan, process_audio, process_sweep, sweep_combinations, sweep_steps,
+)
+from core.timing.grid import TimingGrid, grid_steps
+
+SAMPLE_RATE = 8000
+
+
+@pytest.fixture
+def audio():
+    return np.random.default_rng(0).standard_normal((SAMPLE_RATE * 5, 2)).astype(np.float32)
+
+
+def naive_discontinuity(out, boundaries):
+    energies = []
+    for b in boundaries:
+        if 2 <= b <= len(out) - 2:
+            w = out[b - 2:b + 2].astype(np.float64)
+            d = np.diff(w, axis=0)
+            energies.append(np.sum((d[1] - 0.5 * (d[0] + d[2])) ** 2))
+    return float(np.mean(energies)) if energies else 0.0
+
+
+def test_grid_steps_match_timing_grid():
+    tempos = np.concatenate([np.arange(60.0, 200.0, 0.37), [127.5, 127.55, 128.0, 1e6]])
+    for bpb in (3, 4, 7):
+        for unit, fraction in (("beat", 1.0), ("bar", 1.0), ("subdivision", 0.25), ("subdivision", 0.001)):
+            steps = grid_steps(SAMPLE_RATE, tempos, bpb, unit=unit, fraction=fraction)
+            for tempo, step in zip(tempos, steps):
+                grid = TimingGrid(SAMPLE_RATE, float(tempo), bpb).build_grid(10 ** 6, unit, fraction)
+                assert step == grid[1], (tempo, bpb, unit, fraction)
+
+
+def test_combinations_order_and_validation():
+    combos = sweep_combinations({"tempo": [100.0, 110.0], "tatum_fraction": [0.25, 0.5, 1.0]}, beats_per_bar=3)
+    assert [(c["tempo"], c["tatum_fraction"]) for c in combos] == [
+        (100.0, 0.25), (100.0, 0.5), (100.0, 1.0), (110.0, 0.25), (110.0, 0.5), (110.0, 1.0),
+    ]
+    assert all(c["beats_per_bar"] == 3 for c in combos)
+    with pytest.raises(ValueError):
+        sweep_combinations({"overlap": [0.5]})
+    with pytest.raises(ValueError):
+        sweep_steps("GRAIN_REVERSE", SAMPLE_RATE, combos)
+
+
+@pytest.mark.parametrize("mode", SWEEP_MODES)
+def test_sweep_matches_process_audio(audio, mode):
+    sweep = {"tempo": [127.5, 127.55, 128.0, 64.0], "tatum_fraction": [0.25, 0.5]}
+    seen, renders = [], []
+    for params, rendered, value in process_sweep(
+        audio, SAMPLE_RATE, mode, sweep, score=True, crossfade=16, progress=seen.append
+    ):
+        # Modes ignore the swept settings they do not declare
+        expected = process_audio(audio, SAMPLE_RATE, mode, crossfade=16, **params)
+        np.testing.assert_array_equal(rendered, expected)
+
+        plan = build_plan(len(audio), SAMPLE_RATE, mode, **params)
+        assert value == pytest.approx(naive_discontinuity(expected, plan.boundaries))
+        renders.append(rendered)
+
+    assert len(renders) == 8
+    assert all(r is renders[0] for r in renders)       # one reused buffer
+    assert seen == sorted(seen) and seen[-1] == pytest.approx(1.0)
+
+
+def test_equal_steps_render_once(audio, monkeypatch):
+    calls = []
+    render = SlicePlan.render
+    monkeypatch.setattr(SlicePlan, "render", lambda self, *a, **k: calls.append(1) or render(self, *a, **k))
+    # Both tempos truncate to the same beat length at 8 kHz
+    combos = sweep_combinations({"tempo": [120.0, 119.9999, 60.0]})
+    assert len(set(sweep_steps("HQ_REVERSE", SAMPLE_RATE, combos).tolist())) == 2
+    list(process_sweep(audio, SAMPLE_RATE, "HQ_REVERSE", {"tempo": [120.0, 119.9999, 60.0]}))
+    assert len(calls) == 2
+
+
+def test_discontinuity_matches_naive_loop(audio):
+    out = process_audio(audio, SAMPLE_RATE, "HQ_REVERSE")
+    boundaries = [0, 1, 2, 999, 4000, len(out) - 2, len(out) - 1, len(out)]
+    assert boundary_discontinuity(out, boundaries) == pytest.approx(naive_discontinuity(out, boundaries))
+    assert boundary_discontinuity(out[:, 0], boundaries) == pytest.approx(
+        naive_discontinuity(out[:, :1], boundaries)
+    )
+    assert boundary_discontinuity(out, [0, len(out)]) == 0.0
+    # A straight line continues smoothly across any cut
+    assert boundary_discontinuity(np.arange(100.0), [10, 50]) == 0.0
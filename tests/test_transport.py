@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from core.dsp.slice_plan import SlicePlan
+from core.dsp.transport import ABTransport
+from tests.test_slice_plan import naive_index, random_plan
+
+SAMPLE_RATE = 8000
+TOTAL = 4000
+BLOCK = 256
+
+
+@pytest.fixture
+def ab():
+    a = np.random.default_rng(0).standard_normal((TOTAL, 2)).astype(np.float32)
+    plan = random_plan(TOTAL, np.random.default_rng(1), pieces=16)
+    return a, plan.render(a), plan
+
+
+def play(t, blocks):
+    out = np.empty((blocks, BLOCK, 2), dtype=np.float32)
+    more = [t.read(out[i], BLOCK) for i in range(blocks)]
+    return out.reshape(-1, 2), more
+
+
+def test_plays_active_side_to_the_end(ab):
+    a, b, plan = ab
+    t = ABTransport(SAMPLE_RATE)
+    t.set_sources(a, b, plan)
+
+    blocks = -(-TOTAL // BLOCK)
+    out, more = play(t, blocks)
+    np.testing.assert_array_equal(out[:TOTAL], b)
+    assert not out[TOTAL:].any()
+    assert more == [True] * (blocks - 1) + [False]
+
+
+def test_switch_maps_position_through_plan(ab):
+    a, b, plan = ab
+    idx = naive_index(plan)
+    t = ABTransport(SAMPLE_RATE, crossfade_ms=8.0)
+    t.set_sources(a, b, plan)
+    fade = t.crossfade
+    assert fade == 64
+
+    play(t, 3)
+    p = t.position
+    assert p == 3 * BLOCK
+    t.toggle()
+    out, _ = play(t, 1)
+
+    q = idx[p]
+    assert t.active == "A" and t.position == q + BLOCK
+    # Equal-power crossfade from B at p into A at the matching frame q
+    theta = ((np.arange(fade) + 0.5) / fade * (np.pi / 2.0))[:, None]
+    expected = b[p:p + fade] * np.cos(theta) + a[q:q + fade] * np.sin(theta)
+    np.testing.assert_allclose(out[:fade], expected, rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(out[fade:], a[q + fade:q + BLOCK])
+
+
+def test_switch_back_returns_to_same_frame(ab):
+    a, b, plan = ab
+    t = ABTransport(SAMPLE_RATE)
+    t.set_sources(a, b, plan)
+    for frame in (0, 1, 1234, TOTAL - 1):
+        a_frame = t.map_position(frame, "A")
+        assert a_frame == plan.map_position(frame)
+        assert t.map_position(a_frame, "B") == frame
+
+
+def test_without_plan_frame_carries_over(ab):
+    a, b, _ = ab
+    t = ABTransport(SAMPLE_RATE)
+    t.set_sources(a, b)
+    t.seek(1000)
+    t.toggle()
+    out, _ = play(t, 2)
+    assert t.active == "A"
+    np.testing.assert_array_equal(out[t.crossfade:], a[1000 + t.crossfade:1000 + 2 * BLOCK])
+
+
+def test_mono_source_plays_on_first_channel():
+    mono = np.arange(300, dtype=np.float32)
+    t = ABTransport(SAMPLE_RATE)
+    t.set_sources(mono, mono[::-1].copy(), SlicePlan.flip(300))
+    out, more = play(t, 2)
+    np.testing.assert_array_equal(out[:300, 0], mono[::-1])
+    assert not out[:, 1:].any()
+    assert more == [True, False]
@@ -0,0 +1,78 @@
+import errno
+import json
+import os
+
+from core.economic import usage_log
+from core.economic.usage_log import UsageLogWriter
+
+
+def failing_open(writer, failures):
+    """Make the writer's next `failures` opens of the log fail with ENOSPC."""
+    real = writer._open
+    left = [failures]
+
+    def _open():
+        if left[0] != 0:
+            left[0] -= 1
+            raise OSError(errno.ENOSPC, "No space left on device")
+        real()
+
+    writer._open = _open
+
+
+def lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_failed_batch_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(usage_log, "RETRY_INITIAL", 0.01)
+    path = str(tmp_path / "usage_log.jsonl")
+    writer = UsageLogWriter(path, flush_interval=0.01)
+    failing_open(writer, 2)
+
+    for i in range(10):
+        writer.log({"n": i})
+    writer.flush()
+
+    assert [r["n"] for r in lines(path)] == list(range(10))
+    stats = writer.stats()
+    assert stats["errors"] == 2
+    assert stats["retrying"] == 0
+    assert "No space" in stats["last_error"]
+    writer.close()
+
+
+def test_batch_failing_at_close_is_spilled(tmp_path, monkeypatch):
+    monkeypatch.setattr(usage_log, "RETRY_INITIAL", 0.01)
+    path = str(tmp_path / "usage_log.jsonl")
+    writer = UsageLogWriter(path, flush_interval=0.01)
+    failing_open(writer, -1)
+
+    for i in range(5):
+        writer.log({"n": i})
+    writer.close()
+
+    assert not os.path.exists(path)
+    assert [r["n"] for r in lines(writer.spill_path)] == list(range(5))
+    stats = writer.stats()
+    assert stats["spilled"] == 5
+    assert stats["lost"] == 0
+
+
+def test_close_fsyncs_under_interval_policy(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(usage_log.os, "fsync", lambda fd: (synced.append(fd), real_fsync(fd)))
+
+    path = str(tmp_path / "usage_log.jsonl")
+    writer = UsageLogWriter(path, fsync="interval", fsync_interval=3600, flush_interval=0.01)
+    writer.log({"n": 0})
+    writer.flush()
+    writer.log({"n": 1})
+    writer.flush()
+    before = len(synced)    # only the first commit was inside the interval
+
+    writer.close()
+    assert len(synced) == before + 1
+    assert len(lines(path)) == 2
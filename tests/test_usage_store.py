@@ -0,0 +1,63 @@
+import json
+import os
+
+from core.economic.usage_store import UsageStore, compact
+
+
+def write_log(path, records):
+    with open(path, "a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def record(i, mode="HQ_REVERSE", tier="pro"):
+    return {
+        "timestamp": 1_700_000_000.0 + i,
+        "mode": mode,
+        "tier": tier,
+        "datacostunits": 1.5,
+        "gating": {"gate_status": "allowed"},
+        "receipt_signature": f"{i:064x}",
+    }
+
+
+def total(store_dir):
+    return sum(r["count"] for r in UsageStore(store_dir).query(group_by=()))
+
+
+def test_compact_rotated_live_log_counts_once(tmp_path):
+    logs, store = str(tmp_path / "logs"), str(tmp_path / "store")
+    os.makedirs(logs)
+    live = os.path.join(logs, "usage_log.jsonl")
+
+    write_log(live, [record(i) for i in range(3)])
+    compact(logs, store, include_live=True)
+    assert total(store) == 3
+
+    # The writer rotates the live file; its records come back as a segment
+    os.replace(live, os.path.join(logs, "usage_log-20231114T221320Z.jsonl"))
+    compact(logs, store)
+    assert total(store) == 3
+    assert not os.path.exists(os.path.join(store, "usage_log"))
+
+    # New live records are snapshotted next to the segment
+    write_log(live, [record(i) for i in range(3, 5)])
+    compact(logs, store, include_live=True)
+    assert total(store) == 5
+    compact(logs, store, include_live=True)
+    assert total(store) == 5
+
+
+def test_compact_groups_and_skips_known_segments(tmp_path):
+    logs, store = str(tmp_path / "logs"), str(tmp_path / "store")
+    os.makedirs(logs)
+    write_log(os.path.join(logs, "usage_log-a.jsonl"), [record(0), record(1, tier="free")])
+    write_log(os.path.join(logs, "usage_log-b.jsonl"), [record(2, mode="TRUE_REVERSE")])
+
+    assert len(compact(logs, store)) == 2
+    assert compact(logs, store) == []
+
+    rows = UsageStore(store).query(group_by=("tier",))
+    assert {r["tier"]: r["count"] for r in rows} == {"pro": 2, "free": 1}
+    rows = UsageStore(store).query(start=1_700_000_001.0, group_by=("mode",))
+    assert {r["mode"]: r["count"] for r in rows} == {"HQ_REVERSE": 1, "TRUE_REVERSE": 1}